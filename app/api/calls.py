@@ -0,0 +1,28 @@
+"""Live call diagnostics API endpoints."""
+import logging
+from typing import Any, Dict, List
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from app.services.call_session.manager import flush_debug_events
+
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class DebugDumpResponse(BaseModel):
+    """Debug dump response model."""
+    call_sid: str
+    events: List[Dict[str, Any]]
+
+
+@router.post("/api/calls/{call_sid}/debug", response_model=DebugDumpResponse)
+async def dump_call_debug_events(call_sid: str):
+    """Write out and return a live call's buffered debug events."""
+    logger.info(f"[CALLS API] Debug dump requested for call {call_sid}")
+    events = await flush_debug_events(call_sid, "operator")
+    if events is None:
+        # Buffers are per process; the call may be handled by another worker
+        raise HTTPException(status_code=404, detail=f"No debug events for call {call_sid} in this process")
+    return DebugDumpResponse(call_sid=call_sid, events=events)
@@ -1,6 +1,20 @@
-"""Health check endpoint."""
+"""Health check and metrics endpoints."""
 import logging
 from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import ACTIVE_SESSIONS, REGISTRY
+from app.core.dependencies import (
+    get_fast_path_matcher,
+    get_llm_circuit_breaker,
+    get_llm_hedger,
+    get_model_scheduler,
+    get_prompt_compiler,
+    get_response_cache,
+    get_session_store,
+)
+from app.services.call_session.manager import speculation_stats
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -12,5 +26,49 @@ async def health_check(request: Request):
     logger.debug(
         f"[HEALTH] Health check requested - Client: {request.client.host if request.client else 'unknown'}"
     )
-    return {"status": "healthy"}
+    response = {"status": "healthy"}
+
+    # Session eviction counters (a growing idle count means lost status callbacks)
+    session_reaper = getattr(request.app.state, "session_reaper", None)
+    if session_reaper is not None:
+        response["sessions"] = session_reaper.stats()
+
+    # How often speculative turns from partial transcripts are reused
+    if settings.speculative_turns_enabled:
+        response["speculation"] = speculation_stats()
+
+    # Share of turns answered without the LLM
+    if settings.fast_path_enabled:
+        response["fast_path"] = get_fast_path_matcher().stats()
+
+    # Share of LLM turns served from the response cache
+    if settings.response_cache_enabled:
+        response["response_cache"] = get_response_cache().stats()
+
+    # Prompt sizes and how much of each prompt the provider served from its cache
+    response["prompts"] = get_prompt_compiler().stats()
+
+    # LLM latency, hedged requests and turns that ran out of budget
+    response["llm"] = get_llm_hedger().stats()
+
+    # LLM circuit breaker state and transitions (open means turns are answered from the menu)
+    if settings.llm_circuit_breaker_enabled:
+        breaker = get_llm_circuit_breaker().stats()
+        response["llm_circuit_breaker"] = breaker
+        if breaker["state"] != "closed":
+            response["status"] = "degraded"
+
+    # Model API admission: concurrency window, queue depth, waits and rate limiting
+    if settings.openai_scheduler_enabled:
+        response["model_scheduler"] = get_model_scheduler().stats()
+
+    return response
+
+
 
+@router.get("/metrics")
+async def metrics():
+    """Metrics in the Prometheus text exposition format."""
+    # Sessions are counted at scrape time so the gauge is right across workers
+    ACTIVE_SESSIONS.set(len(await get_session_store().list_call_sids()))
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,14 +1,24 @@
 """Twilio voice webhook endpoints."""
 import logging
-from fastapi import APIRouter, Request, Form, Depends, Query, HTTPException
+from fastapi import APIRouter, Request, Form, Depends, Query, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.db.database import get_db
-from app.core.dependencies import get_menu_repository
+from app.core.dependencies import get_menu_repository, get_model_clients
 from app.services.menu.repository import MenuRepository
 from app.services.agent.agent import AgentService
 from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.media_stream import MediaStreamHandler
+from app.services.speech.stt import SpeechToTextService
+from app.services.speech.tts import TextToSpeechService
+from app.services.speech.streaming import (
+    StreamingSTT,
+    StreamingTTS,
+    create_streaming_stt,
+    create_streaming_tts,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -22,13 +32,53 @@ def get_base_url(request: Request) -> str:
     return str(request.base_url).rstrip('/')
 
 
+def get_stream_url(request: Request) -> str:
+    """WebSocket URL of the media stream endpoint, on the same host as the request."""
+    base_url = get_base_url(request)
+    if base_url.startswith("https://"):
+        return "wss://" + base_url[len("https://"):] + "/webhooks/voice/stream"
+    return "ws://" + base_url.split("://", 1)[-1] + "/webhooks/voice/stream"
+
+
 def get_session_manager(
     db: AsyncSession = Depends(get_db),
     menu_repository: MenuRepository = Depends(get_menu_repository),
 ) -> CallSessionManager:
     """Get call session manager."""
-    agent_service = AgentService(menu_repository)
-    return CallSessionManager(db, agent_service, menu_repository)
+    # Services are cheap wrappers; the OpenAI client and its connection pool are shared
+    client = get_model_clients().openai
+    agent_service = AgentService(menu_repository, client=client)
+    return CallSessionManager(
+        db,
+        agent_service,
+        menu_repository,
+        stt_service=SpeechToTextService(client=client),
+        tts_service=TextToSpeechService(client=client),
+    )
+
+
+def get_streaming_stt(
+    session_manager: CallSessionManager = Depends(get_session_manager),
+) -> StreamingSTT:
+    """Get a recognizer for one media stream."""
+    return create_streaming_stt(
+        settings.stream_stt_backend,
+        session_manager.stt_service,
+        threshold=settings.stream_vad_threshold,
+        min_speech_ms=settings.stream_min_speech_ms,
+        end_silence_ms=settings.stream_end_silence_ms,
+    )
+
+
+def get_streaming_tts(
+    session_manager: CallSessionManager = Depends(get_session_manager),
+) -> StreamingTTS:
+    """Get a synthesizer for media streams."""
+    return create_streaming_tts(
+        settings.stream_tts_backend,
+        session_manager.tts_service,
+        voice=settings.stream_tts_voice,
+    )
 
 
 @router.post("/voice/incoming")
@@ -49,21 +99,18 @@ async def handle_incoming_call(
     )
     
     try:
-        # Create session and get greeting
-        logger.debug(f"[INCOMING CALL] Creating session for CallSid: {CallSid}")
-        greeting = await session_manager.get_greeting(CallSid)
-        logger.info(f"[INCOMING CALL] Session created, greeting generated (length: {len(greeting)}) - CallSid: {CallSid}")
-
-        # Generate TwiML with Gather to collect user speech
-        from app.services.speech.tts import TextToSpeechService
+        if settings.voice_transport == "stream":
+            # Hand the call to the media stream; the session starts with the stream
+            twiml = session_manager.tts_service.generate_twiml_stream(
+                get_stream_url(request)
+            ).encode()
+        else:
+            # Create session and render the greeting from a precompiled template.
+            # The Call row is written in the background so pickup isn't delayed.
+            # Construct absolute URL from request (handles proxy headers like ngrok)
+            base_url = get_base_url(request)
+            twiml = await session_manager.start_call(CallSid, base_url=base_url)
 
-        tts_service = TextToSpeechService()
-        # Construct absolute URL from request (handles proxy headers like ngrok)
-        base_url = get_base_url(request)
-        gather_url = f"{base_url}/webhooks/voice/gather?CallSid={CallSid}"
-        logger.debug(f"[INCOMING CALL] Generating TwiML with gather URL: {gather_url} - CallSid: {CallSid}")
-        twiml = tts_service.generate_twiml_with_gather(greeting, gather_url)
-        
         logger.info(
             f"[INCOMING CALL] Successfully processed incoming call - CallSid: {CallSid}, "
             f"TwiML length: {len(twiml)} bytes"
@@ -115,7 +162,12 @@ async def handle_gather(
         # Construct absolute URL from request (handles proxy headers like ngrok)
         base_url = get_base_url(request)
         logger.debug(f"[GATHER] Processing speech for CallSid: {CallSid}")
-        twiml = await session_manager.process_user_speech(CallSid, SpeechResult, base_url=base_url)
+        twiml = await session_manager.process_user_speech(
+            CallSid,
+            SpeechResult,
+            base_url=base_url,
+            idempotency_token=request.headers.get("I-Twilio-Idempotency-Token"),
+        )
 
         logger.info(
             f"[GATHER] Successfully processed speech input - CallSid: {CallSid}, "
@@ -132,8 +184,7 @@ async def handle_gather(
         )
         # Return a graceful error response to Twilio
         error_message = "I'm sorry, I encountered an error. Please try again."
-        from app.services.speech.tts import TextToSpeechService
-        tts_service = TextToSpeechService()
+        tts_service = session_manager.tts_service
         # Construct absolute URL from request (handles proxy headers like ngrok)
         base_url = get_base_url(request)
         error_twiml = tts_service.generate_twiml_with_gather(
@@ -142,6 +193,67 @@ async def handle_gather(
         return Response(content=error_twiml, media_type="application/xml")
 
 
+@router.post("/voice/partial")
+async def handle_partial_result(
+    CallSid: str = Form(...),
+    StableSpeechResult: str = Form(None),
+    UnstableSpeechResult: str = Form(None),
+    session_manager: CallSessionManager = Depends(get_session_manager),
+):
+    """
+    Handle a partial transcript from Twilio while the caller is still speaking.
+
+    Starts the agent speculatively on the stable part of the transcript; the
+    gather webhook reuses the result if the final transcript matches.
+    """
+    logger.debug(
+        f"[PARTIAL] CallSid: {CallSid}, Stable: '{(StableSpeechResult or '')[:100]}', "
+        f"Unstable: '{(UnstableSpeechResult or '')[:100]}'"
+    )
+    try:
+        if StableSpeechResult:
+            await session_manager.speculate(CallSid, StableSpeechResult)
+    except Exception as e:
+        # Speculation is best effort; the final transcript is handled normally
+        logger.warning(
+            f"[PARTIAL] Could not start speculative turn - CallSid: {CallSid}, "
+            f"Error: {type(e).__name__}: {str(e)}"
+        )
+    return Response(content="OK", media_type="text/plain")
+
+
+@router.websocket("/voice/stream")
+async def handle_media_stream(
+    websocket: WebSocket,
+    session_manager: CallSessionManager = Depends(get_session_manager),
+    stt: StreamingSTT = Depends(get_streaming_stt),
+    tts: StreamingTTS = Depends(get_streaming_tts),
+):
+    """
+    Handle a Twilio bidirectional media stream.
+
+    Twilio connects here when the incoming call TwiML contains <Connect><Stream>.
+    The call hangs up when this socket closes.
+    """
+    await websocket.accept()
+    handler = MediaStreamHandler(session_manager, stt, tts, websocket.send_json)
+    try:
+        while await handler.handle_event(await websocket.receive_json()):
+            pass
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"[MEDIA STREAM] Twilio disconnected - CallSid: {handler.call_sid}")
+    except Exception as e:
+        logger.error(
+            f"[MEDIA STREAM] Error on media stream - CallSid: {handler.call_sid}, "
+            f"Error: {type(e).__name__}: {str(e)}",
+            exc_info=True
+        )
+        await websocket.close(code=1011)
+    finally:
+        await handler.close()
+
+
 @router.post("/voice/status")
 async def handle_call_status(
     request: Request,
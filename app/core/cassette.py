@@ -0,0 +1,280 @@
+"""Record and replay model API HTTP traffic.
+
+A cassette holds request/response pairs captured at the shared httpx pool,
+including each streamed chunk and when it arrived. Replaying one serves the
+same responses without the network, optionally with the recorded timing, so
+the full stack (LLM, Whisper, TTS) can be benchmarked offline and latency
+reported in production reproduced locally.
+"""
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+MODES = (RECORD, REPLAY)
+
+# Response headers worth keeping; everything else (cookies, CDN ids) is dropped
+KEPT_RESPONSE_HEADERS = ("content-type", "retry-after", "openai-processing-ms", "openai-model", "x-request-id")
+KEPT_RESPONSE_HEADER_PREFIXES = ("x-ratelimit-",)
+
+
+class CassetteError(Exception):
+    """No recorded response matches a request being replayed."""
+
+
+def request_key(request: httpx.Request) -> str:
+    """Key a request by method, URL and body, ignoring incidental differences.
+
+    JSON bodies are compared with sorted keys and multipart bodies without
+    their random boundary, so the same call made twice gets the same key.
+    The request must have been read.
+    """
+    body = request.content
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+        except ValueError:
+            pass
+    elif content_type.startswith("multipart/form-data") and "boundary=" in content_type:
+        boundary = content_type.split("boundary=", 1)[1].split(";")[0].strip('"')
+        body = body.replace(boundary.encode(), b"BOUNDARY")
+    digest = hashlib.sha256(body).hexdigest()[:20]
+    return f"{request.method} {request.url.host}{request.url.raw_path.decode()} {digest}"
+
+
+def _encode(data: bytes) -> Dict[str, str]:
+    try:
+        return {"text": data.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(data).decode("ascii")}
+
+
+def _decode(encoded: Dict[str, str]) -> bytes:
+    if "text" in encoded:
+        return encoded["text"].encode("utf-8")
+    return base64.b64decode(encoded["base64"])
+
+
+def _kept_headers(headers: httpx.Headers) -> Dict[str, str]:
+    return {
+        name: value
+        for name, value in headers.items()
+        if name in KEPT_RESPONSE_HEADERS or name.startswith(KEPT_RESPONSE_HEADER_PREFIXES)
+    }
+
+
+class Cassette:
+    """Recorded interactions, stored as gzipped JSON.
+
+    Interactions recorded under the same key are played back in recording
+    order; once they run out the last one is repeated, so a benchmark can
+    loop over a recording.
+    """
+
+    def __init__(self, path: Optional[str] = None, interactions: Optional[List[Dict[str, Any]]] = None):
+        self.path = path
+        self.interactions: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._played: Dict[str, int] = defaultdict(int)
+        for interaction in interactions or []:
+            self.add(interaction)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        """Read a cassette file (an empty cassette if it doesn't exist yet)."""
+        if not os.path.exists(path):
+            return cls(path)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(path, data.get("interactions", []))
+
+    def add(self, interaction: Dict[str, Any]) -> None:
+        self.interactions.append(interaction)
+        self._by_key[interaction["key"]].append(interaction)
+
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """Next recorded interaction for a request key, or None."""
+        recorded = self._by_key.get(key)
+        if not recorded:
+            return None
+        index = min(self._played[key], len(recorded) - 1)
+        self._played[key] += 1
+        return recorded[index]
+
+    def rewind(self) -> None:
+        """Play interactions from the start again."""
+        self._played.clear()
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the cassette (atomically, so a crash can't leave half a file)."""
+        path = path or self.path
+        if path is None:
+            raise ValueError("Cassette has no path to save to")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"version": 1, "interactions": self.interactions}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Response body that notes each chunk and its arrival time as it is read."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, started: float, on_close: Callable[[List], None]):
+        self._stream = stream
+        self._started = started
+        self._on_close = on_close
+        self._chunks: List[Tuple[float, bytes]] = []
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._chunks.append((time.perf_counter() - self._started, chunk))
+            yield chunk
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close(self._chunks)
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    """Recorded response body, optionally paced like the original."""
+
+    def __init__(self, chunks: List[Dict[str, Any]], started: float, speed: Optional[float]):
+        self._chunks = chunks
+        self._started = started
+        self._speed = speed
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            if self._speed:
+                delay = chunk["t"] / 1000 / self._speed - (time.perf_counter() - self._started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield _decode(chunk)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records model API traffic to, or replays it from, a cassette.
+
+    Requests to other hosts go to the wrapped transport untouched. In replay
+    mode the network is never used for model hosts; a request with no
+    recording raises CassetteError. With realtime replay the recorded time
+    to headers and between chunks is reproduced (divided by `speed`).
+    """
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport],
+        cassette: Cassette,
+        mode: str = REPLAY,
+        realtime: bool = False,
+        speed: float = 1.0,
+        hosts: Tuple[str, ...] = ("api.openai.com",),
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if mode == RECORD and transport is None:
+            raise ValueError("Recording needs a transport to send requests on")
+        self._transport = transport
+        self.cassette = cassette
+        self.mode = mode
+        self.speed = speed if realtime else None
+        self.hosts = hosts
+        self.recorded = 0
+        self.replayed = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host not in self.hosts:
+            if self._transport is None:
+                raise CassetteError(f"No transport for unrecorded host {request.url.host}")
+            return await self._transport.handle_async_request(request)
+
+        await request.aread()
+        key = request_key(request)
+        if self.mode == REPLAY:
+            return await self._replay(request, key)
+        return await self._record(request, key)
+
+    async def _replay(self, request: httpx.Request, key: str) -> httpx.Response:
+        started = time.perf_counter()
+        interaction = self.cassette.find(key)
+        if interaction is None:
+            raise CassetteError(f"No recorded response for {request.method} {request.url} ({key})")
+        response = interaction["response"]
+        if self.speed:
+            await asyncio.sleep(response["headers_ms"] / 1000 / self.speed)
+        self.replayed += 1
+        return httpx.Response(
+            status_code=response["status"],
+            headers=response["headers"],
+            stream=_ReplayStream(response["chunks"], started, self.speed),
+            request=request,
+        )
+
+    async def _record(self, request: httpx.Request, key: str) -> httpx.Response:
+        # Uncompressed bodies keep recordings readable; the cassette file is gzipped anyway
+        request.headers["accept-encoding"] = "identity"
+        started = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        headers_ms = (time.perf_counter() - started) * 1000
+
+        def finish(chunks: List[Tuple[float, bytes]]) -> None:
+            self.cassette.add(
+                {
+                    "key": key,
+                    "request": {"method": request.method, "url": str(request.url)},
+                    "response": {
+                        "status": response.status_code,
+                        "headers": _kept_headers(response.headers),
+                        "headers_ms": round(headers_ms, 2),
+                        "chunks": [{"t": round(at * 1000, 2), **_encode(data)} for at, data in chunks],
+                    },
+                }
+            )
+            self.recorded += 1
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, started, finish),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        try:
+            if self.mode == RECORD and self.cassette.path:
+                self.cassette.save()
+                logger.info(
+                    f"[CASSETTE] Saved {len(self.cassette)} interactions to {self.cassette.path}"
+                )
+        finally:
+            if self._transport is not None:
+                await self._transport.aclose()
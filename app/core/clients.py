@@ -0,0 +1,67 @@
+"""Application-scoped HTTP and model API clients."""
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.cassette import REPLAY, Cassette, CassetteTransport
+from app.core.scheduler import ModelScheduler, ScheduledTransport
+
+
+class ModelClients:
+    """One keep-alive HTTP pool and the OpenAI client that uses it.
+
+    Created once per process so every turn reuses warm TLS connections to the
+    model endpoint instead of opening new ones. With a scheduler, every model
+    API request on the pool (LLM, STT and TTS) waits for admission from it.
+    With a cassette, model API traffic is recorded to it or replayed from it
+    instead of going to the network (the scheduler still admits replays).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry_seconds: float = 30.0,
+        timeout_seconds: float = 30.0,
+        connect_timeout_seconds: float = 5.0,
+        max_retries: int = 2,
+        scheduler: Optional[ModelScheduler] = None,
+        cassette: Optional[Cassette] = None,
+        cassette_mode: str = REPLAY,
+        cassette_realtime: bool = False,
+    ):
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_seconds,
+        )
+        self.scheduler = scheduler
+        transport = None
+        if cassette is not None:
+            transport = CassetteTransport(
+                httpx.AsyncHTTPTransport(limits=limits),
+                cassette,
+                mode=cassette_mode,
+                realtime=cassette_realtime,
+            )
+        if scheduler is not None:
+            transport = ScheduledTransport(
+                transport or httpx.AsyncHTTPTransport(limits=limits), scheduler
+            )
+        self.http_client = httpx.AsyncClient(
+            limits=limits,
+            transport=transport,
+            timeout=httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds),
+            follow_redirects=True,
+        )
+        self.openai = AsyncOpenAI(
+            api_key=api_key,
+            http_client=self.http_client,
+            max_retries=max_retries,
+        )
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self.http_client.aclose()
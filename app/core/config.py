@@ -1,5 +1,6 @@
 """Application configuration."""
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +10,22 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str
 
+    # OpenAI connection pool (shared by LLM, STT and TTS clients)
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry_seconds: float = 30.0
+    openai_timeout_seconds: float = 30.0
+    openai_connect_timeout_seconds: float = 5.0
+    openai_max_retries: int = 2
+    openai_scheduler_enabled: bool = True  # Admit model API requests through the adaptive scheduler
+    openai_concurrency_initial: int = 8  # Starting concurrency window for model API requests
+    openai_concurrency_min: int = 1  # Smallest window after rate limiting
+    openai_concurrency_max: int = 64  # Largest window the scheduler grows to
+    openai_tokens_per_minute: int = 0  # Estimated tokens per minute admitted (0 = no limit, rely on 429s)
+    openai_cassette_path: Optional[str] = None  # Record/replay model API traffic with this file (development, benchmarks)
+    openai_cassette_mode: str = "replay"  # replay (never touches the network) or record
+    openai_cassette_realtime: bool = False  # Replay with the recorded latencies
+
     # Twilio
     twilio_account_sid: str
     twilio_auth_token: str
@@ -24,6 +41,15 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
 
+    # Logging
+    log_level: str = "INFO"  # Root log level (DEBUG adds per-turn prompt and LLM output dumps)
+    log_format: str = "text"  # text or json (one object per line, with call_sid)
+    log_async: bool = True  # Write log records from a background thread instead of the event loop
+    log_sample_rates: str = ""  # Share of sub-WARNING records kept per logger, e.g. "app.services.call_session=0.1"
+    debug_buffer_enabled: bool = True  # Keep recent per-call diagnostics in memory, written out on errors
+    debug_buffer_size: int = 64  # Debug events kept per call
+    debug_dump_dir: Optional[str] = None  # Write debug dumps as JSON files here instead of to the log
+
     # Dashboard Authentication
     dashboard_password: str = "admin123"  # Change this in .env for production
     session_secret_key: str = "change-this-secret-key-in-production"
@@ -33,6 +59,63 @@ class Settings(BaseSettings):
 
     # Speech Configuration
     speech_timeout: str = "auto"  # Twilio speech timeout ("auto" or number of seconds)
+    voice_transport: str = "gather"  # gather (<Gather> webhooks) or stream (Media Streams WebSocket)
+    stream_stt_backend: str = "whisper"  # Recognizer for media streams
+    stream_tts_backend: str = "openai"  # Synthesizer for media streams (openai, or tone for local testing)
+    stream_tts_voice: str = "alloy"  # OpenAI voice used on media streams
+    stream_vad_threshold: float = 500.0  # Frame energy (linear RMS) that counts as speech
+    stream_min_speech_ms: int = 60  # Speech needed before the caller counts as talking (barge-in)
+    stream_end_silence_ms: int = 600  # Silence that ends an utterance
+    speculative_turns_enabled: bool = False  # Run the agent on Twilio partial transcripts
+    speculation_min_words: int = 2  # Shortest partial worth speculating on
+    speculation_min_similarity: float = 0.9  # Word-level similarity needed to reuse a partial's turn
+    speculation_max_per_turn: int = 4  # Cap on speculative LLM calls per caller utterance
+
+    # Agent
+    fast_path_enabled: bool = True  # Resolve routine turns ("that's all", "yes") without the LLM
+    menu_extraction_enabled: bool = True  # Take plain orders ("two cheeseburgers") without the LLM
+    response_cache_enabled: bool = True  # Reuse LLM results for identical turns across calls
+    response_cache_max_entries: int = 1000  # LRU capacity of the LLM response cache
+    response_cache_ttl_seconds: float = 600.0  # How long a cached LLM response is reused
+    context_token_budget: int = 600  # Tokens of conversation history (summary + recent turns) per prompt
+    context_summary_max_tokens: int = 150  # Cap on the running summary of older turns
+    context_min_recent_turns: int = 2  # Turns always kept verbatim, even over budget
+    llm_streaming_enabled: bool = True  # Stream completions so the spoken response is ready early
+
+    # LLM backend
+    llm_backend: str = "openai"  # openai, rules (deterministic, offline), or stub (injected latency/failures)
+    llm_model: str = "gpt-4o-mini"  # Chat model (openai backend)
+    llm_temperature: float = 0.5  # Lowered from 0.7 for faster, more deterministic responses
+    llm_stub_latency_ms: float = 0.0  # Typical (median) latency of a stub call
+    llm_stub_latency_jitter_ms: float = 0.0  # Spread of stub latency
+    llm_stub_latency_distribution: str = "fixed"  # fixed, uniform, or lognormal
+    llm_stub_timeout_rate: float = 0.0  # Share of stub calls that time out
+    llm_stub_rate_limit_rate: float = 0.0  # Share of stub calls rejected with a 429
+    llm_stub_malformed_rate: float = 0.0  # Share of stub calls returning malformed JSON
+    llm_stub_seed: Optional[int] = None  # Seed for repeatable stub runs
+    turn_budget_seconds: float = 10.0  # Latency budget per turn, under Twilio's 15s webhook timeout (0 disables)
+    llm_hedging_enabled: bool = True  # Send a second LLM request when the first one is slow
+    llm_hedge_percentile: float = 0.9  # Hedge once the first request is slower than this share of recent calls
+    llm_hedge_min_samples: int = 20  # Recent calls needed before the percentile is used
+    llm_hedge_default_delay_seconds: float = 2.0  # Hedge delay until enough calls have been seen
+    llm_circuit_breaker_enabled: bool = True  # Answer from the menu instead of calling a failing LLM
+    llm_breaker_failure_rate: float = 0.5  # Share of recent LLM calls failing that opens the breaker
+    llm_breaker_window: int = 20  # Recent LLM calls the failure rate is taken over
+    llm_breaker_min_calls: int = 5  # Calls needed in the window before the breaker can open
+    llm_breaker_open_seconds: float = 30.0  # How long the breaker stays open before a probe call
+
+    # Call Session Storage
+    session_store_backend: str = "memory"  # memory, sqlite, or redis
+    session_store_path: str = "./call_sessions.db"  # SQLite file (sqlite backend)
+    session_store_url: str = "redis://localhost:6379/0"  # Redis URL (redis backend)
+    session_store_max_sessions: Optional[int] = None  # Hard LRU cap (memory backend); the reaper owns the limit
+    session_store_ttl_seconds: int = 3600  # Key expiry (redis backend)
+    session_cache_ttl_seconds: float = 2.0  # Local read-through cache for shared backends (0 disables)
+    turn_replay_ttl_seconds: float = 30.0  # How long a turn's TwiML is kept to answer Twilio retries
+    session_idle_ttl_seconds: float = 900.0  # Evict sessions idle this long (lost status callback)
+    session_reaper_interval_seconds: float = 30.0  # How often the reaper sweeps
+    session_reaper_max_sessions: int = 1000  # Evict least recently active sessions beyond this
+    session_reaper_max_bytes: int = 50_000_000  # Evict least recently active sessions beyond this size
 
     model_config = SettingsConfigDict(
         env_file=".env",
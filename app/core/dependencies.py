@@ -1,7 +1,18 @@
 """FastAPI dependencies."""
 from app.core.config import settings
+from app.core.cassette import Cassette
+from app.core.clients import ModelClients
+from app.core.scheduler import ModelScheduler
 from app.services.menu.repository import MenuRepository
 from app.services.menu.in_memory_menu import InMemoryMenuProvider
+from app.services.call_session.store import SessionStore, create_session_store
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.response_cache import ResponseCache
+from app.services.agent.prompt import PromptCompiler
+from app.services.agent.hedging import HedgedCaller
+from app.services.agent.circuit_breaker import CircuitBreaker
+from app.db.database import AsyncSessionLocal
 
 
 # Singleton instance of MenuRepository to avoid reloading menu.yaml on every request
@@ -15,3 +26,155 @@ def get_menu_repository() -> MenuRepository:
         _menu_repository = MenuRepository(provider=InMemoryMenuProvider())
     return _menu_repository
 
+
+# Singleton call session store shared by all requests in this process
+_session_store: SessionStore = None
+
+
+def get_session_store() -> SessionStore:
+    """Get call session store instance (singleton)."""
+    global _session_store
+    if _session_store is None:
+        _session_store = create_session_store(
+            settings.session_store_backend,
+            path=settings.session_store_path,
+            url=settings.session_store_url,
+            max_sessions=settings.session_store_max_sessions,
+            ttl_seconds=settings.session_store_ttl_seconds,
+            cache_ttl_seconds=settings.session_cache_ttl_seconds,
+        )
+    return _session_store
+
+
+# Admission control for model API requests (the window and rate limits are process-wide)
+_model_scheduler: ModelScheduler = None
+
+
+def get_model_scheduler() -> ModelScheduler:
+    """Get model request scheduler instance (singleton)."""
+    global _model_scheduler
+    if _model_scheduler is None:
+        _model_scheduler = ModelScheduler(
+            initial_limit=settings.openai_concurrency_initial,
+            min_limit=settings.openai_concurrency_min,
+            max_limit=settings.openai_concurrency_max,
+            tokens_per_minute=settings.openai_tokens_per_minute,
+        )
+    return _model_scheduler
+
+
+# Shared OpenAI/HTTP clients, created in the app lifespan (or lazily on first use)
+_model_clients: ModelClients = None
+
+
+def get_model_clients() -> ModelClients:
+    """Get shared model API clients (singleton)."""
+    global _model_clients
+    if _model_clients is None:
+        _model_clients = ModelClients(
+            api_key=settings.openai_api_key,
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            keepalive_expiry_seconds=settings.openai_keepalive_expiry_seconds,
+            timeout_seconds=settings.openai_timeout_seconds,
+            connect_timeout_seconds=settings.openai_connect_timeout_seconds,
+            max_retries=settings.openai_max_retries,
+            scheduler=get_model_scheduler() if settings.openai_scheduler_enabled else None,
+            cassette=Cassette.load(settings.openai_cassette_path) if settings.openai_cassette_path else None,
+            cassette_mode=settings.openai_cassette_mode,
+            cassette_realtime=settings.openai_cassette_realtime,
+        )
+    return _model_clients
+
+
+async def close_model_clients() -> None:
+    """Close shared model API clients."""
+    global _model_clients
+    if _model_clients is not None:
+        await _model_clients.aclose()
+        _model_clients = None
+
+
+# Background writer for Call rows (keeps the incoming call path free of DB round trips)
+_call_record_writer: CallRecordWriter = None
+
+
+def get_call_record_writer() -> CallRecordWriter:
+    """Get call record writer instance (singleton)."""
+    global _call_record_writer
+    if _call_record_writer is None:
+        _call_record_writer = CallRecordWriter(AsyncSessionLocal)
+    return _call_record_writer
+
+
+# Local intent matcher shared by all agents (keeps process-wide hit counts)
+_fast_path_matcher: FastPathMatcher = None
+
+
+def get_fast_path_matcher() -> FastPathMatcher:
+    """Get fast-path intent matcher instance (singleton)."""
+    global _fast_path_matcher
+    if _fast_path_matcher is None:
+        _fast_path_matcher = FastPathMatcher()
+    return _fast_path_matcher
+
+
+# LLM response cache shared by all agents (identical turns recur across calls)
+_response_cache: ResponseCache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get LLM response cache instance (singleton)."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            max_entries=settings.response_cache_max_entries,
+            ttl_seconds=settings.response_cache_ttl_seconds,
+        )
+    return _response_cache
+
+
+# Compiled system prompts shared by all agents (keeps the prompt prefix byte-stable)
+_prompt_compiler: PromptCompiler = None
+
+
+def get_prompt_compiler() -> PromptCompiler:
+    """Get prompt compiler instance (singleton)."""
+    global _prompt_compiler
+    if _prompt_compiler is None:
+        _prompt_compiler = PromptCompiler()
+    return _prompt_compiler
+
+
+# Hedging state for LLM requests (latency history and hedge counters are process-wide)
+_llm_hedger: HedgedCaller = None
+
+
+def get_llm_hedger() -> HedgedCaller:
+    """Get LLM request hedger instance (singleton)."""
+    global _llm_hedger
+    if _llm_hedger is None:
+        _llm_hedger = HedgedCaller(
+            percentile=settings.llm_hedge_percentile,
+            min_samples=settings.llm_hedge_min_samples,
+            default_delay_seconds=settings.llm_hedge_default_delay_seconds,
+            enabled=settings.llm_hedging_enabled,
+        )
+    return _llm_hedger
+
+
+# LLM circuit breaker (an outage is process-wide, so every call shares its state)
+_llm_circuit_breaker: CircuitBreaker = None
+
+
+def get_llm_circuit_breaker() -> CircuitBreaker:
+    """Get LLM circuit breaker instance (singleton)."""
+    global _llm_circuit_breaker
+    if _llm_circuit_breaker is None:
+        _llm_circuit_breaker = CircuitBreaker(
+            failure_rate_threshold=settings.llm_breaker_failure_rate,
+            window=settings.llm_breaker_window,
+            min_calls=settings.llm_breaker_min_calls,
+            open_seconds=settings.llm_breaker_open_seconds,
+        )
+    return _llm_circuit_breaker
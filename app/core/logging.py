@@ -1,24 +1,174 @@
 """Logging configuration."""
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
 
 from app.core.config import settings
 
+_call_sid: ContextVar[Optional[str]] = ContextVar("log_call_sid", default=None)
+
+# Records kept waiting for the writer thread before new ones are dropped
+QUEUE_SIZE = 10000
+
+# Background writer started by setup_logging (None when logging synchronously)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def call_context(call_sid: Optional[str]) -> Iterator[None]:
+    """Tag log records emitted in this context with a CallSid."""
+    token = _call_sid.set(call_sid)
+    try:
+        yield
+    finally:
+        _call_sid.reset(token)
+
+
+def current_call_sid() -> Optional[str]:
+    """CallSid of the call being handled in this context, if any."""
+    return _call_sid.get()
+
+
+class CallContextFilter(logging.Filter):
+    """Adds the current CallSid to each record as ``call_sid``."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "call_sid"):
+            record.call_sid = _call_sid.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a share of records below WARNING from chosen loggers.
+
+    Rates apply to a logger and its children ("app.services.agent" covers
+    "app.services.agent.agent"); the most specific configured name wins.
+    Warnings and errors are always kept.
+    """
+
+    def __init__(self, rates: Dict[str, float], seed: Optional[int] = None):
+        super().__init__()
+        self.rates = rates
+        self._random = random.Random(seed)
+
+    def rate_for(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or self._random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, call_sid, message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "call_sid": getattr(record, "call_sid", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The plain text format, with the CallSid when there is one."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        call_sid = getattr(record, "call_sid", None)
+        return f"{line} [{call_sid}]" if call_sid else line
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without formatting or blocking.
+
+    Only the message itself is rendered here (its arguments may change once
+    the caller moves on); timestamps, JSON and I/O happen on the writer
+    thread. When the queue is full the record is dropped and counted rather
+    than stalling the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "logger=rate,logger=rate" into a dict (malformed entries are ignored)."""
+    rates = {}
+    for entry in spec.split(","):
+        name, _, rate = entry.strip().partition("=")
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
 
 def setup_logging() -> None:
     """Configure application logging."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-        ],
-    )
+    global _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.log_format == "json" else TextFormatter())
+
+    if settings.log_async:
+        handler: logging.Handler = NonBlockingQueueHandler(queue.Queue(QUEUE_SIZE))
+        _listener = logging.handlers.QueueListener(handler.queue, output)
+        _listener.start()
+    else:
+        handler = output
+    # Filters run in the caller, so dropped records are never queued or formatted
+    handler.addFilter(CallContextFilter())
+    handler.addFilter(SamplingFilter(parse_sample_rates(settings.log_sample_rates)))
+
+    logging.basicConfig(level=settings.log_level.upper(), handlers=[handler], force=True)
 
     # Set third-party loggers to WARNING
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("openai").setLevel(logging.WARNING)
 
 
-logger = logging.getLogger(__name__)
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
+
+logger = logging.getLogger(__name__)
@@ -0,0 +1,293 @@
+"""In-process metrics in the Prometheus text exposition format."""
+import functools
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from in-memory lookups up to a slow LLM turn
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric:
+    """Base class for metrics: a name, help text and label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _check(self, values: LabelValues) -> None:
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+
+    def _labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Add to the counter for a set of label values (in labelnames order)."""
+        try:
+            self._values[label_values] += amount
+        except KeyError:
+            self._check(label_values)
+            self._values[label_values] = amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def values(self) -> Dict[LabelValues, float]:
+        """Current value for every set of label values seen so far."""
+        return dict(self._values)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{self._labels(values)} {_number(value)}"
+            for values, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    """A value that is set to the current level."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *label_values: str) -> None:
+        self._check(label_values)
+        self._values[label_values] = value
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{self._labels(values)} {_number(value)}"
+            for values, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in fixed buckets.
+
+    An observation increments one bucket (found by bisection), the sum and
+    the count; cumulative bucket counts are only worked out when rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: [count per bucket (+Inf last)], sum
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record a value for a set of label values (in labelnames order)."""
+        series = self._series.get(label_values)
+        if series is None:
+            self._check(label_values)
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def time(self, *label_values: str) -> "_Timer":
+        """Context manager observing the time spent inside it."""
+        return _Timer(self, label_values)
+
+    def timed(self, *label_values: str) -> Callable:
+        """Decorator observing how long each call of an async function takes."""
+
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - started, *label_values)
+
+            return wrapper
+
+        return decorator
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                labels = self._labels(values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(values)} {_number(total[0])}")
+            lines.append(f"{self.name}_count{self._labels(values)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    """Times a block for Histogram.time()."""
+
+    __slots__ = ("_histogram", "_label_values", "_started")
+
+    def __init__(self, histogram: Histogram, label_values: LabelValues):
+        self._histogram = histogram
+        self._label_values = label_values
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._histogram.observe(time.perf_counter() - self._started, *self._label_values)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isfinite(value) and value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """The metrics rendered at /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the text exposition format (version 0.0.4)."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# Request handling
+HTTP_REQUEST_SECONDS = histogram(
+    "voice_agent_http_request_seconds", "Time to handle an HTTP request", ("route", "method", "status")
+)
+TWIML_RENDER_SECONDS = histogram(
+    "voice_agent_twiml_render_seconds", "Time to render a TwiML reply", ("kind",)
+)
+
+# Agent
+LLM_REQUEST_SECONDS = histogram(
+    "voice_agent_llm_request_seconds", "LLM call latency by conversation stage and resulting intent",
+    ("stage", "intent"),
+)
+AGENT_ERRORS = counter(
+    "voice_agent_agent_errors_total", "Turns that ended in an agent error response", ("kind",)
+)
+AGENT_FALLBACKS = counter(
+    "voice_agent_fallbacks_total", "Turns answered by a fallback instead of the LLM", ("kind",)
+)
+TURN_LIMIT_HITS = counter(
+    "voice_agent_turn_limit_hits_total", "Calls that reached the turn limit"
+)
+ACTIVE_SESSIONS = gauge(
+    "voice_agent_active_sessions", "Call sessions in the session store"
+)
+
+# Storage
+DB_OPERATION_SECONDS = histogram(
+    "voice_agent_db_operation_seconds", "Time spent in persistence methods", ("method",)
+)
+MENU_LOOKUP_SECONDS = histogram(
+    "voice_agent_menu_lookup_seconds", "Time spent in menu repository lookups", ("method",)
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing HTTP requests by route template and status."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = ["500"]
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            # Unmatched paths share one label so scanners can't grow the series
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, path, scope.get("method", ""), status[0]
+            )
@@ -0,0 +1,282 @@
+"""Process-wide scheduling of outbound model API requests."""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Request priorities (lower runs first)
+PRIORITY_LIVE = 0  # A caller is waiting on this turn
+PRIORITY_BACKGROUND = 1  # Speculation, tools and other work nobody is waiting on
+
+_PRIORITY_NAMES = {PRIORITY_LIVE: "live", PRIORITY_BACKGROUND: "background"}
+
+_current_priority: ContextVar[int] = ContextVar("model_request_priority", default=PRIORITY_LIVE)
+
+# Rough size of a token in request bytes, for accounting before the provider reports usage
+_BYTES_PER_TOKEN = 4
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run model requests made in this context at a priority."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    """Priority of model requests made in this context."""
+    return _current_priority.get()
+
+
+def parse_retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Seconds to back off from retry-after-ms / retry-after headers, if present."""
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(float(value) * scale, 0.0)
+        except ValueError:
+            continue  # HTTP-date form; fall back to the default backoff
+    return None
+
+
+class ModelScheduler:
+    """Admission control for model API requests shared by every client.
+
+    Requests wait for a slot in an adaptive concurrency window (AIMD): each
+    success widens the window by about one request per window's worth of
+    successes, and a 429 halves it and pauses admissions for the provider's
+    retry-after. Tokens sent in the last minute are accounted, and with a
+    tokens-per-minute limit set, requests wait until the minute has room.
+    Waiting requests are admitted by priority (live turns before background
+    work), then in arrival order.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        tokens_per_minute: int = 0,
+        decrease_factor: float = 0.5,
+        default_backoff_seconds: float = 1.0,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min(initial_limit, max_limit), min_limit))
+        self.tokens_per_minute = tokens_per_minute
+        self.decrease_factor = decrease_factor
+        self.default_backoff_seconds = default_backoff_seconds
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._token_log: Deque[Tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.admitted = 0
+        self.rate_limited = 0
+        self._waits: Deque[float] = deque(maxlen=500)
+
+    async def acquire(self, tokens: int = 0, priority: Optional[int] = None) -> "SchedulerSlot":
+        """
+        Wait for a slot.
+
+        Args:
+            tokens: Estimated tokens the request uses (for per-minute accounting)
+            priority: Request priority (defaults to the context's priority)
+
+        Returns:
+            Slot to release once the request has finished
+        """
+        priority = current_priority() if priority is None else priority
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), tokens, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller gave up; hand the slot back
+                self._release(None)
+            else:
+                self._waiters = [w for w in self._waiters if w[3] is not future]
+                heapq.heapify(self._waiters)
+            raise
+        self._waits.append(time.monotonic() - started)
+        return SchedulerSlot(self)
+
+    def _dispatch(self) -> None:
+        """Admit waiting requests while the window, pause and token budget allow."""
+        now = time.monotonic()
+        self._expire_tokens(now)
+        while self._waiters:
+            if self._waiters[0][3].done():
+                heapq.heappop(self._waiters)  # Cancelled while waiting
+                continue
+            if self.in_flight >= int(self.limit):
+                return  # A release will dispatch again
+            if now < self._paused_until:
+                self._wake_at(self._paused_until)
+                return
+            tokens = self._waiters[0][2]
+            if (
+                self.tokens_per_minute
+                and self._token_log
+                and self._tokens_in_window + tokens > self.tokens_per_minute
+            ):
+                self._wake_at(self._token_log[0][0] + 60.0)
+                return
+
+            _, _, tokens, future = heapq.heappop(self._waiters)
+            self.in_flight += 1
+            self.admitted += 1
+            if tokens:
+                self._token_log.append((now, tokens))
+                self._tokens_in_window += tokens
+            future.set_result(None)
+
+    def _wake_at(self, when: float) -> None:
+        """Dispatch again at a monotonic time."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        loop = asyncio.get_running_loop()
+        self._wakeup = loop.call_later(max(when - time.monotonic(), 0.0), self._dispatch)
+
+    def _expire_tokens(self, now: float) -> None:
+        while self._token_log and self._token_log[0][0] <= now - 60.0:
+            self._tokens_in_window -= self._token_log.popleft()[1]
+
+    def _release(self, status_code: Optional[int], retry_after: Optional[float] = None) -> None:
+        """Free a slot and adapt the window to how the request went."""
+        self.in_flight -= 1
+        if status_code == 429:
+            self.rate_limited += 1
+            self.limit = max(self.limit * self.decrease_factor, float(self.min_limit))
+            backoff = retry_after if retry_after is not None else self.default_backoff_seconds
+            self._paused_until = max(self._paused_until, time.monotonic() + backoff)
+            logger.warning(
+                f"[MODEL SCHEDULER] Rate limited; window now {int(self.limit)}, "
+                f"pausing {backoff:.1f}s"
+            )
+        elif status_code is not None and status_code < 500:
+            self.limit = min(self.limit + 1.0 / self.limit, float(self.max_limit))
+        try:
+            self._dispatch()
+        except RuntimeError:
+            pass  # Released outside a running loop (e.g. at shutdown)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue and window metrics for the health endpoint."""
+        self._expire_tokens(time.monotonic())
+        waits = sorted(self._waits)
+        depth: Dict[str, int] = {name: 0 for name in _PRIORITY_NAMES.values()}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                name = _PRIORITY_NAMES.get(priority, str(priority))
+                depth[name] = depth.get(name, 0) + 1
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": sum(depth.values()),
+            "queue_depth_by_priority": depth,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "paused_for_seconds": round(max(self._paused_until - time.monotonic(), 0.0), 3),
+            "tokens_last_minute": self._tokens_in_window,
+            "tokens_per_minute_limit": self.tokens_per_minute or None,
+            "wait_avg_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else None,
+            "wait_p95_ms": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 1) if waits else None,
+        }
+
+
+class SchedulerSlot:
+    """An admitted request's place in the window."""
+
+    def __init__(self, scheduler: ModelScheduler):
+        self._scheduler = scheduler
+        self._released = False
+
+    def release(self, status_code: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        """Give the slot back (only the first call counts)."""
+        if not self._released:
+            self._released = True
+            self._scheduler._release(status_code, retry_after)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees the scheduler slot once it has been read or closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close()
+
+
+class ScheduledTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends model API requests through a ModelScheduler.
+
+    Requests to other hosts (e.g. Twilio recording downloads on the shared
+    pool) pass straight through. A slot is held until the response body has
+    been consumed, so streamed completions count for their whole duration.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        scheduler: ModelScheduler,
+        hosts: Tuple[str, ...] = ("api.openai.com",),
+    ):
+        self._transport = transport
+        self.scheduler = scheduler
+        self.hosts = hosts
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host not in self.hosts:
+            return await self._transport.handle_async_request(request)
+
+        tokens = 0
+        if request.headers.get("content-type", "").startswith("application/json"):
+            tokens = len(request.content) // _BYTES_PER_TOKEN
+        slot = await self.scheduler.acquire(tokens)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slot.release()
+            raise
+
+        status_code = response.status_code
+        retry_after = parse_retry_after(response.headers) if status_code == 429 else None
+        return httpx.Response(
+            status_code=status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, lambda: slot.release(status_code, retry_after)),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
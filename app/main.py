@@ -5,9 +5,18 @@ from fastapi.responses import FileResponse, RedirectResponse
 from contextlib import asynccontextmanager
 import os
 
-from app.core.logging import setup_logging
-from app.db.database import init_db
-from app.api import health, webhooks, orders, menu, auth
+from app.core.config import settings
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.metrics import MetricsMiddleware
+from app.core.dependencies import (
+    get_session_store,
+    get_model_clients,
+    close_model_clients,
+    get_call_record_writer,
+)
+from app.db.database import init_db, AsyncSessionLocal
+from app.api import health, webhooks, orders, menu, auth, calls
+from app.services.call_session.reaper import SessionReaper
 
 
 @asynccontextmanager
@@ -16,9 +25,30 @@ async def lifespan(app: FastAPI):
     # Startup
     setup_logging()
     await init_db()
+
+    # One OpenAI client and keep-alive pool for every request in this process
+    get_model_clients()
+
+    # Evict sessions whose status callback never arrived
+    session_reaper = SessionReaper(
+        get_session_store(),
+        AsyncSessionLocal,
+        idle_ttl_seconds=settings.session_idle_ttl_seconds,
+        max_sessions=settings.session_reaper_max_sessions,
+        max_bytes=settings.session_reaper_max_bytes,
+        interval_seconds=settings.session_reaper_interval_seconds,
+    )
+    session_reaper.start()
+    app.state.session_reaper = session_reaper
+
     yield
+
     # Shutdown
-    pass
+    await session_reaper.stop()
+    await get_call_record_writer().drain()
+    await get_session_store().close()
+    await close_model_clients()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -28,12 +58,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Time every HTTP request by route for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers (must be before static file mounting to take precedence)
 app.include_router(auth.router, tags=["auth"])  # Auth endpoints (no protection needed)
 app.include_router(health.router, tags=["health"])  # Health check (no protection needed)
 app.include_router(webhooks.voice.router, prefix="/webhooks", tags=["webhooks"])  # Twilio webhooks (no protection needed)
 app.include_router(orders.router, tags=["orders"], dependencies=[Depends(auth.require_auth)])  # Protected
 app.include_router(menu.router, tags=["menu"], dependencies=[Depends(auth.require_auth)])  # Protected
+app.include_router(calls.router, tags=["calls"], dependencies=[Depends(auth.require_auth)])  # Protected
 
 # Mount static files (for frontend)
 static_dir = os.path.join(os.path.dirname(__file__), "static")
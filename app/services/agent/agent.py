@@ -1,24 +1,113 @@
 """LLM agent service."""
+import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Awaitable, Callable, List, Optional
 from openai import AsyncOpenAI
 from app.core.config import settings
+from app.core.metrics import AGENT_ERRORS, AGENT_FALLBACKS, LLM_REQUEST_SECONDS
 from app.services.agent.state import ConversationState
-from app.services.agent.prompt import get_system_prompt, get_user_prompt
+from app.services.agent.prompt import PromptCompiler, get_user_prompt
+from app.services.agent.context import ContextBuilder
+from app.services.agent.json_stream import JsonObjectStream
+from app.services.agent.llm import (
+    LLMBackend,
+    LLMError,
+    LLMRateLimitError,
+    LLMTimeoutError,
+    RuleBasedBackend,
+    create_llm_backend,
+)
+from app.services.agent.deadline import current_deadline
+from app.services.agent.debug_events import record_debug_event
+from app.services.agent.hedging import HedgedCaller
+from app.services.agent.circuit_breaker import CircuitBreaker
+from app.services.agent.constants import DEADLINE_FALLBACK_RESPONSES
 from app.services.agent.stages import ConversationStage
 from app.services.agent.stage_transitions import StageTransitionHandler
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.response_cache import ResponseCache, make_cache_key
 from app.services.menu.repository import MenuRepository
+from app.core.dependencies import (
+    get_model_clients,
+    get_fast_path_matcher,
+    get_llm_circuit_breaker,
+    get_llm_hedger,
+    get_prompt_compiler,
+    get_response_cache,
+)
 
 logger = logging.getLogger(__name__)
 
+# Intents reported as metric labels (anything else the LLM returns is counted as "other")
+METRIC_INTENTS = frozenset({
+    "greeting", "ordering", "adding_item", "asking_question", "reviewing",
+    "revising", "confirming_order", "completing", "concluding",
+})
+
+# Called with the spoken response as soon as it has been generated
+ResponseCallback = Callable[[str], Awaitable[None]]
+
+
+def _describe_order(state: ConversationState) -> List[Dict[str, Any]]:
+    """Order items in a compact form for debug logs."""
+    return [
+        {"name": item.item_name, "qty": item.quantity, "mods": item.modifiers}
+        for item in state.current_order
+    ]
+
 
 class AgentService:
     """Service for LLM-powered conversation agent."""
 
-    def __init__(self, menu_repository: MenuRepository):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(
+        self,
+        menu_repository: MenuRepository,
+        client: Optional[AsyncOpenAI] = None,
+        fast_path: Optional[FastPathMatcher] = None,
+        response_cache: Optional[ResponseCache] = None,
+        prompt_compiler: Optional[PromptCompiler] = None,
+        backend: Optional[LLMBackend] = None,
+        hedger: Optional[HedgedCaller] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        if backend is None:
+            if settings.llm_backend == "openai":
+                client = client or get_model_clients().openai
+            backend = create_llm_backend(
+                settings.llm_backend,
+                client=client,
+                menu_repository=menu_repository,
+                model=settings.llm_model,
+                temperature=settings.llm_temperature,
+                latency_ms=settings.llm_stub_latency_ms,
+                latency_jitter_ms=settings.llm_stub_latency_jitter_ms,
+                latency_distribution=settings.llm_stub_latency_distribution,
+                timeout_rate=settings.llm_stub_timeout_rate,
+                timeout_ms=settings.openai_timeout_seconds * 1000,
+                rate_limit_rate=settings.llm_stub_rate_limit_rate,
+                malformed_rate=settings.llm_stub_malformed_rate,
+                seed=settings.llm_stub_seed,
+            )
+        self.client = client
+        self.backend = backend
+        self.hedger = hedger if hedger is not None else get_llm_hedger()
+        if breaker is None and settings.llm_circuit_breaker_enabled:
+            breaker = get_llm_circuit_breaker()
+        self.breaker = breaker
+        # Menu-driven answers while the breaker is open, so calls can still complete;
+        # strict, so anything the extractor can't fully account for is asked again
+        self.degraded_backend = RuleBasedBackend(menu_repository, strict=True)
         self.menu_repository = menu_repository
+        self.fast_path = fast_path if fast_path is not None else get_fast_path_matcher()
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+        self.prompt_compiler = prompt_compiler if prompt_compiler is not None else get_prompt_compiler()
+        self.context_builder = ContextBuilder(
+            token_budget=settings.context_token_budget,
+            summary_max_tokens=settings.context_summary_max_tokens,
+            min_recent_turns=settings.context_min_recent_turns,
+        )
 
     async def initialize_state(
         self, call_sid: str, menu_text: str, item_requirements_text: str = ""
@@ -34,77 +123,202 @@ class AgentService:
         return state
 
     async def process_user_input(
-        self, state: ConversationState, user_input: str
+        self,
+        state: ConversationState,
+        user_input: str,
+        on_response: Optional[ResponseCallback] = None,
     ) -> Dict[str, Any]:
         """
         Process user input and generate agent response.
 
+        Args:
+            state: Conversation state (updated in place)
+            user_input: What the caller said
+            on_response: With LLM streaming on, called with the LLM's spoken
+                response as soon as it is generated, before intent and action
+                arrive. Stage transitions may still change the final response.
+
         Returns:
             Dict with 'response' (text to speak) and 'action' (structured action)
         """
         # Add user input to transcript
         state.add_transcript_turn("Customer", user_input)
+        record_debug_event("agent_input", utterance=user_input, stage=state.stage.value)
+
+        # Routine turns ("that's all", "yes that's right", plain orders) are resolved locally
+        fast_response = None
+        if settings.fast_path_enabled:
+            extractor = None
+            if settings.menu_extraction_enabled:
+                extractor = await self.menu_repository.get_entity_extractor()
+            fast_response = self.fast_path.match(state, user_input, extractor)
+
+        if fast_response is not None:
+            record_debug_event("fast_path", response=fast_response)
+            llm_response = fast_response
+        else:
+            llm_response = await self._call_llm(state, user_input, on_response)
+            if llm_response.get("error"):
+                # Return error response with error flag to prevent stage transitions
+                return llm_response
+
+        user_input_lower = user_input.lower().strip()
+
+        # Use LLM response directly (simple approach)
+        # Note: ConversationFlowManager/ItemCustomizationState exist but are intentionally unused
+        # Current design: LLM extracts modifiers directly, then pending_modifiers system asks once if needed
+        agent_response = llm_response
+
+        # Add agent response to transcript (before stage transitions modify it)
+        state.add_transcript_turn("Agent", agent_response.get("response", ""))
+
+        # Handle stage transitions using centralized handler
+        intent = agent_response.get("intent", "")
+        StageTransitionHandler.handle_stage_transitions(
+            state, user_input_lower, intent, agent_response
+        )
+        
+        logger.info(
+            "[AGENT OUTPUT] '%s' (intent %s, stage %s)",
+            agent_response.get("response", ""),
+            intent,
+            state.stage.value,
+        )
+        # ===== DETAILED LOGGING: AGENT OUTPUT (DEBUG only) =====
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[AGENT OUTPUT] Action: %s", json.dumps(agent_response.get("action", {})))
+            logger.debug(
+                "[AGENT OUTPUT] Final Pending Modifiers Item: %s",
+                state.pending_modifiers_item_name or "NONE",
+            )
+            logger.debug("[AGENT OUTPUT] Final Order Items: %s", _describe_order(state))
+        record_debug_event(
+            "agent_output",
+            response=agent_response.get("response", ""),
+            intent=intent,
+            action=agent_response.get("action"),
+            stage=state.stage.value,
+            order=_describe_order(state),
+        )
 
+        return agent_response
+    
+    async def _call_llm(
+        self,
+        state: ConversationState,
+        user_input: str,
+        on_response: Optional[ResponseCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Ask the LLM for the response, intent and action for a turn.
+
+        Returns:
+            Parsed LLM response, or a fallback response with "error": True
+        """
         # Get menu text if not already loaded
         if not state.menu_context:
             menu_text = await self.menu_repository.get_menu_text()
             state.menu_context = menu_text
 
-        # Build conversation context (use sliding window to reduce latency)
-        context = state.get_recent_transcript(max_turns=6)  # Keep last 6 turns for context
+        # Build conversation context within a token budget (older turns are summarized)
+        context = self.context_builder.build(state)
         order_summary = state.get_order_summary()
         menu_text = state.menu_context  # Use cached menu from state (already loaded above)
 
-        # ===== COMPREHENSIVE LOGGING: AGENT INPUTS =====
-        logger.info("=" * 80)
-        logger.info(f"[AGENT INPUT] CallSid: {state.call_sid}")
-        logger.info(f"[AGENT INPUT] User Input: '{user_input}'")
-        logger.info(f"[AGENT INPUT] Current Stage: {state.stage.value}")
-        logger.info(f"[AGENT INPUT] Current Order Summary:\n{order_summary}")
-        logger.info(f"[AGENT INPUT] Pending Modifiers Item: {state.pending_modifiers_item_name or 'NONE'}")
-        logger.info(f"[AGENT INPUT] Current Order Items: {[{'name': item.item_name, 'qty': item.quantity, 'mods': item.modifiers} for item in state.current_order]}")
-        logger.info("=" * 80)
-        
-        # Get system and user prompts (simplified)
-        system_prompt = get_system_prompt(menu_text)
+        logger.info("[AGENT INPUT] '%s' in stage %s", user_input, state.stage.value)
+        # ===== DETAILED LOGGING: AGENT INPUTS (DEBUG only; kept off the hot path) =====
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[AGENT INPUT] Current Order Summary:\n%s", order_summary)
+            logger.debug(
+                "[AGENT INPUT] Pending Modifiers Item: %s", state.pending_modifiers_item_name or "NONE"
+            )
+            logger.debug("[AGENT INPUT] Current Order Items: %s", _describe_order(state))
+
+        # Identical turns on other calls (same stage, utterance, order and menu) reuse the result
+        cache_key = None
+        if settings.response_cache_enabled:
+            cache_key = make_cache_key(self.menu_repository.get_menu_version(), state, user_input)
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response is not None:
+                logger.info("[AGENT] Response cache hit for '%s' in stage %s", user_input, state.stage.value)
+                record_debug_event("llm_cache_hit", response=cached_response)
+                return cached_response
 
+        # System prompt is compiled once per menu; only the user prompt changes per turn
         user_prompt = get_user_prompt(
             context,
             user_input,
             conversation_stage=state.stage,
             current_order_summary=order_summary,
         )
+        messages = self.prompt_compiler.build_messages(menu_text, user_prompt)
+        record_debug_event(
+            "llm_prompt",
+            user_prompt=user_prompt,
+            pending_modifiers=state.pending_modifiers_item_name,
+            system_prompt_chars=len(messages[0]["content"]),
+        )
 
-        # ===== LOGGING: PROMPTS SENT TO LLM =====
-        logger.info("=" * 80)
-        logger.info(f"[AGENT PROMPT] System Prompt Length: {len(system_prompt)} chars")
-        logger.info(f"[AGENT PROMPT] User Prompt:\n{user_prompt}")
-        logger.info("=" * 80)
+        # ===== LOGGING: PROMPTS SENT TO LLM (DEBUG only) =====
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[AGENT PROMPT] System Prompt Length: %d chars", len(messages[0]["content"]))
+            logger.debug("[AGENT PROMPT] User Prompt:\n%s", user_prompt)
+
+        # While the LLM is failing, answer from the menu instead of waiting on it
+        if self.breaker is not None and not self.breaker.allow_request():
+            record_debug_event("llm_skipped", reason="circuit_open")
+            AGENT_FALLBACKS.inc("degraded")
+            return await self._degraded_response(state, messages)
 
         # Call LLM to extract item names and general intent
+        # Bounded by the turn's latency budget (set by the session manager)
+        deadline = current_deadline()
+        started = time.perf_counter()
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.5,  # Lowered from 0.7 for faster, more deterministic responses
-                response_format={"type": "json_object"},
-            )
+            if on_response is not None and settings.llm_streaming_enabled:
+                try:
+                    content = await asyncio.wait_for(
+                        self._stream_completion(messages, on_response),
+                        deadline.remaining() if deadline is not None else None,
+                    )
+                except asyncio.TimeoutError:
+                    raise LLMTimeoutError("Turn budget exhausted while streaming")
+            else:
+                # A slow first request gets a hedged second one; the first answer wins
+                completion = await self.hedger.call(lambda: self.backend.complete(messages), deadline)
 
-            # Parse LLM response
-            content = response.choices[0].message.content
+                usage = self.prompt_compiler.record_usage(completion.usage)
+                logger.info(
+                    "[AGENT PROMPT] Prompt tokens: %s, cached: %s",
+                    usage["prompt_tokens"],
+                    usage["cached_tokens"],
+                )
+                content = completion.content
+
+            record_debug_event("llm_output", content=content)
+
+            # Parse LLM response; garbage counts against the breaker like an error
             llm_response = json.loads(content)
+            if not isinstance(llm_response, dict):
+                raise json.JSONDecodeError("Expected a JSON object", content, 0)
+            if self.breaker is not None:
+                self.breaker.record_success()
+            intent = llm_response.get("intent")
+            LLM_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                state.stage.value,
+                intent if intent in METRIC_INTENTS else "other",
+            )
 
-            # ===== LOGGING: LLM OUTPUT =====
-            logger.info("=" * 80)
-            logger.info(f"[AGENT LLM OUTPUT] Raw Response: {content}")
-            logger.info(f"[AGENT LLM OUTPUT] Parsed JSON: {json.dumps(llm_response, indent=2)}")
-            logger.info("=" * 80)
+            # ===== LOGGING: LLM OUTPUT (DEBUG only) =====
+            logger.debug("[AGENT LLM OUTPUT] Raw Response: %s", content)
         except json.JSONDecodeError as e:
+            record_debug_event("llm_error", error=f"JSONDecodeError: {e}")
+            AGENT_ERRORS.inc("malformed_json")
             logger.error(f"[AGENT] JSON decode error: {e}")
             logger.error(f"[AGENT] Content that failed to parse: {content if 'content' in locals() else 'N/A'}")
+            if self.breaker is not None:
+                self.breaker.record_failure()
             # Return error response with error flag to prevent stage transitions
             return {
                 "response": "I'm sorry, I didn't quite catch that. Could you please repeat what you'd like?",
@@ -112,8 +326,39 @@ class AgentService:
                 "action": {"type": "none"},
                 "error": True,  # Flag to prevent stage transitions
             }
+        except LLMTimeoutError as e:
+            record_debug_event("llm_error", error=f"LLMTimeoutError: {e}")
+            AGENT_ERRORS.inc("timeout")
+            AGENT_FALLBACKS.inc("deadline")
+            logger.error(f"[AGENT] LLM timed out in stage {state.stage.value}: {e}")
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            return {
+                "response": DEADLINE_FALLBACK_RESPONSES.get(
+                    state.stage.value, DEADLINE_FALLBACK_RESPONSES["ordering"]
+                ),
+                "intent": "asking_question",
+                "action": {"type": "none"},
+                "error": True,  # Flag to prevent stage transitions
+            }
+        except LLMError as e:
+            record_debug_event("llm_error", error=f"{type(e).__name__}: {e}")
+            AGENT_ERRORS.inc("rate_limited" if isinstance(e, LLMRateLimitError) else "llm")
+            logger.error(f"[AGENT] LLM call failed ({type(e).__name__}): {e}")
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            return {
+                "response": "I'm having trouble processing that. Could you please say that again?",
+                "intent": "asking_question",
+                "action": {"type": "none"},
+                "error": True,  # Flag to prevent stage transitions
+            }
         except Exception as e:
+            record_debug_event("llm_error", error=f"{type(e).__name__}: {e}")
+            AGENT_ERRORS.inc("unexpected")
             logger.error(f"[AGENT] Error processing user input: {e}", exc_info=True)
+            if self.breaker is not None:
+                self.breaker.record_failure()
             # Return generic error response with error flag
             return {
                 "response": "I'm having trouble processing that. Could you please say that again?",
@@ -122,45 +367,50 @@ class AgentService:
                 "error": True,  # Flag to prevent stage transitions
             }
 
-        user_input_lower = user_input.lower().strip()
+        if cache_key is not None:
+            self.response_cache.set(cache_key, llm_response)
+        return llm_response
 
-        # Use LLM response directly (simple approach)
-        # Note: ConversationFlowManager/ItemCustomizationState exist but are intentionally unused
-        # Current design: LLM extracts modifiers directly, then pending_modifiers system asks once if needed
-        agent_response = llm_response
+    async def _degraded_response(
+        self, state: ConversationState, messages: List[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """Answer a turn from the menu while the LLM breaker is open (never cached)."""
+        logger.warning(
+            f"[AGENT] LLM circuit open, answering from the menu in stage {state.stage.value}"
+        )
+        completion = await self.degraded_backend.complete(messages)
+        return json.loads(completion.content)
 
-        # Add agent response to transcript (before stage transitions modify it)
-        state.add_transcript_turn("Agent", agent_response.get("response", ""))
+    async def _stream_completion(
+        self, messages: List[Dict[str, str]], on_response: ResponseCallback
+    ) -> str:
+        """
+        Stream the completion, handing over the spoken response as soon as it closes.
+
+        Returns:
+            The full completion text
+        """
+        parser = JsonObjectStream()
+        async for delta in self.backend.stream(messages):
+            for key, value in parser.feed(delta):
+                if key == "response":
+                    logger.info("[AGENT] Streamed response ready: '%s'", value)
+                    try:
+                        await on_response(value)
+                    except Exception as e:
+                        logger.warning(f"[AGENT] Early response callback failed: {e}")
+        return parser.text()
+
+    def get_greeting_text(self) -> str:
+        """Get the greeting spoken when a call is answered (constant per restaurant)."""
+        return f"Hi! Thanks for calling {settings.restaurant_name}. What can I get for you today?"
 
-        # Handle stage transitions using centralized handler
-        intent = agent_response.get("intent", "")
-        StageTransitionHandler.handle_stage_transitions(
-            state, user_input_lower, intent, agent_response
-        )
-        
-        # ===== LOGGING: AGENT OUTPUT =====
-        logger.info("=" * 80)
-        logger.info(f"[AGENT OUTPUT] Final Response: '{agent_response.get('response', '')}'")
-        logger.info(f"[AGENT OUTPUT] Intent: {agent_response.get('intent', '')}")
-        logger.info(f"[AGENT OUTPUT] Action: {json.dumps(agent_response.get('action', {}), indent=2)}")
-        logger.info(f"[AGENT OUTPUT] Final Stage: {state.stage.value}")
-        logger.info(f"[AGENT OUTPUT] Final Pending Modifiers Item: {state.pending_modifiers_item_name or 'NONE'}")
-        logger.info(f"[AGENT OUTPUT] Final Order Items: {[{'name': item.item_name, 'qty': item.quantity, 'mods': item.modifiers} for item in state.current_order]}")
-        logger.info("=" * 80)
-        
-        return agent_response
-    
     async def get_greeting(self, state: ConversationState) -> str:
         """Get initial greeting message."""
-        menu_text = await self.menu_repository.get_menu_text()
-        
-        if not state.menu_context:
-            state.menu_context = menu_text
-
-        greeting = f"Hi! Thanks for calling {settings.restaurant_name}. What can I get for you today?"
+        # Menu text is loaded lazily on the first turn, keeping pickup free of lookups
+        greeting = self.get_greeting_text()
 
         state.add_transcript_turn("Agent", greeting)
         # Stage will transition to ORDERING after first user input
 
         return greeting
-
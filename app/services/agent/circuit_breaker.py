@@ -0,0 +1,123 @@
+"""Circuit breaker for LLM calls."""
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Breaker states
+CLOSED = "closed"  # LLM calls go through
+OPEN = "open"  # LLM calls are skipped; turns are answered in degraded mode
+HALF_OPEN = "half_open"  # A few probe calls test whether the LLM is back
+
+
+class CircuitBreaker:
+    """Stops calling the LLM while it is failing.
+
+    Outcomes of recent calls are kept in a rolling window. Once at least
+    min_calls outcomes are in it and the failure rate reaches the threshold,
+    the breaker opens and allow_request() returns False, so turns skip the
+    call instead of waiting on a request that will fail. After open_seconds
+    it lets up to half_open_probes calls through: a success closes it again,
+    a failure reopens it for another open_seconds. A probe that never
+    reports back (its turn was cancelled) is given up on after open_seconds.
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True for a failure
+        self._opened_at = 0.0
+        self._half_opened_at = 0.0
+        self._probes_in_flight = 0
+        self.rejected = 0
+        self.transitions: Deque[Tuple[float, str, str]] = deque(maxlen=20)
+
+    def allow_request(self) -> bool:
+        """Whether the next LLM call should be made (call record_* with its outcome)."""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self._half_opened_at = time.monotonic()
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if (
+                self._probes_in_flight >= self.half_open_probes
+                and time.monotonic() - self._half_opened_at >= self.open_seconds
+            ):
+                self._probes_in_flight = 0  # Probes lost to cancelled turns
+                self._half_opened_at = time.monotonic()
+            if self._probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def record_success(self) -> None:
+        """Record a call that got an answer."""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            self._outcomes.clear()
+            self._transition(CLOSED)
+        self._outcomes.append(False)
+
+    def record_failure(self) -> None:
+        """Record a call that failed (error, rate limit or timeout)."""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            self._open()
+            return
+        self._outcomes.append(True)
+        if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+            if self.failure_rate() >= self.failure_rate_threshold:
+                self._open()
+
+    def failure_rate(self) -> float:
+        """Share of failures in the window (0 if empty)."""
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"[CIRCUIT BREAKER] LLM breaker {self.state} -> {state}")
+        self.transitions.append((time.time(), self.state, state))
+        self.state = state
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and recent transitions for the health endpoint."""
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(self.open_seconds - (time.monotonic() - self._opened_at), 0.0), 1)
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "window_calls": len(self._outcomes),
+            "rejected": self.rejected,
+            "probe_in": retry_in,
+            "transitions": [
+                {
+                    "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(at)),
+                    "from": old,
+                    "to": new,
+                }
+                for at, old, new in self.transitions
+            ],
+        }
@@ -53,3 +53,13 @@ NO_RESPONSE_INDICATORS = [
     "that's fine",
 ]
 
+
+# What to say when the turn's latency budget runs out before the LLM answers,
+# by conversation stage (keyed by stage value)
+DEADLINE_FALLBACK_RESPONSES = {
+    "greeting": "Sorry, could you say that one more time?",
+    "ordering": "Sorry, I missed that. What would you like to order?",
+    "review": "Sorry, I didn't catch that. Does your order sound right?",
+    "revision": "Sorry, what would you like to change?",
+    "conclusion": "Thanks for calling!",
+}
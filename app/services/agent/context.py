@@ -0,0 +1,113 @@
+"""Token-budgeted conversation context for LLM prompts."""
+import logging
+import re
+from typing import List
+
+from app.services.agent.state import ConversationState
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers and single punctuation marks; long words count as several tokens
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_CHARS_PER_TOKEN = 6
+
+# Customer lines are clipped to this many words when folded into the summary
+SUMMARY_WORDS_PER_TURN = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer.
+
+    Close enough to BPE counts for English to budget prompts with, and cheap
+    enough to run on every turn.
+    """
+    return sum(
+        (len(piece) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+        for piece in _TOKEN_PATTERN.findall(text)
+    )
+
+
+def _clip_words(text: str, max_words: int) -> str:
+    """Keep the first max_words words of a text."""
+    words = text.split()
+    if len(words) <= max_words:
+        return text
+    return " ".join(words[:max_words]) + " ..."
+
+
+def summarize_turn(turn: str) -> str:
+    """
+    Compact summary line for a transcript turn, or "" to drop it.
+
+    Agent lines are dropped: what the agent did is captured in the order
+    itself. Customer lines are kept (clipped) because they carry preferences
+    like "no onions on everything" that outlive the turn they were said in.
+    """
+    role, _, text = turn.partition(": ")
+    if role != "Customer" or not text.strip():
+        return ""
+    return f"- Customer said: {_clip_words(text.strip(), SUMMARY_WORDS_PER_TURN)}"
+
+
+class ContextBuilder:
+    """Fills a token budget with the most recent turns and a running summary.
+
+    Turns that no longer fit are folded, oldest first, into
+    ``state.context_summary`` and never revisited, so each turn only pays for
+    the turns that just fell out of the window. The summary is capped too
+    (oldest lines go first), which keeps prompt size flat however long the
+    call runs.
+    """
+
+    def __init__(self, token_budget: int = 600, summary_max_tokens: int = 150, min_recent_turns: int = 2):
+        self.token_budget = token_budget
+        self.summary_max_tokens = summary_max_tokens
+        self.min_recent_turns = min_recent_turns
+
+    def build(self, state: ConversationState) -> str:
+        """
+        Get the conversation context for the next prompt, updating the summary.
+
+        Returns:
+            Summary of earlier turns (if any) followed by the recent transcript
+        """
+        # The summary has its own cap; recent turns get the rest of the budget
+        recent_budget = max(self.token_budget - self.summary_max_tokens, 1)
+        window = state.transcript[state.summarized_turn_count:]
+        # Long turns are clipped when rendered, so count them at their clipped size
+        max_turn_tokens = max(recent_budget // 2, 1)
+        window_tokens = [min(estimate_tokens(turn), max_turn_tokens) for turn in window]
+
+        folded: List[str] = []
+        total = sum(window_tokens)
+        while len(window) > self.min_recent_turns and total > recent_budget:
+            folded.append(window.pop(0))
+            total -= window_tokens.pop(0)
+            state.summarized_turn_count += 1
+
+        if folded:
+            self._fold(state, folded)
+            logger.debug(
+                f"[CONTEXT] Folded {len(folded)} turns into the summary for call {state.call_sid} "
+                f"({state.summarized_turn_count} summarized)"
+            )
+
+        lines = []
+        if state.context_summary:
+            lines.append("Earlier in the call:")
+            lines.append(state.context_summary)
+            lines.append("Recent turns:")
+        for turn, tokens in zip(window, window_tokens):
+            if estimate_tokens(turn) > tokens:
+                turn = _clip_words(turn, tokens)
+            lines.append(turn)
+        return "\n".join(lines)
+
+    def _fold(self, state: ConversationState, turns: List[str]) -> None:
+        """Append summary lines for turns leaving the window, trimming the oldest to fit."""
+        summary = [line for line in state.context_summary.split("\n") if line]
+        summary.extend(line for line in (summarize_turn(turn) for turn in turns) if line)
+        while len(summary) > 1 and estimate_tokens("\n".join(summary)) > self.summary_max_tokens:
+            summary.pop(0)
+        state.context_summary = "\n".join(summary)
@@ -0,0 +1,52 @@
+"""Per-turn latency budgets."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class Deadline:
+    """A point in time a turn has to be answered by."""
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    @classmethod
+    def start(cls, budget_seconds: Optional[float]) -> Optional["Deadline"]:
+        """Start a deadline now (None if the budget is unset or <= 0)."""
+        if not budget_seconds or budget_seconds <= 0:
+            return None
+        return cls(budget_seconds)
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("turn_deadline", default=None)
+
+
+@contextmanager
+def turn_deadline(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    Make a deadline current for the turn running in this context.
+
+    Code called from the turn (the agent, LLM calls) reads it with
+    current_deadline(), so the budget doesn't have to be passed through
+    every signature.
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the turn running in this context, if any."""
+    return _current_deadline.get()
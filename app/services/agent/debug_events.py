@@ -0,0 +1,133 @@
+"""Per-call ring buffer of debug events, written out only when a call goes wrong."""
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Longest string kept in an event field (prompts are clipped, not dropped)
+MAX_FIELD_CHARS = 4000
+
+
+class DebugRingBuffer:
+    """The last few turns' diagnostics for one call.
+
+    Recording an event only stores references to values that already exist
+    (prompt text, raw LLM output), so healthy turns pay for a dict and a
+    deque append. Nothing is formatted or written until flush() is called
+    on an error path or by an operator.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+
+    def record(self, kind: str, **fields: Any) -> None:
+        """Add an event (the oldest is dropped when full)."""
+        self._events.append({"at": time.time(), "kind": kind, **fields})
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Events oldest first, with long strings clipped."""
+        return [
+            {key: _clip(value) for key, value in event.items()}
+            for event in self._events
+        ]
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def flush(self, call_sid: str, reason: str, dump_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Write the buffered events out.
+
+        Args:
+            call_sid: Call the events belong to
+            reason: Why they are being written (error, turn_limit, ...)
+            dump_dir: Directory for a JSON file per flush; the log is used if unset
+
+        Returns:
+            The events written
+        """
+        events = self.events()
+        if dump_dir:
+            os.makedirs(dump_dir, exist_ok=True)
+            path = os.path.join(dump_dir, f"{call_sid}-{int(time.time() * 1000)}-{reason}.json")
+            with open(path, "w") as f:
+                json.dump({"call_sid": call_sid, "reason": reason, "events": events}, f, default=str)
+            logger.warning(f"[DEBUG EVENTS] Wrote {len(events)} events for call {call_sid} ({reason}) to {path}")
+            return events
+
+        logger.warning(f"[DEBUG EVENTS] Flushing {len(events)} events for call {call_sid} ({reason})")
+        for event in events:
+            logger.warning("[DEBUG EVENTS] %s", json.dumps(event, default=str))
+        return events
+
+
+class DebugBufferRegistry:
+    """Debug buffers of the calls this process is handling.
+
+    Buffers stay in process memory rather than in the session store: they
+    are only read when something goes wrong, so shipping them to a shared
+    store on every turn would cost more than they are worth. The least
+    recently used call's buffer is dropped beyond max_calls.
+    """
+
+    def __init__(self, capacity: int = 64, max_calls: int = 1000):
+        self.capacity = capacity
+        self.max_calls = max_calls
+        self._buffers: "OrderedDict[str, DebugRingBuffer]" = OrderedDict()
+
+    def for_call(self, call_sid: str) -> DebugRingBuffer:
+        """The call's buffer, created on first use."""
+        buffer = self._buffers.get(call_sid)
+        if buffer is None:
+            buffer = self._buffers[call_sid] = DebugRingBuffer(self.capacity)
+            while len(self._buffers) > self.max_calls:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(call_sid)
+        return buffer
+
+    def get(self, call_sid: str) -> Optional[DebugRingBuffer]:
+        """The call's buffer, if this process has one."""
+        return self._buffers.get(call_sid)
+
+    def discard(self, call_sid: str) -> None:
+        self._buffers.pop(call_sid, None)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+
+def _clip(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > MAX_FIELD_CHARS:
+        return value[:MAX_FIELD_CHARS] + "..."
+    return value
+
+
+_current_buffer: ContextVar[Optional[DebugRingBuffer]] = ContextVar("debug_events", default=None)
+
+
+@contextmanager
+def debug_events(buffer: Optional[DebugRingBuffer]) -> Iterator[None]:
+    """Send debug events recorded in this context to a call's buffer."""
+    token = _current_buffer.set(buffer)
+    try:
+        yield
+    finally:
+        _current_buffer.reset(token)
+
+
+def record_debug_event(kind: str, **fields: Any) -> None:
+    """Record an event in the current call's buffer (no-op outside a turn)."""
+    buffer = _current_buffer.get()
+    if buffer is not None:
+        buffer.record(kind, **fields)
@@ -0,0 +1,247 @@
+"""Local intent matching for routine utterances that don't need the LLM."""
+import logging
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+from app.services.ordering.extractor import (
+    QUANTITY_WORDS,
+    SIZE_OPTIONS,
+    ExtractedItem,
+    MenuEntityExtractor,
+    tokenize,
+)
+
+logger = logging.getLogger(__name__)
+
+# Utterances longer than this always go to the LLM
+MAX_FAST_PATH_WORDS = 12
+
+
+def normalize_utterance(text: str) -> str:
+    """Lowercase, unify apostrophes, drop punctuation and collapse whitespace.
+
+    Built on the extractor's tokenizer, so fast-path matching, response cache
+    keys and speculative turn comparison all see the same words.
+    """
+    return " ".join(tokenize(text))
+
+
+def _any_of(phrases: Iterable[str]) -> str:
+    """Regex alternation over phrases, longest first, with optional apostrophes."""
+    ordered = sorted(phrases, key=len, reverse=True)
+    return "(?:" + "|".join(re.escape(p).replace("'", "'?") for p in ordered) + ")"
+
+
+# Leading and trailing words that don't change what the caller means
+_LEAD_IN = _any_of(["um", "uh", "oh", "okay", "ok", "alright", "all right", "well", "so", "and"])
+_POLITE = _any_of([
+    "thanks", "thank you", "thank you very much", "thanks so much",
+    "please", "for now", "for me", "for today",
+])
+
+# The caller has nothing more to add ("that's all", "no thanks that's it")
+_DONE_PHRASES = _any_of([
+    "that's all", "that is all", "that's it", "that is it", "that's everything",
+    "that'll be all", "that will be all", "that'll do it", "that'll do",
+    "nothing else", "nothing more", "i'm done", "i am done", "i'm finished",
+    "i'm all set", "i'm good", "we're good", "that's good",
+])
+_DONE_LEAD_IN = _any_of(["no", "nope", "nah", "no thanks", "no thank you"])
+
+# The caller accepts the order as read back ("yes that's correct")
+_CONFIRM_PHRASES = _any_of([
+    "yes", "yeah", "yep", "yup", "correct", "right", "exactly", "perfect",
+    "that's right", "that is right", "that's correct", "that is correct",
+    "yes it is", "it is", "sounds good", "sounds great", "looks good",
+    "all good", "you got it", "that's it",
+])
+
+DONE_PATTERN = (
+    rf"(?:{_LEAD_IN} )*(?:{_DONE_LEAD_IN} )?{_DONE_PHRASES}(?: {_POLITE})*"
+)
+CONFIRM_PATTERN = (
+    rf"(?:{_LEAD_IN} )*{_CONFIRM_PHRASES}(?: {_CONFIRM_PHRASES})*(?: {_POLITE})*"
+)
+
+
+class FastPathRule:
+    """An utterance pattern that resolves a turn in specific stages."""
+
+    def __init__(
+        self,
+        name: str,
+        stages: Iterable[ConversationStage],
+        pattern: str,
+        intent: str,
+        response: str,
+        condition: Optional[Callable[[ConversationState], bool]] = None,
+    ):
+        self.name = name
+        self.stages = list(stages)
+        # Anchored at both ends: any extra content means the LLM should decide
+        self.pattern = re.compile(rf"^{pattern}$")
+        self.intent = intent
+        self.response = response
+        self.condition = condition
+
+    def matches(self, state: ConversationState, utterance: str) -> bool:
+        """Check the rule against a normalized utterance."""
+        if state.stage not in self.stages or not self.pattern.match(utterance):
+            return False
+        return self.condition is None or self.condition(state)
+
+
+# Responses are placeholders: the stage transition and the session manager
+# replace them (order read-back, closing message, empty-order prompt).
+DEFAULT_RULES = [
+    FastPathRule(
+        "done_ordering",
+        [ConversationStage.ORDERING],
+        DONE_PATTERN,
+        intent="reviewing",
+        response="Great, let me read your order back.",
+        condition=lambda state: state.pending_modifiers_item_name is None,
+    ),
+    FastPathRule(
+        "done_revising",
+        [ConversationStage.REVISION],
+        DONE_PATTERN,
+        intent="reviewing",
+        response="Got it, let me read your updated order back.",
+    ),
+    FastPathRule(
+        "confirm_order",
+        [ConversationStage.REVIEW],
+        CONFIRM_PATTERN,
+        intent="concluding",
+        response="Perfect!",
+        condition=lambda state: state.order_read_back,
+    ),
+]
+
+
+# Stages where a plain list of menu items is an order
+ORDER_ENTRY_STAGES = [ConversationStage.GREETING, ConversationStage.ORDERING]
+
+# Name of the hit counter for turns resolved by the menu entity extractor
+MENU_ITEMS_RULE = "menu_items"
+
+_NUMBER_WORDS = {
+    QUANTITY_WORDS[word]: word
+    for word in ["two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "eleven", "twelve"]
+}
+
+
+def describe_items(items: List[ExtractedItem]) -> str:
+    """Speakable summary of extracted items ("two cheeseburgers and a large coca cola")."""
+    parts = []
+    for item in items:
+        sizes = [m for m in item.modifiers if m in SIZE_OPTIONS]
+        extras = [m for m in item.modifiers if m not in SIZE_OPTIONS]
+        name = " ".join(sizes + [item.item_name])
+        if item.quantity > 1:
+            count = _NUMBER_WORDS.get(item.quantity, str(item.quantity))
+            plural = name if name.endswith("s") else f"{name}s"
+            text = f"{count} {plural}"
+        elif not sizes and name.endswith("s"):
+            # "an order of fries", not "a fries"
+            text = f"an order of {name}"
+        else:
+            text = f"{'an' if name[0] in 'aeiou' else 'a'} {name}"
+        if extras:
+            text += f" with {' and '.join(extras)}"
+        parts.append(text)
+    return _join(parts)
+
+
+def describe_names(items: List[ExtractedItem]) -> str:
+    """Speakable list of the distinct item names ("burger and fries")."""
+    return _join(list(dict.fromkeys(item.item_name for item in items)))
+
+
+def _join(parts: List[str]) -> str:
+    if len(parts) == 1:
+        return parts[0]
+    return ", ".join(parts[:-1]) + f" and {parts[-1]}"
+
+
+class FastPathMatcher:
+    """Resolves high-confidence routine turns without calling the LLM.
+
+    A rule only fires when the whole utterance matches it, so anything with
+    extra content ("yes but no onions", "that's all and a coke") falls back to
+    the LLM. Plain orders ("two cheeseburgers and a large coke") are resolved
+    with the menu entity extractor when every word is accounted for. Hit and
+    miss counts are kept for the health endpoint.
+    """
+
+    def __init__(self, rules: Optional[List[FastPathRule]] = None):
+        self.rules = rules if rules is not None else DEFAULT_RULES
+        self.hits: Dict[str, int] = {rule.name: 0 for rule in self.rules}
+        self.hits[MENU_ITEMS_RULE] = 0
+        self.misses = 0
+
+    def match(
+        self,
+        state: ConversationState,
+        user_input: str,
+        extractor: Optional[MenuEntityExtractor] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Try to resolve a turn locally.
+
+        Args:
+            state: Conversation state before the turn
+            user_input: What the caller said
+            extractor: Menu entity extractor, to resolve plain orders
+
+        Returns:
+            Agent response dict (same shape as the LLM's), or None to use the LLM
+        """
+        utterance = normalize_utterance(user_input)
+        if utterance and len(utterance.split()) <= MAX_FAST_PATH_WORDS:
+            for rule in self.rules:
+                if rule.matches(state, utterance):
+                    self.hits[rule.name] += 1
+                    logger.info(
+                        f"[FAST PATH] Rule '{rule.name}' matched '{user_input}' "
+                        f"in stage {state.stage.value}"
+                    )
+                    return {
+                        "response": rule.response,
+                        "intent": rule.intent,
+                        "action": {"type": "none"},
+                    }
+
+        if (
+            extractor is not None
+            and state.stage in ORDER_ENTRY_STAGES
+            and state.pending_modifiers_item_name is None
+        ):
+            extraction = extractor.extract(user_input)
+            if extraction.complete:
+                self.hits[MENU_ITEMS_RULE] += 1
+                actions = extraction.actions()
+                logger.info(f"[FAST PATH] Extracted {actions} from '{user_input}'")
+                return {
+                    "response": f"Got it, {describe_items(extraction.items)}. Anything else?",
+                    "intent": "ordering",
+                    "action": actions[0],
+                    "actions": actions,
+                }
+
+        self.misses += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate counters for the health endpoint."""
+        hits = sum(self.hits.values())
+        total = hits + self.misses
+        return {
+            "hits": hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 3) if total else None,
+            "by_rule": dict(self.hits),
+        }
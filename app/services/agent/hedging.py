@@ -0,0 +1,153 @@
+"""Hedged LLM requests under a turn deadline."""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from app.services.agent.deadline import Deadline
+from app.services.agent.llm import LLMTimeoutError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency at a percentile (0-1) of the window, or None if empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(int(fraction * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgedCaller:
+    """Runs a call under the turn deadline, hedging it when it runs slow.
+
+    If the first request hasn't answered by the configured latency
+    percentile of recent calls, a second identical request is sent and
+    whichever answers first wins; the other is cancelled. Until enough
+    latencies have been seen, a fixed hedge delay is used. If neither
+    answers before the deadline, LLMTimeoutError is raised so the caller can
+    fall back.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.9,
+        min_samples: int = 20,
+        default_delay_seconds: float = 2.0,
+        enabled: bool = True,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default_delay_seconds = default_delay_seconds
+        self.enabled = enabled
+        self.latencies = LatencyTracker()
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the first request before hedging."""
+        if len(self.latencies) < self.min_samples:
+            return self.default_delay_seconds
+        return self.latencies.percentile(self.percentile)
+
+    async def call(self, request: Callable[[], Awaitable[T]], deadline: Optional[Deadline] = None) -> T:
+        """
+        Run request(), hedging it if it is slow.
+
+        Raises:
+            LLMTimeoutError: If the deadline passes first
+            Whatever the request raises if every attempt fails
+        """
+        self.requests += 1
+        started = time.monotonic()
+        attempts = [asyncio.create_task(request())]
+        try:
+            result, winner = await self._race(request, attempts, deadline)
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+                    # A cancelled loser may still fail; don't log it as unretrieved
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        if winner > 0:
+            self.hedge_wins += 1
+        self.latencies.record(time.monotonic() - started)
+        return result
+
+    async def _race(
+        self,
+        request: Callable[[], Awaitable[T]],
+        attempts: List[asyncio.Task],
+        deadline: Optional[Deadline],
+    ) -> Tuple[T, int]:
+        """Wait for the first successful attempt, sending the hedge when due."""
+        hedge_at = time.monotonic() + self.hedge_delay() if self.enabled else None
+        last_error: Optional[BaseException] = None
+
+        while True:
+            now = time.monotonic()
+            waits = []
+            if deadline is not None:
+                waits.append(deadline.remaining())
+            if hedge_at is not None and len(attempts) == 1:
+                waits.append(max(hedge_at - now, 0.0))
+            timeout = min(waits) if waits else None
+
+            pending = [task for task in attempts if not task.done()]
+            if pending:
+                await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for index, task in enumerate(attempts):
+                if task.done() and not task.cancelled():
+                    error = task.exception()
+                    if error is None:
+                        return task.result(), index
+                    last_error = error
+
+            if all(task.done() for task in attempts):
+                # Failures aren't hedged: retrying a 429 at once only adds load
+                raise last_error
+
+            if deadline is not None and deadline.expired:
+                self.deadline_exceeded += 1
+                raise LLMTimeoutError(f"Turn budget of {deadline.budget_seconds:.1f}s exhausted")
+
+            if hedge_at is not None and len(attempts) == 1 and time.monotonic() >= hedge_at:
+                self.hedged += 1
+                logger.info("[LLM] First request is slow, sending a hedged request")
+                attempts.append(asyncio.create_task(request()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hedging counters for the health endpoint."""
+        p50 = self.latencies.percentile(0.5)
+        hedge_percentile = self.latencies.percentile(self.percentile)
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_rate": round(self.hedged / self.requests, 3) if self.requests else None,
+            "hedge_wins": self.hedge_wins,
+            "hedge_win_rate": round(self.hedge_wins / self.hedged, 3) if self.hedged else None,
+            "deadline_exceeded": self.deadline_exceeded,
+            "latency_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000),
+            "latency_percentile_ms": round(hedge_percentile * 1000) if hedge_percentile is not None else None,
+        }
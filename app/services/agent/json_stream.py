@@ -0,0 +1,112 @@
+"""Incremental parsing of a streamed JSON object."""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Scanner states
+_BEFORE_KEY = "before_key"
+_IN_KEY = "in_key"
+_BEFORE_VALUE = "before_value"
+_IN_STRING_VALUE = "in_string_value"
+_IN_OTHER_VALUE = "in_other_value"
+
+
+class JsonObjectStream:
+    """Reports top-level string fields of a JSON object as soon as they close.
+
+    The model's completion arrives in arbitrary chunks. Feeding them here
+    yields ``(key, value)`` for each top-level string field the moment its
+    closing quote arrives, so "response" can be spoken before "intent" and
+    "action" have been generated. Nested objects, arrays and non-string
+    values are skipped over (strings inside them are tracked so braces in
+    text don't confuse the depth count); ``result()`` parses the whole object
+    once the stream ends.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._state = _BEFORE_KEY
+        self._started = False
+        self._depth = 0  # Nesting depth inside a non-string value
+        self._in_nested_string = False
+        self._escaped = False
+        self._token: List[str] = []  # Raw characters of the key or string value being read
+        self._key: Optional[str] = None
+        self.fields: Dict[str, str] = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """
+        Consume a chunk of the completion.
+
+        Returns:
+            (key, value) for each top-level string field completed by this chunk
+        """
+        self._buffer.append(chunk)
+        completed = []
+        for char in chunk:
+            if not self._started:
+                self._started = char == "{"
+                continue
+            field = self._consume(char)
+            if field is not None:
+                self.fields[field[0]] = field[1]
+                completed.append(field)
+        return completed
+
+    def _consume(self, char: str) -> Optional[Tuple[str, str]]:
+        """Advance the scanner by one character."""
+        if self._state in (_IN_KEY, _IN_STRING_VALUE):
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                raw = "".join(self._token)
+                self._token = []
+                if self._state == _IN_KEY:
+                    self._key = json.loads(f'"{raw}"', strict=False)
+                    self._state = _BEFORE_VALUE
+                    return None
+                self._state = _BEFORE_KEY
+                return self._key, json.loads(f'"{raw}"', strict=False)
+            self._token.append(char)
+            return None
+
+        if self._state == _IN_OTHER_VALUE:
+            if self._in_nested_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_nested_string = False
+            elif char == '"':
+                self._in_nested_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth < 0:
+                    self._depth = 0  # The closing brace of the object itself
+                    self._state = _BEFORE_KEY
+            elif char == "," and self._depth == 0:
+                self._state = _BEFORE_KEY
+            return None
+
+        if self._state == _BEFORE_KEY:
+            if char == '"':
+                self._state = _IN_KEY
+        elif self._state == _BEFORE_VALUE:
+            if char == '"':
+                self._state = _IN_STRING_VALUE
+            elif char not in ": \t\r\n":
+                self._state = _IN_OTHER_VALUE
+                self._depth = 1 if char in "{[" else 0
+        return None
+
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._buffer)
+
+    def result(self) -> Any:
+        """Parse the complete object (raises json.JSONDecodeError if it is malformed)."""
+        return json.loads(self.text())
@@ -0,0 +1,380 @@
+"""LLM backends for the agent."""
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import openai
+from openai import AsyncOpenAI
+
+from app.services.agent.fast_path import (
+    CONFIRM_PATTERN,
+    DONE_PATTERN,
+    describe_items,
+    describe_names,
+    normalize_utterance,
+)
+from app.services.menu.repository import MenuRepository
+from app.services.ordering.extractor import (
+    QUESTION_PHRASES,
+    SIZE_OPTIONS,
+    ExtractedItem,
+    Extraction,
+    tokenize,
+)
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+
+class LLMError(Exception):
+    """The LLM call failed."""
+
+
+class LLMTimeoutError(LLMError):
+    """The LLM did not answer in time."""
+
+
+class LLMRateLimitError(LLMError):
+    """The provider rejected the call for rate limiting (HTTP 429)."""
+
+
+class LLMCompletion:
+    """Text of a completion plus the provider's usage report (if any)."""
+
+    def __init__(self, content: str, usage: Any = None):
+        self.content = content
+        self.usage = usage
+
+
+class LLMBackend(ABC):
+    """Abstract base class for LLM backends."""
+
+    @abstractmethod
+    async def complete(self, messages: Messages) -> LLMCompletion:
+        """
+        Get a JSON-object completion for chat messages.
+
+        Raises:
+            LLMError: If the call fails (LLMTimeoutError, LLMRateLimitError for those cases)
+        """
+        pass
+
+    async def stream(self, messages: Messages) -> AsyncIterator[str]:
+        """Yield the completion in chunks (backends without streaming yield it whole)."""
+        completion = await self.complete(messages)
+        yield completion.content
+
+
+class OpenAIBackend(LLMBackend):
+    """Chat completions from the OpenAI API."""
+
+    def __init__(self, client: AsyncOpenAI, model: str = "gpt-4o-mini", temperature: float = 0.5):
+        self.client = client
+        self.model = model
+        self.temperature = temperature
+
+    async def complete(self, messages: Messages) -> LLMCompletion:
+        """Get a completion from the API."""
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                response_format={"type": "json_object"},
+            )
+        except openai.OpenAIError as e:
+            raise _translate_error(e) from e
+        return LLMCompletion(response.choices[0].message.content, getattr(response, "usage", None))
+
+    async def stream(self, messages: Messages) -> AsyncIterator[str]:
+        """Stream a completion from the API."""
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except openai.OpenAIError as e:
+            raise _translate_error(e) from e
+
+
+def _translate_error(error: Exception) -> LLMError:
+    """Map an OpenAI SDK error onto the backend error types."""
+    if isinstance(error, openai.APITimeoutError):
+        return LLMTimeoutError(str(error))
+    if isinstance(error, openai.RateLimitError):
+        return LLMRateLimitError(str(error))
+    return LLMError(str(error))
+
+
+_UTTERANCE = re.compile(r'Customer just said: "(.*)"')
+_STAGE = re.compile(r"CONVERSATION STAGE: (\w+)")
+_TRANSCRIPT_LINE = re.compile(r"^(Agent|Customer): (.*)$", re.MULTILINE)
+_DONE = re.compile(rf"^{DONE_PATTERN}$")
+_CONFIRM = re.compile(rf"^{CONFIRM_PATTERN}$")
+_SIZE_QUESTION = re.compile(r"What size would you like for the (.+)\?$")
+
+# Unmatched words that turn a mention of an item into a removal or refusal
+_REMOVE_WORDS = {
+    "remove", "delete", "cancel", "off", "out", "away", "don't", "dont", "not", "no", "never", "instead",
+}
+# Unmatched entries the extractor reports for questions ("do you have fries?")
+_QUESTION_MARKERS = {" ".join(phrase) for phrase in QUESTION_PHRASES} | {"?"}
+
+# Spoken counts for size questions ("the two fries")
+_COUNT_WORDS = {2: "two", 3: "three", 4: "four", 5: "five", 6: "six"}
+
+# Stages where the order is being changed after the read-back
+_CHANGE_STAGES = ("review", "revision")
+
+
+class RuleBasedBackend(LLMBackend):
+    """Deterministic answers from the menu, for offline runs and load tests.
+
+    Reads the utterance, stage and recent transcript out of the user prompt,
+    recognizes orders with the menu entity extractor and "that's all" / "yes"
+    with the fast-path patterns, and answers with the same JSON shape the
+    model produces. Items are only added when the caller is asking for them:
+    removals ("remove the fries") become remove_item after the read-back,
+    refusals and questions add nothing, and an item missing a required size
+    is asked about first. It costs no tokens and needs no network, so the
+    whole call path can run without an API key.
+
+    With ``strict`` set, items are only added from an utterance the extractor
+    accounts for completely (every word matched, every required size given);
+    anything else is asked again. Degraded mode uses it, where a wrong item
+    costs more than another turn.
+    """
+
+    def __init__(self, menu_repository: MenuRepository, strict: bool = False):
+        self.menu_repository = menu_repository
+        self.strict = strict
+
+    async def complete(self, messages: Messages) -> LLMCompletion:
+        """Answer from the menu."""
+        prompt = messages[-1]["content"]
+        utterance_match = _UTTERANCE.search(prompt)
+        stage_match = _STAGE.search(prompt)
+        user_input = utterance_match.group(1) if utterance_match else ""
+        stage = stage_match.group(1).lower() if stage_match else "ordering"
+        utterance = normalize_utterance(user_input)
+
+        if stage == "review" and _CONFIRM.match(utterance):
+            answer = _answer("Perfect!", "concluding")
+        elif _DONE.match(utterance):
+            answer = _answer("Great, let me read your order back.", "reviewing")
+        else:
+            extractor = await self.menu_repository.get_entity_extractor()
+            extraction = extractor.extract(user_input)
+            size_question = _SIZE_QUESTION.search(_last_agent_line(prompt))
+            if size_question and not extraction.items:
+                # The caller is answering "what size?"; the question names what it was about
+                sized = _with_sizes(size_question.group(1), user_input)
+                if sized is not None:
+                    extraction = extractor.extract(sized)
+            answer = self._order_answer(extraction, stage)
+        return LLMCompletion(json.dumps(answer))
+
+    def _order_answer(self, extraction: Extraction, stage: str) -> Dict[str, Any]:
+        """Answer an utterance that may name menu items, based on stage and intent."""
+        intent = "revising" if stage in _CHANGE_STAGES else "ordering"
+        unmatched = set(extraction.unmatched)
+
+        if not extraction.items:
+            return _answer("Sorry, what would you like from the menu?", intent)
+        if self.strict and not extraction.complete:
+            response = "Sorry, I didn't catch all of that. Could you say your order again"
+            unsized = [item for item in extraction.items if item.item_name in extraction.incomplete]
+            if unsized:
+                response += f", with a size for the {describe_names(unsized)}"
+            return _answer(response + "?", intent)
+        if unmatched & _QUESTION_MARKERS:
+            return _answer(
+                f"We do have {describe_names(extraction.items)}. What would you like to order?", intent
+            )
+        if unmatched & _REMOVE_WORDS:
+            if stage not in _CHANGE_STAGES:
+                return _answer(
+                    "Okay. You can change anything already ordered when I read your order back. "
+                    "Anything else?",
+                    intent,
+                )
+            actions = [
+                {"type": "remove_item", "item_name": name}
+                for name in dict.fromkeys(item.item_name for item in extraction.items)
+            ]
+            answer = _answer(f"Okay, removing the {describe_names(extraction.items)}.", intent, actions[0])
+            answer["actions"] = actions
+            return answer
+
+        # Items missing a required size are asked about, not added
+        complete = [item for item in extraction.items if item.item_name not in extraction.incomplete]
+        unsized = [item for item in extraction.items if item.item_name in extraction.incomplete]
+        question = ""
+        if unsized:
+            question = "What size would you like for " + " and ".join(
+                f"the {_size_question_phrase(item)}" for item in unsized
+            ) + "?"
+        if not complete:
+            return _answer(question, intent)
+
+        actions = [
+            {
+                "type": "add_item",
+                "item_name": item.item_name,
+                "quantity": item.quantity,
+                "modifiers": ", ".join(item.modifiers),
+            }
+            for item in complete
+        ]
+        response = f"Got it, {describe_items(complete)}. " + (question or "Anything else?")
+        answer = _answer(response, intent, actions[0])
+        answer["actions"] = actions
+        return answer
+
+
+def _size_question_phrase(item: ExtractedItem) -> str:
+    """How a size question names an item ("two fries"), complete enough to re-extract from."""
+    text = item.item_name
+    if item.quantity > 1:
+        text = f"{_COUNT_WORDS.get(item.quantity, str(item.quantity))} {text}"
+    if item.modifiers:
+        text += f" with {' and '.join(item.modifiers)}"
+    return text
+
+
+def _with_sizes(asked: str, answer: str) -> Optional[str]:
+    """The items a size question asked about, with the sizes from the answer, as an order.
+
+    One size applies to every item asked about; otherwise sizes are matched in order.
+    """
+    phrases = asked.split(" and the ")
+    sizes = [word for word in tokenize(answer) if word in SIZE_OPTIONS]
+    if len(sizes) == 1:
+        sizes *= len(phrases)
+    if not sizes or len(sizes) != len(phrases):
+        return None
+    return " and ".join(f"{size} {phrase}" for size, phrase in zip(sizes, phrases))
+
+
+def _last_agent_line(prompt: str) -> str:
+    """What the agent said last, from the transcript in the prompt."""
+    lines = _TRANSCRIPT_LINE.findall(prompt)
+    return next((text for role, text in reversed(lines) if role == "Agent"), "")
+
+
+def _answer(response: str, intent: str, action: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {"response": response, "intent": intent, "action": action or {"type": "none"}}
+
+
+class StubBackend(LLMBackend):
+    """Backend with injected latency and failures, for reproducing overload locally.
+
+    Each call waits for a latency drawn from the configured distribution,
+    then fails as a timeout, a 429 or malformed JSON at the configured
+    rates, or returns the wrapped backend's answer (a fixed reply by
+    default). A seed makes runs repeatable.
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+    def __init__(
+        self,
+        inner: Optional[LLMBackend] = None,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        latency_distribution: str = "fixed",
+        timeout_rate: float = 0.0,
+        timeout_ms: float = 30000.0,
+        rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        if latency_distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.inner = inner
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.timeout_rate = timeout_rate
+        self.timeout_ms = timeout_ms
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def sample_latency_ms(self) -> float:
+        """Draw one call latency in milliseconds."""
+        if self.latency_distribution == "uniform":
+            low = max(self.latency_ms - self.latency_jitter_ms, 0.0)
+            return self._random.uniform(low, self.latency_ms + self.latency_jitter_ms)
+        if self.latency_distribution == "lognormal" and self.latency_ms > 0:
+            # Median latency_ms with a long tail; jitter sets the spread
+            sigma = math.log1p(self.latency_jitter_ms / self.latency_ms)
+            return self._random.lognormvariate(math.log(self.latency_ms), sigma)
+        return self.latency_ms
+
+    async def complete(self, messages: Messages) -> LLMCompletion:
+        """Wait, then fail or answer as configured."""
+        self.calls += 1
+        outcome = self._random.random()
+
+        if outcome < self.timeout_rate:
+            await asyncio.sleep(self.timeout_ms / 1000)
+            raise LLMTimeoutError(f"Stub timed out after {self.timeout_ms:.0f} ms")
+
+        await asyncio.sleep(self.sample_latency_ms() / 1000)
+        outcome -= self.timeout_rate
+        if outcome < self.rate_limit_rate:
+            raise LLMRateLimitError("Stub rate limit (429)")
+        outcome -= self.rate_limit_rate
+        if outcome < self.malformed_rate:
+            return LLMCompletion('{"response": "Sorry, I')
+
+        if self.inner is not None:
+            return await self.inner.complete(messages)
+        return LLMCompletion(json.dumps(_answer("Okay. Anything else?", "ordering")))
+
+
+def create_llm_backend(
+    backend: str,
+    *,
+    client: Optional[AsyncOpenAI] = None,
+    menu_repository: Optional[MenuRepository] = None,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.5,
+    **stub_options: Any,
+) -> LLMBackend:
+    """
+    Create an LLM backend.
+
+    Args:
+        backend: "openai", "rules" (deterministic, from the menu) or "stub"
+            (rule-based answers with injected latency and failures)
+        client: OpenAI client (openai backend)
+        menu_repository: Menu repository (rules and stub backends)
+        model: Model name (openai backend)
+        temperature: Sampling temperature (openai backend)
+        **stub_options: StubBackend latency and failure options
+    """
+    if backend == "openai":
+        if client is None:
+            raise ValueError("The openai LLM backend needs a client")
+        return OpenAIBackend(client, model=model, temperature=temperature)
+    if backend == "rules":
+        return RuleBasedBackend(menu_repository)
+    if backend == "stub":
+        inner = RuleBasedBackend(menu_repository) if menu_repository is not None else None
+        return StubBackend(inner, **stub_options)
+    raise ValueError(f"Unknown LLM backend: {backend}")
@@ -1,12 +1,19 @@
-"""Agent prompt templates."""
-from typing import Optional, List
+"""Agent prompt templates.
+
+Prompts are laid out for provider-side prompt caching: the system message is
+a static prefix (instructions and menu) that is byte-identical for every turn
+with the same menu, and the user message carries only what changes per turn.
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
 from app.core.config import settings
 from app.services.agent.stages import ConversationStage
 
+logger = logging.getLogger(__name__)
 
-def get_system_prompt(menu_text: str) -> str:
-    """Generate system prompt for the agent."""
-    return f"""You are a friendly and professional voice assistant for {settings.restaurant_name}. 
+SYSTEM_PROMPT_TEMPLATE = """You are a friendly and professional voice assistant for {restaurant_name}. 
 Your job is to take phone orders from customers.
 
 Your responsibilities:
@@ -57,7 +64,28 @@ Important:
 - If customer says "that's all" or similar, set intent to "reviewing"
 - In REVISION stage: use remove_item to remove items, modify_item to change modifiers on existing items, or add_item to add new items
 - Keep responses warm and friendly
-- Always output valid JSON"""
+- Always output valid JSON
+
+Each turn you get the conversation so far, the stage and the current order. Your task:
+1. If the customer mentions a menu item, set action.type="add_item" and action.item_name to that item
+2. Respond naturally and helpfully
+3. If they mention details about the item, summarize them into action.modifiers (concise)
+4. If they say "that's all" or similar, indicate you're ready to review the order
+5. Keep your response warm and conversational"""
+
+# Stage descriptions
+STAGE_DESCRIPTIONS = {
+    ConversationStage.GREETING: "Greet the customer warmly and welcome them. After greeting, you'll move to ORDERING.",
+    ConversationStage.ORDERING: "You are taking orders. If they mention a menu item, add it to the order (action.type=add_item). Put any extra details as concise modifiers.",
+    ConversationStage.REVIEW: "You have read back the order. Wait for the customer to either: (1) confirm with 'yes'/'correct' to finalize, OR (2) request changes like 'remove X' or 'add Y' to revise. Do NOT read the order again unless explicitly asked.",
+    ConversationStage.REVISION: "The customer wants to modify their order. Allow them to: add items (action.type=add_item), remove items (action.type=remove_item with item_name), or modify items (action.type=modify_item with item_name and new modifiers). When they're done with revisions, say 'that's all' or similar to move back to REVIEW.",
+    ConversationStage.CONCLUSION: "Thank the customer warmly and conclude the call."
+}
+
+
+def get_system_prompt(menu_text: str) -> str:
+    """Generate system prompt for the agent."""
+    return SYSTEM_PROMPT_TEMPLATE.format(restaurant_name=settings.restaurant_name, menu_text=menu_text)
 
 
 def get_user_prompt(
@@ -70,18 +98,9 @@ def get_user_prompt(
 ) -> str:
     """Generate user prompt with conversation context."""
 
-    # Stage descriptions
-    stage_descriptions = {
-        ConversationStage.GREETING: "Greet the customer warmly and welcome them. After greeting, you'll move to ORDERING.",
-        ConversationStage.ORDERING: "You are taking orders. If they mention a menu item, add it to the order (action.type=add_item). Put any extra details as concise modifiers.",
-        ConversationStage.REVIEW: "You have read back the order. Wait for the customer to either: (1) confirm with 'yes'/'correct' to finalize, OR (2) request changes like 'remove X' or 'add Y' to revise. Do NOT read the order again unless explicitly asked.",
-        ConversationStage.REVISION: "The customer wants to modify their order. Allow them to: add items (action.type=add_item), remove items (action.type=remove_item with item_name), or modify items (action.type=modify_item with item_name and new modifiers). When they're done with revisions, say 'that's all' or similar to move back to REVIEW.",
-        ConversationStage.CONCLUSION: "Thank the customer warmly and conclude the call."
-    }
-
     stage_context = f"""
 CONVERSATION STAGE: {conversation_stage.value.upper()}
-{stage_descriptions.get(conversation_stage, '')}
+{STAGE_DESCRIPTIONS.get(conversation_stage, '')}
 
 IMPORTANT: Do NOT go back to GREETING stage once you've moved to ORDERING. Stay in the current stage unless customer indicates they're done ordering (then move to REVIEW).
 """
@@ -97,12 +116,93 @@ IMPORTANT: Do NOT go back to GREETING stage once you've moved to ORDERING. Stay
 
 Customer just said: "{user_input}"
 
-Your task:
-1. If the customer mentions a menu item, set action.type="add_item" and action.item_name to that item
-2. Respond naturally and helpfully
-3. If they mention details about the item, summarize them into action.modifiers (concise)
-4. If they say "that's all" or similar, indicate you're ready to review the order
-5. Keep your response warm and conversational
-
 Respond in the JSON format specified."""
 
+
+
+class PromptCompiler:
+    """Builds chat messages around a system prompt compiled once per menu.
+
+    The system prompt (instructions and menu) is rendered the first time a
+    menu text is seen and reused byte for byte after that, so the provider
+    can serve it from its prompt cache. Prompt sizes and the cached-token
+    counts the provider reports are kept for the health endpoint.
+    """
+
+    def __init__(self, max_prefixes: int = 4):
+        self.max_prefixes = max_prefixes
+        self._prefixes: "OrderedDict[str, str]" = OrderedDict()
+        self.compiles = 0
+        self.prefix_reuses = 0
+        self.turns = 0
+        self.prompt_chars = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+
+    def get_system_prompt(self, menu_text: str) -> str:
+        """Get the compiled system prompt for a menu, rendering it on first use."""
+        system_prompt = self._prefixes.get(menu_text)
+        if system_prompt is not None:
+            self.prefix_reuses += 1
+            self._prefixes.move_to_end(menu_text)
+            return system_prompt
+
+        system_prompt = get_system_prompt(menu_text)
+        self._prefixes[menu_text] = system_prompt
+        self.compiles += 1
+        while len(self._prefixes) > self.max_prefixes:
+            self._prefixes.popitem(last=False)
+        prefix_hash = hashlib.sha1(system_prompt.encode("utf-8")).hexdigest()[:12]
+        logger.info(f"[PROMPT] Compiled system prompt {prefix_hash} ({len(system_prompt)} chars)")
+        return system_prompt
+
+    def build_messages(self, menu_text: str, user_prompt: str) -> List[Dict[str, str]]:
+        """Chat messages for a turn: static system prefix, then the per-turn user prompt."""
+        system_prompt = self.get_system_prompt(menu_text)
+        self.turns += 1
+        self.prompt_chars += len(system_prompt) + len(user_prompt)
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def record_usage(self, usage: Any) -> Dict[str, int]:
+        """
+        Record token usage from a chat completion.
+
+        Returns:
+            Prompt and cached token counts for the turn (0 when not reported)
+        """
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        if isinstance(details, dict):
+            cached_tokens = details.get("cached_tokens")
+        else:
+            cached_tokens = getattr(details, "cached_tokens", None)
+
+        turn_usage = {
+            "prompt_tokens": prompt_tokens if isinstance(prompt_tokens, int) else 0,
+            "cached_tokens": cached_tokens if isinstance(cached_tokens, int) else 0,
+        }
+        self.prompt_tokens += turn_usage["prompt_tokens"]
+        self.cached_tokens += turn_usage["cached_tokens"]
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if isinstance(completion_tokens, int):
+            self.completion_tokens += completion_tokens
+        return turn_usage
+
+    def stats(self) -> Dict[str, Any]:
+        """Prompt size and prefix cache counters for the health endpoint."""
+        return {
+            "compiles": self.compiles,
+            "prefix_reuses": self.prefix_reuses,
+            "turns": self.turns,
+            "avg_prompt_chars": round(self.prompt_chars / self.turns) if self.turns else None,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_token_rate": (
+                round(self.cached_tokens / self.prompt_tokens, 3) if self.prompt_tokens else None
+            ),
+        }
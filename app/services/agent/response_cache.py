@@ -0,0 +1,102 @@
+"""Cache of LLM turn results shared across calls."""
+import copy
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.agent.fast_path import normalize_utterance
+from app.services.agent.state import ConversationState
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[Any, ...]
+
+
+def _digest(text: str) -> str:
+    """Short stable hash of a text."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(menu_version: int, state: ConversationState, user_input: str) -> CacheKey:
+    """
+    Build the cache key for a turn.
+
+    The customer's line must already be in the transcript. Besides the menu
+    version, stage, utterance and order, the key includes what the agent just
+    said and any pending modifier question: a reply like "large" only means
+    something against the question it answers.
+    """
+    last_agent_line = next(
+        (turn for turn in reversed(state.transcript) if turn.startswith("Agent: ")), ""
+    )
+    return (
+        menu_version,
+        state.stage.value,
+        normalize_utterance(user_input),
+        _digest(state.get_order_summary()),
+        state.pending_modifiers_item_name,
+        state.order_read_back,
+        _digest(normalize_utterance(last_agent_line)),
+    )
+
+
+class ResponseCache:
+    """LRU cache with a TTL for parsed LLM responses.
+
+    Many turns look the same across calls ("a coke please" with an empty
+    order in the ordering stage), so their LLM result can be reused instead
+    of paying for another round trip. Entries are copied on the way in and
+    out because callers modify the response dict during stage transitions.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """Get a copy of a cached response, or None."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: CacheKey, response: Dict[str, Any]) -> None:
+        """Store a copy of a response, evicting the least recently used entries."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(response))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the health endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -25,6 +25,8 @@ class ConversationState(BaseModel):
     order_read_back: bool = False  # Flag to track if order has been read back in REVIEW stage
     turn_count: int = 0  # Total number of conversation turns (for turn limit)
     consecutive_errors: int = 0  # Count of consecutive agent errors (for error tracking)
+    context_summary: str = ""  # Running summary of turns that left the LLM context window
+    summarized_turn_count: int = 0  # Transcript entries already folded into context_summary
 
     def add_transcript_turn(self, role: str, text: str) -> None:
         """Add a turn to the transcript."""
@@ -0,0 +1,78 @@
+"""Write-behind creation of Call records."""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.persistence.calls import CallPersistenceService
+
+logger = logging.getLogger(__name__)
+
+
+class CallRecordWriter:
+    """Creates Call rows in the background so the greeting isn't held up.
+
+    The incoming-call webhook schedules the insert and returns immediately.
+    Anything that needs the row's id later (order persistence, end of call)
+    calls ``wait`` first, which joins the in-flight insert if there is one.
+    The ids of the ``max_created`` most recent finished inserts are kept, so
+    ``wait`` still has the id once the insert is done.
+    """
+
+    def __init__(self, db_session_factory: Callable[[], AsyncSession], max_created: int = 1000):
+        self.db_session_factory = db_session_factory
+        self.max_created = max_created
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._created: "OrderedDict[str, int]" = OrderedDict()
+
+    def schedule(self, call_sid: str) -> None:
+        """Start creating the Call row for a call (no-op if already started)."""
+        if call_sid in self._pending or call_sid in self._created:
+            return
+        task = asyncio.create_task(self._create(call_sid))
+        self._pending[call_sid] = task
+        task.add_done_callback(lambda done: self._finished(call_sid, done))
+
+    def _finished(self, call_sid: str, task: asyncio.Task) -> None:
+        """Move a finished insert out of the pending set, keeping its id."""
+        self._pending.pop(call_sid, None)
+        if task.cancelled() or task.result() is None:
+            return
+        self._created[call_sid] = task.result()
+        while len(self._created) > self.max_created:
+            self._created.popitem(last=False)
+
+    async def _create(self, call_sid: str) -> Optional[int]:
+        """Insert the Call row using a dedicated database session."""
+        try:
+            async with self.db_session_factory() as db:
+                call = await CallPersistenceService(db).create_call(call_sid)
+                return call.id
+        except Exception as e:
+            logger.error(
+                f"[CALL RECORDS] Failed to create call record for {call_sid}: {e}", exc_info=True
+            )
+            return None
+
+    async def wait(self, call_sid: str) -> Optional[int]:
+        """Wait for an in-flight insert for a call, or look up a finished one.
+
+        Returns:
+            The Call id, or None if this writer didn't create the row (or the insert failed)
+        """
+        task = self._pending.get(call_sid)
+        if task is None:
+            return self._created.get(call_sid)
+        return await asyncio.shield(task)
+
+    async def drain(self) -> None:
+        """Wait for all in-flight inserts (used at shutdown)."""
+        if self._pending:
+            await asyncio.gather(*self._pending.values(), return_exceptions=True)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of inserts still in flight."""
+        return len(self._pending)
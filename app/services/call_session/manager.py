@@ -1,12 +1,15 @@
 """Call session manager."""
+import asyncio
 import logging
-from typing import Dict, Optional, Any
+from typing import Any, AsyncContextManager, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.call_session.models import CallSession
+from app.services.call_session.models import CallSession, TurnResult
 from app.services.agent.state import ConversationState
 from app.services.agent.stages import ConversationStage
-from app.services.agent.agent import AgentService
+from app.services.agent.agent import AgentService, ResponseCallback
+from app.services.agent.deadline import Deadline, turn_deadline
+from app.services.agent.debug_events import DebugBufferRegistry, debug_events, record_debug_event
 from app.services.speech.stt import SpeechToTextService
 from app.services.speech.tts import TextToSpeechService
 from app.services.menu.repository import MenuRepository
@@ -16,12 +19,69 @@ from app.services.persistence.calls import CallPersistenceService
 from app.services.persistence.orders import OrderPersistenceService
 from app.services.agent.state import OrderItem as StateOrderItem
 from app.services.agent.constants import NO_RESPONSE_INDICATORS
+from app.services.call_session.store import SessionStore
+from app.services.call_session.turns import CallLockRegistry, TurnResponseCache
+from app.services.call_session.speculation import SpeculationRegistry
+from app.services.call_session.call_records import CallRecordWriter
+from app.core.config import settings
+from app.core.logging import call_context
+from app.core.metrics import AGENT_FALLBACKS, TURN_LIMIT_HITS, TWIML_RENDER_SECONDS
+from app.core.scheduler import PRIORITY_BACKGROUND, request_priority
+from app.core.dependencies import get_session_store, get_call_record_writer
 
 logger = logging.getLogger(__name__)
 
-# Module-level session storage (persists across requests)
-# In production, use Redis or similar
-_sessions: Dict[str, CallSession] = {}
+# Serializes turns per CallSid and replays TwiML for retried deliveries
+_call_locks = CallLockRegistry()
+_turn_responses = TurnResponseCache(ttl_seconds=settings.turn_replay_ttl_seconds)
+
+# Agent runs started from Twilio partial transcripts, adopted at the final transcript
+_speculations = SpeculationRegistry(
+    min_words=settings.speculation_min_words,
+    min_similarity=settings.speculation_min_similarity,
+    max_per_turn=settings.speculation_max_per_turn,
+)
+
+
+# Recent per-call diagnostics, written out only when a call goes wrong
+_debug_buffers = DebugBufferRegistry(capacity=settings.debug_buffer_size)
+
+
+def is_turn_in_progress(call_sid: str) -> bool:
+    """Check whether this process is running a turn for a call."""
+    return _call_locks.is_locked(call_sid)
+
+
+def hold_call(call_sid: str) -> AsyncContextManager[None]:
+    """Hold a call's turn lock, so no turn runs for it during the block."""
+    return _call_locks.hold(call_sid)
+
+
+def discard_call_state(call_sid: str) -> None:
+    """Drop what this process keeps in memory for a call, other than its stored session."""
+    _turn_responses.discard_call(call_sid)
+    _speculations.cancel(call_sid)
+    _debug_buffers.discard(call_sid)
+
+
+def speculation_stats() -> Dict[str, Any]:
+    """Counters for speculative turns in this process."""
+    return _speculations.stats()
+
+
+async def flush_debug_events(call_sid: str, reason: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Write out a call's buffered debug events.
+
+    Returns:
+        The events written, or None if this process has no buffer for the call
+    """
+    buffer = _debug_buffers.get(call_sid)
+    if buffer is None:
+        return None
+    if settings.debug_dump_dir:
+        return await asyncio.to_thread(buffer.flush, call_sid, reason, settings.debug_dump_dir)
+    return buffer.flush(call_sid, reason)
 
 
 class CallSessionManager:
@@ -32,55 +92,102 @@ class CallSessionManager:
         db: AsyncSession,
         agent_service: AgentService,
         menu_repository: MenuRepository,
+        session_store: Optional[SessionStore] = None,
+        stt_service: Optional[SpeechToTextService] = None,
+        tts_service: Optional[TextToSpeechService] = None,
+        call_record_writer: Optional[CallRecordWriter] = None,
     ):
         self.db = db
+        self.session_store = session_store or get_session_store()
+        self.call_record_writer = call_record_writer or get_call_record_writer()
         self.agent_service = agent_service
         self.menu_repository = menu_repository
-        self.stt_service = SpeechToTextService()
-        self.tts_service = TextToSpeechService()
+        self.stt_service = stt_service or SpeechToTextService()
+        self.tts_service = tts_service or TextToSpeechService()
         self.order_parser = OrderParser(menu_repository)
         self.order_validator = OrderValidator(menu_repository)
         self.call_persistence = CallPersistenceService(db)
         self.order_persistence = OrderPersistenceService(db)
 
     async def create_session(self, call_sid: str) -> CallSession:
-        """Create a new call session."""
-        # Create call record in database
-        call_record = await self.call_persistence.create_call(call_sid)
+        """Create a new call session.
 
-        # Get menu text and requirements for context
-        menu_text = await self.menu_repository.get_menu_text()
+        The Call row is written in the background and its id is resolved
+        lazily (see _resolve_call_id), so creating a session costs no
+        database round trip. Menu text is loaded on the first turn.
+        """
+        session = await self._new_session(call_sid)
 
-        # Initialize conversation state
-        state = await self.agent_service.initialize_state(call_sid, menu_text, "")
+        # Store session so any worker can pick up the next webhook
+        await self.session_store.set(session)
 
-        # Create session
-        session = CallSession(
-            call_sid=call_sid,
-            state=state,
-            call_id=call_record.id,
-        )
+        return session
 
-        # Store session in module-level dict
-        _sessions[call_sid] = session
+    async def _new_session(self, call_sid: str) -> CallSession:
+        """Start a call's session and record without storing the session."""
+        # Create call record in database (write-behind)
+        self.call_record_writer.schedule(call_sid)
 
-        return session
+        # Initialize conversation state
+        state = await self.agent_service.initialize_state(call_sid, "", "")
+
+        return CallSession(call_sid=call_sid, state=state)
+
+    async def _resolve_call_id(self, session: CallSession) -> int:
+        """Get the database id of the session's Call row, creating it if needed."""
+        if session.call_id is None:
+            call_id = await self.call_record_writer.wait(session.call_sid)
+            if call_id is None:
+                # Insert ran on another worker, failed, or its id was evicted from the writer
+                call_record = await self.call_persistence.create_call(session.call_sid)
+                call_id = call_record.id
+            session.call_id = call_id
+        return session.call_id
 
     async def get_session(self, call_sid: str) -> Optional[CallSession]:
         """Get an existing call session."""
-        return _sessions.get(call_sid)
+        return await self.session_store.get(call_sid)
+
+    async def save_session(self, session: CallSession) -> None:
+        """Write a (possibly mutated) session back to the store."""
+        session.touch()
+        await self.session_store.set(session)
+
+    async def start_call(self, call_sid: str, base_url: str = "") -> bytes:
+        """
+        Answer an incoming call.
+
+        Creates the session and returns the greeting TwiML from a precompiled
+        template, without waiting on the database or the menu.
+
+        Returns:
+            TwiML XML response bytes
+        """
+        greeting = await self.get_greeting(call_sid)
+        gather_url = self._gather_url(call_sid, base_url)
+        with TWIML_RENDER_SECONDS.time("greeting"):
+            template = self.tts_service.compile_twiml_with_gather(
+                greeting, partial_url=self._partial_url(base_url)
+            )
+            return template.render(gather_url)
 
     async def get_greeting(self, call_sid: str) -> str:
         """Get greeting message for a call."""
         session = await self.get_session(call_sid)
         if not session:
-            session = await self.create_session(call_sid)
+            # Stored once below, with the greeting in the transcript
+            session = await self._new_session(call_sid)
 
         greeting = await self.agent_service.get_greeting(session.state)
+        await self.save_session(session)
         return greeting
 
     async def process_user_speech(
-        self, call_sid: str, speech_result: Optional[str] = None, base_url: str = ""
+        self,
+        call_sid: str,
+        speech_result: Optional[str] = None,
+        base_url: str = "",
+        idempotency_token: Optional[str] = None,
     ) -> str:
         """
         Process user speech and generate response.
@@ -88,13 +195,164 @@ class CallSessionManager:
         Args:
             call_sid: Twilio call SID
             speech_result: Transcribed speech from Twilio (if available)
+            idempotency_token: Twilio's I-Twilio-Idempotency-Token, the same on retries
 
         Returns:
             TwiML XML response
         """
+        # The latency budget starts when Twilio's request arrives
+        deadline = Deadline.start(settings.turn_budget_seconds)
+
+        async def run_turn() -> str:
+            # Only one turn per call may run at a time
+            async with _call_locks.hold(call_sid):
+                session = await self.get_session(call_sid)
+                if not session:
+                    session = await self.create_session(call_sid)
+                result = await self._run_turn(session, speech_result, deadline=deadline)
+                return self._render_turn(call_sid, result, base_url)
+
+        with call_context(call_sid):
+            # A retry of a turn we already answered (or are answering) gets the same TwiML back
+            replays_before = _turn_responses.replays
+            twiml = await _turn_responses.answer(call_sid, speech_result, idempotency_token, run_turn)
+            if _turn_responses.replays != replays_before:
+                logger.info(f"[SESSION MANAGER] Replayed TwiML for duplicate delivery for call {call_sid}")
+            return twiml
+
+    async def speculate(self, call_sid: str, partial_text: str) -> bool:
+        """
+        Start the agent on a partial transcript without committing any state.
+
+        The agent works on a copy of the call state. process_user_speech adopts
+        the result if the final transcript matches the partial closely enough.
+
+        Args:
+            call_sid: Twilio call SID
+            partial_text: Stable partial transcript from Twilio
+
+        Returns:
+            True if a speculative turn was started
+        """
+        if not settings.speculative_turns_enabled or _call_locks.is_locked(call_sid):
+            return False
         session = await self.get_session(call_sid)
-        if not session:
-            session = await self.create_session(call_sid)
+        if not session or session.state.stage == ConversationStage.CONCLUSION:
+            return False
+
+        state = session.state.model_copy(deep=True)
+
+        async def run():
+            # Nobody is waiting on a guess yet; live turns go first for model capacity
+            with call_context(call_sid), request_priority(PRIORITY_BACKGROUND):
+                agent_response = await self.agent_service.process_user_input(state, partial_text)
+            return agent_response, state
+
+        return _speculations.start(call_sid, partial_text, len(session.state.transcript), run)
+
+    async def process_user_text(
+        self,
+        call_sid: str,
+        text: Optional[str],
+        on_response: Optional[ResponseCallback] = None,
+    ) -> TurnResult:
+        """
+        Process a finished utterance from a media stream.
+
+        Same turn logic as process_user_speech, but returns the reply text for
+        the caller's own synthesis instead of TwiML.
+
+        Args:
+            call_sid: Twilio call SID
+            text: Transcript of the caller's utterance
+            on_response: Called with the LLM's response text as soon as it is
+                generated, so synthesis can start before the turn finishes
+
+        Returns:
+            TurnResult with the reply text and whether to end the call
+        """
+        deadline = Deadline.start(settings.turn_budget_seconds)
+        with call_context(call_sid):
+            async with _call_locks.hold(call_sid):
+                session = await self.get_session(call_sid)
+                if not session:
+                    session = await self.create_session(call_sid)
+                return await self._run_turn(session, text, on_response, deadline)
+
+    async def _run_turn(
+        self,
+        session: CallSession,
+        speech_result: Optional[str],
+        on_response: Optional[ResponseCallback] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> TurnResult:
+        """Run a turn under its deadline and write the session back, even if it fails."""
+        if settings.debug_buffer_enabled:
+            session.debug = _debug_buffers.for_call(session.call_sid)
+        try:
+            with turn_deadline(deadline), debug_events(session.debug):
+                return await self._process_turn(session, speech_result, on_response)
+        finally:
+            # Sessions from shared stores are copies, so write the turn back
+            await self.save_session(session)
+
+    def _gather_url(self, call_sid: str, base_url: str = "") -> str:
+        """URL Twilio posts the next gathered utterance to."""
+        return f"{base_url}/webhooks/voice/gather?CallSid={call_sid}"
+
+    def _partial_url(self, base_url: str = "") -> Optional[str]:
+        """URL Twilio posts partial transcripts to (None when speculation is off)."""
+        if not settings.speculative_turns_enabled:
+            return None
+        return f"{base_url}/webhooks/voice/partial"
+
+    def _render_turn(self, call_sid: str, result: TurnResult, base_url: str) -> str:
+        """Render a turn's reply as TwiML."""
+        if result.end_call:
+            with TWIML_RENDER_SECONDS.time("hangup"):
+                return self.tts_service.generate_twiml_hangup(result.response_text)
+        with TWIML_RENDER_SECONDS.time("gather"):
+            return self.tts_service.generate_twiml_with_gather(
+                result.response_text,
+                self._gather_url(call_sid, base_url),
+                partial_url=self._partial_url(base_url),
+            )
+
+    async def _agent_turn(
+        self,
+        session: CallSession,
+        speech_result: str,
+        on_response: Optional[ResponseCallback] = None,
+    ) -> Dict[str, Any]:
+        """Get the agent's response, adopting a matching speculative run if there is one."""
+        base_version = len(session.state.transcript)
+        extractor = None
+        if session.call_sid in _speculations:
+            extractor = await self.menu_repository.get_entity_extractor()
+        speculative = await _speculations.take(session.call_sid, speech_result, base_version, extractor)
+        if speculative is None:
+            if on_response is None:
+                return await self.agent_service.process_user_input(session.state, speech_result)
+            return await self.agent_service.process_user_input(
+                session.state, speech_result, on_response=on_response
+            )
+
+        agent_response, state = speculative
+        record_debug_event("speculation_adopted", utterance=speech_result, response=agent_response)
+        # The copy was taken before this turn was counted and heard the partial transcript
+        state.turn_count = session.state.turn_count
+        state.transcript[base_version] = f"Customer: {speech_result}"
+        session.state = state
+        return agent_response
+
+    async def _process_turn(
+        self,
+        session: CallSession,
+        speech_result: Optional[str],
+        on_response: Optional[ResponseCallback] = None,
+    ) -> TurnResult:
+        """Run one conversation turn against a loaded session."""
+        call_sid = session.call_sid
 
         # Validate speech result
         if not speech_result or not speech_result.strip():
@@ -103,10 +361,7 @@ class CallSessionManager:
                 f"[SESSION MANAGER] Empty speech result for call {call_sid}"
             )
             response_text = "I didn't catch that. Could you please repeat what you'd like?"
-            gather_url = f"{base_url}/webhooks/voice/gather?CallSid={call_sid}" if base_url else f"/webhooks/voice/gather?CallSid={call_sid}"
-            return self.tts_service.generate_twiml_with_gather(
-                response_text, gather_url
-            )
+            return TurnResult(response_text)
 
         # Check for very short speech (likely transcription error or noise)
         if len(speech_result.strip()) < 2:
@@ -114,14 +369,11 @@ class CallSessionManager:
                 f"[SESSION MANAGER] Very short speech result for call {call_sid}: '{speech_result}'"
             )
             response_text = "I didn't quite get that. Could you please say that again?"
-            gather_url = f"{base_url}/webhooks/voice/gather?CallSid={call_sid}" if base_url else f"/webhooks/voice/gather?CallSid={call_sid}"
-            return self.tts_service.generate_twiml_with_gather(
-                response_text, gather_url
-            )
+            return TurnResult(response_text)
 
         # Increment turn count
         session.state.turn_count += 1
-        logger.info(f"[SESSION MANAGER] Turn {session.state.turn_count} for call {call_sid}")
+        logger.info("[SESSION MANAGER] Turn %d for call %s", session.state.turn_count, call_sid)
 
         # Check turn limit (20 turns max)
         MAX_TURNS = 20
@@ -134,17 +386,13 @@ class CallSessionManager:
                 "I apologize, but I'm having difficulty completing your order. "
                 "Would you like me to transfer you to someone who can help?"
             )
-            from app.services.agent.stages import ConversationStage
             session.state.stage = ConversationStage.CONCLUSION
-            gather_url = f"{base_url}/webhooks/voice/gather?CallSid={call_sid}" if base_url else f"/webhooks/voice/gather?CallSid={call_sid}"
-            return self.tts_service.generate_twiml_with_gather(
-                response_text, gather_url
-            )
+            TURN_LIMIT_HITS.inc()
+            await self._flush_debug(session, "turn_limit")
+            return TurnResult(response_text)
 
         # Process user input through agent
-        agent_response = await self.agent_service.process_user_input(
-            session.state, speech_result
-        )
+        agent_response = await self._agent_turn(session, speech_result, on_response)
 
         # Validate agent response has required fields
         if not agent_response or not isinstance(agent_response, dict):
@@ -152,18 +400,21 @@ class CallSessionManager:
                 f"[SESSION MANAGER] Invalid agent response (not a dict): {agent_response}"
             )
             response_text = "I'm having trouble processing that. Could you please say that again?"
-            gather_url = f"{base_url}/webhooks/voice/gather?CallSid={call_sid}" if base_url else f"/webhooks/voice/gather?CallSid={call_sid}"
-            return self.tts_service.generate_twiml_with_gather(
-                response_text, gather_url
-            )
+            return TurnResult(response_text)
 
         response_text = agent_response.get("response", "")
         intent = agent_response.get("intent", "")
         action = agent_response.get("action", {})
         has_error = agent_response.get("error", False)
 
+        # The agent leaves the text empty when this manager supplies it below
+        # (order read-back on entering REVIEW, closing message on completion)
+        manager_supplies_response = intent == "completing" or (
+            session.state.stage == ConversationStage.REVIEW and not session.state.order_read_back
+        )
+
         # Treat as error if response text is missing or empty
-        if not response_text or not response_text.strip():
+        if (not response_text or not response_text.strip()) and not manager_supplies_response:
             logger.warning(
                 "[SESSION MANAGER] Agent returned empty response text, treating as error"
             )
@@ -172,6 +423,7 @@ class CallSessionManager:
 
         # Track consecutive errors
         if has_error:
+            await self._flush_debug(session, "agent_error")
             session.state.consecutive_errors += 1
             logger.warning(
                 f"[SESSION MANAGER] Consecutive errors: {session.state.consecutive_errors} "
@@ -188,12 +440,9 @@ class CallSessionManager:
                     "I'm having trouble understanding you. "
                     "Would you like me to transfer you to someone who can help with your order?"
                 )
-                from app.services.agent.stages import ConversationStage
+                AGENT_FALLBACKS.inc("transfer")
                 session.state.stage = ConversationStage.CONCLUSION
-                gather_url = f"{base_url}/webhooks/voice/gather?CallSid={call_sid}" if base_url else f"/webhooks/voice/gather?CallSid={call_sid}"
-                return self.tts_service.generate_twiml_with_gather(
-                    response_text, gather_url
-                )
+                return TurnResult(response_text)
         else:
             # Reset error counter on successful response
             session.state.consecutive_errors = 0
@@ -204,45 +453,18 @@ class CallSessionManager:
                 "[SESSION MANAGER] Skipping action processing due to agent error/fallback response"
             )
             # Keep current stage and just return the clarification response
-            gather_url = f"{base_url}/webhooks/voice/gather?CallSid={call_sid}" if base_url else f"/webhooks/voice/gather?CallSid={call_sid}"
-            return self.tts_service.generate_twiml_with_gather(
-                response_text, gather_url
-            )
-
-        # Validate action structure
-        if not isinstance(action, dict) or "type" not in action:
-            logger.warning(
-                f"[SESSION MANAGER] Invalid action structure: {action}, setting to none"
-            )
-            action = {"type": "none"}
+            return TurnResult(response_text)
 
-        # Validate action type is allowed in current stage
-        action_type = action.get("type", "none")
-        if not self._is_action_allowed_in_stage(action_type, session.state.stage):
-            logger.warning(
-                f"[SESSION MANAGER] Action '{action_type}' not allowed in stage "
-                f"{session.state.stage.value}"
-            )
-            # Reset action to none if invalid for current stage
-            action = {"type": "none"}
+        # An utterance may carry several actions ("two burgers and a coke")
+        actions = agent_response.get("actions")
+        if not isinstance(actions, list) or not actions:
+            actions = [action]
 
-        # Handle action
-        if action.get("type") == "add_item":
-            response_text = await self._handle_add_item(
-                action, speech_result, session, response_text
-            )
-        elif action.get("type") == "add_modifiers":
-            response_text = await self._handle_add_modifiers(
-                action, speech_result, session, response_text
-            )
-        elif action.get("type") == "remove_item":
-            response_text = await self._handle_remove_item(action, session, response_text)
-        elif action.get("type") == "modify_item":
-            response_text = await self._handle_modify_item(action, session, response_text)
+        for action in actions:
+            response_text = await self._apply_action(action, speech_result, session, response_text)
 
         # Handle REVIEW stage: read back order on first entry (server-side)
         # IMPORTANT: Do this BEFORE confirmation check to ensure revised orders are read back
-        from app.services.agent.stages import ConversationStage
 
         # Check if customer is asking for order repeat in REVIEW stage
         repeat_keywords = ["repeat", "say that again", "what did", "can you repeat", "tell me again", "what was"]
@@ -326,30 +548,19 @@ class CallSessionManager:
                             "Please call us back in a few minutes to place your order."
                         )
                         session.state.stage = ConversationStage.CONCLUSION
+                        await self._flush_debug(session, "persistence_failure")
 
-        # Generate TwiML response
-        if session.state.stage == ConversationStage.CONCLUSION:
-            # End call - escape XML and use consistent voice
-            escaped_text = (
-                response_text.replace("&", "&amp;")
-                .replace("<", "&lt;")
-                .replace(">", "&gt;")
-                .replace('"', "&quot;")
-                .replace("'", "&apos;")
-            )
-            return f"""<?xml version="1.0" encoding="UTF-8"?>
-<Response>
-    <Say voice="Polly.Joanna-Neural">{escaped_text}</Say>
-    <Pause length="1"/>
-    <Hangup/>
-</Response>"""
-        else:
-            # Continue conversation
-            gather_url = f"{base_url}/webhooks/voice/gather?CallSid={call_sid}" if base_url else f"/webhooks/voice/gather?CallSid={call_sid}"
-            return self.tts_service.generate_twiml_with_gather(
-                response_text,
-                gather_url,
-            )
+        # End the call once the conversation has concluded
+        return TurnResult(
+            response_text, end_call=session.state.stage == ConversationStage.CONCLUSION
+        )
+
+    async def _flush_debug(self, session: CallSession, reason: str) -> None:
+        """Write out the call's debug events and start its buffer afresh."""
+        if session.debug is None or not len(session.debug):
+            return
+        await flush_debug_events(session.call_sid, reason)
+        session.debug.clear()
 
     def _is_action_allowed_in_stage(
         self, action_type: str, stage: ConversationStage
@@ -360,7 +571,6 @@ class CallSessionManager:
         Returns:
             True if action is allowed, False otherwise
         """
-        from app.services.agent.stages import ConversationStage
 
         # Map of stages to allowed action types
         stage_allowed_actions = {
@@ -379,6 +589,47 @@ class CallSessionManager:
         allowed = stage_allowed_actions.get(stage, ["none"])
         return action_type in allowed
 
+    async def _apply_action(
+        self,
+        action: Any,
+        speech_result: Optional[str],
+        session: CallSession,
+        response_text: str,
+    ) -> str:
+        """Validate one agent action against the current stage and apply it."""
+        # Validate action structure
+        if not isinstance(action, dict) or "type" not in action:
+            logger.warning(
+                f"[SESSION MANAGER] Invalid action structure: {action}, setting to none"
+            )
+            action = {"type": "none"}
+
+        # Validate action type is allowed in current stage
+        action_type = action.get("type", "none")
+        if not self._is_action_allowed_in_stage(action_type, session.state.stage):
+            logger.warning(
+                f"[SESSION MANAGER] Action '{action_type}' not allowed in stage "
+                f"{session.state.stage.value}"
+            )
+            # Reset action to none if invalid for current stage
+            action = {"type": "none"}
+
+        # Handle action
+        if action.get("type") == "add_item":
+            response_text = await self._handle_add_item(
+                action, speech_result, session, response_text
+            )
+        elif action.get("type") == "add_modifiers":
+            response_text = await self._handle_add_modifiers(
+                action, speech_result, session, response_text
+            )
+        elif action.get("type") == "remove_item":
+            response_text = await self._handle_remove_item(action, session, response_text)
+        elif action.get("type") == "modify_item":
+            response_text = await self._handle_modify_item(action, session, response_text)
+
+        return response_text
+
     async def _handle_add_item(
         self,
         action: Dict[str, Any],
@@ -387,18 +638,14 @@ class CallSessionManager:
         response_text: str,
     ) -> str:
         """Handle add_item action."""
-        logger.info("=" * 80)
-        logger.info(f"[SESSION MANAGER] add_item action received - Action: {action}")
+        logger.debug("[SESSION MANAGER] add_item action received - Action: %s", action)
         order_item = await self.order_parser.parse_agent_action(action, speech_result)
-        logger.info(f"[SESSION MANAGER] Parsed order_item: {order_item}")
-        
+        logger.debug("[SESSION MANAGER] Parsed order_item: %s", order_item)
+
         if order_item:
             # Validate item
             is_valid, errors = await self.order_parser.validate_order_item(order_item)
-            logger.info(
-                f"[SESSION MANAGER] Item validation - Valid: {is_valid}, Errors: {errors}"
-            )
-            
+
             if is_valid:
                 # Add to state
                 state_item = StateOrderItem(
@@ -406,31 +653,21 @@ class CallSessionManager:
                     quantity=order_item.quantity,
                     modifiers=order_item.modifiers,
                 )
-                logger.info(
-                    f"[SESSION MANAGER] Adding item to state - Item: {state_item.item_name}, "
-                    f"Qty: {state_item.quantity}, Mods: {state_item.modifiers}"
-                )
                 session.state.add_order_item(state_item)
                 logger.info(
-                    f"[SESSION MANAGER] Item added! Current order now has "
-                    f"{len(session.state.current_order)} items"
+                    "[SESSION MANAGER] Added %s x%d %s; order now has %d items",
+                    state_item.item_name,
+                    state_item.quantity,
+                    state_item.modifiers,
+                    len(session.state.current_order),
                 )
-                order_items_repr = [
-                    {"name": item.item_name, "qty": item.quantity, "mods": item.modifiers}
-                    for item in session.state.current_order
-                ]
-                logger.info(f"[SESSION MANAGER] Current order items: {order_items_repr}")
-                logger.info("=" * 80)
 
                 # Simplified: Trust LLM to capture modifiers in the conversation naturally
                 # No automatic follow-up questions - keeps flow conversational
             else:
-                logger.warning(f"[SESSION MANAGER] Item validation failed: {errors}")
+                logger.warning("[SESSION MANAGER] Item validation failed: %s", errors)
                 if errors:
                     response_text += f" {errors[0]}"
-                logger.info("=" * 80)
-        else:
-            logger.info("=" * 80)
 
         return response_text
 
@@ -545,8 +782,9 @@ class CallSessionManager:
             ]
 
             # Create order
+            call_id = await self._resolve_call_id(session)
             order = await self.order_persistence.create_order(
-                call_id=session.call_id,
+                call_id=call_id,
                 raw_text=session.state.get_transcript_text(),
                 structured_order={"items": order_items},
             )
@@ -577,54 +815,73 @@ class CallSessionManager:
             call_sid: Twilio call SID
             status: Call status - "completed", "failed", "busy", or "no-answer"
         """
-        from datetime import datetime
-        from sqlalchemy import select, func
-        from app.db.models import Order
-        
         session = await self.get_session(call_sid)
-        
-        # Get the call record to check for orders
-        call_record = await self.call_persistence.get_call_by_sid(call_sid)
-        if not call_record:
-            # Call doesn't exist, nothing to do
-            return
-        
-        # Check if call has any orders in the database
-        result = await self.db.execute(
-            select(func.count(Order.id)).where(Order.call_id == call_record.id)
-        )
-        order_count = result.scalar() or 0
-        
-        # Also check session state for orders (in case they're in memory but not persisted)
-        has_orders_in_session = False
-        if session and session.state and session.state.current_order:
-            has_orders_in_session = len(session.state.current_order) > 0
-        
-        # Determine final status
-        # If no orders, always mark as failed
-        if order_count == 0 and not has_orders_in_session:
-            db_status = "failed"
-        # If Twilio status indicates failure, mark as failed
-        elif status in ["failed", "busy", "no-answer"]:
-            db_status = "failed"
-        # Otherwise mark as completed (has orders)
-        else:
-            db_status = "completed"
-        
-        # Always update status (never leave as in_progress)
-        await self.call_persistence.update_call_status(
-            call_sid, db_status, ended_at=datetime.utcnow()
-        )
-
-        # Update transcript if available
-        if session and session.state:
-            transcript = session.state.get_transcript_text()
-            if transcript:
-                await self.call_persistence.update_call_transcript(
-                    call_sid, transcript
-                )
-
-        # Remove from memory
-        if call_sid in _sessions:
-            del _sessions[call_sid]
 
+        # Make sure a write-behind insert of the Call row has landed first
+        await self.call_record_writer.wait(call_sid)
+        await finalize_call(self.db, call_sid, session, status)
+
+        # Remove from session store
+        await self.session_store.delete(call_sid)
+        discard_call_state(call_sid)
+
+
+async def finalize_call(
+    db: AsyncSession,
+    call_sid: str,
+    session: Optional[CallSession],
+    status: str = "completed",
+) -> Optional[str]:
+    """Write the final status and transcript of a call to its Call record.
+
+    Shared by end_session and the idle session reaper.
+
+    Returns:
+        The status written to the database, or None if there is no call record
+    """
+    from datetime import datetime
+    from sqlalchemy import select, func
+    from app.db.models import Order
+
+    call_persistence = CallPersistenceService(db)
+
+    # Get the call record to check for orders
+    call_record = await call_persistence.get_call_by_sid(call_sid)
+    if not call_record:
+        # Call doesn't exist, nothing to do
+        return None
+
+    # Check if call has any orders in the database
+    result = await db.execute(
+        select(func.count(Order.id)).where(Order.call_id == call_record.id)
+    )
+    order_count = result.scalar() or 0
+
+    # Also check session state for orders (in case they're in memory but not persisted)
+    has_orders_in_session = False
+    if session and session.state and session.state.current_order:
+        has_orders_in_session = len(session.state.current_order) > 0
+
+    # Determine final status
+    # If no orders, always mark as failed
+    if order_count == 0 and not has_orders_in_session:
+        db_status = "failed"
+    # If Twilio status indicates failure, mark as failed
+    elif status in ["failed", "busy", "no-answer"]:
+        db_status = "failed"
+    # Otherwise mark as completed (has orders)
+    else:
+        db_status = "completed"
+
+    # Always update status (never leave as in_progress)
+    await call_persistence.update_call_status(
+        call_sid, db_status, ended_at=datetime.utcnow()
+    )
+
+    # Update transcript if available
+    if session and session.state:
+        transcript = session.state.get_transcript_text()
+        if transcript:
+            await call_persistence.update_call_transcript(call_sid, transcript)
+
+    return db_status
@@ -0,0 +1,253 @@
+"""Conversation over a Twilio bidirectional media stream."""
+import asyncio
+import base64
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.models import TurnResult
+from app.services.speech.audio import split_frames
+from app.services.speech.streaming import (
+    FINAL,
+    SPEECH_ENDED,
+    SPEECH_STARTED,
+    StreamingSTT,
+    StreamingTTS,
+    split_sentences,
+)
+
+logger = logging.getLogger(__name__)
+
+# Work items for the turn worker
+_GREETING = "greeting"
+_AUDIO = "audio"
+_TEXT = "text"
+
+
+class MediaStreamHandler:
+    """Runs one call's STT -> agent -> TTS loop over a media stream.
+
+    Inbound audio is endpointed as it arrives, so a turn starts the moment the
+    caller stops talking rather than after Twilio's own endpointing and a
+    webhook round trip. Replies are synthesized a sentence at a time and
+    streamed back while the next sentence is synthesized. If the caller starts
+    talking over playback, the audio Twilio has buffered is cleared (barge-in).
+    With LLM streaming, synthesis of the first sentence starts as soon as the
+    agent's response has been generated, before the rest of the turn runs.
+
+    Turns for the call run one at a time on a worker task so the receive loop
+    keeps consuming audio (and can detect barge-in) while the agent thinks.
+    """
+
+    def __init__(
+        self,
+        session_manager: CallSessionManager,
+        stt: StreamingSTT,
+        tts: StreamingTTS,
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+    ):
+        self.session_manager = session_manager
+        self.stt = stt
+        self.tts = tts
+        self._send_message = send
+        self._send_lock = asyncio.Lock()
+        self.stream_sid: Optional[str] = None
+        self.call_sid: Optional[str] = None
+        self.closed = False
+        self.barge_ins = 0
+        self._turns: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._playback: Optional[asyncio.Task] = None
+        self._outstanding_marks: Set[str] = set()
+        self._mark_count = 0
+        self._hangup_mark: Optional[str] = None
+        # First sentence of a reply, synthesized while the turn is still finishing
+        self._early_speech: Optional[Tuple[str, asyncio.Task]] = None
+
+    @property
+    def speaking(self) -> bool:
+        """True while reply audio is being sent or is still playing on the call."""
+        playing = self._playback is not None and not self._playback.done()
+        return playing or bool(self._outstanding_marks)
+
+    async def handle_event(self, message: Dict[str, Any]) -> bool:
+        """
+        Handle one message from Twilio.
+
+        Returns:
+            False once the stream should be closed
+        """
+        event = message.get("event")
+        if event == "start":
+            await self._on_start(message.get("start", {}))
+        elif event == "media":
+            await self._on_media(message.get("media", {}))
+        elif event == "mark":
+            self._on_mark(message.get("mark", {}).get("name"))
+        elif event == "stop":
+            logger.info(f"[MEDIA STREAM] Stream stopped for call {self.call_sid}")
+            self.closed = True
+        return not self.closed
+
+    async def _on_start(self, start: Dict[str, Any]) -> None:
+        """Bind the stream to its call and greet the caller."""
+        self.stream_sid = start.get("streamSid")
+        self.call_sid = start.get("callSid")
+        logger.info(
+            f"[MEDIA STREAM] Stream {self.stream_sid} started for call {self.call_sid}"
+        )
+        self._worker = asyncio.create_task(self._run_turns())
+        self._turns.put_nowait((_GREETING, None))
+
+    async def _on_media(self, media: Dict[str, Any]) -> None:
+        """Feed inbound audio to the recognizer and act on what it hears."""
+        if self.call_sid is None or media.get("track", "inbound") != "inbound":
+            return
+        audio = base64.b64decode(media.get("payload", ""))
+        for event in await self.stt.feed(audio):
+            if event.kind == SPEECH_STARTED:
+                await self._barge_in()
+            elif event.kind == SPEECH_ENDED:
+                self._turns.put_nowait((_AUDIO, event.audio))
+            elif event.kind == FINAL:
+                self._turns.put_nowait((_TEXT, event.text))
+
+    def _on_mark(self, name: Optional[str]) -> None:
+        """Twilio finished playing everything sent before this mark."""
+        self._outstanding_marks.discard(name)
+        if name is not None and name == self._hangup_mark:
+            logger.info(f"[MEDIA STREAM] Closing message played, ending call {self.call_sid}")
+            self.closed = True
+
+    async def _barge_in(self) -> None:
+        """Stop talking because the caller started talking."""
+        # The closing message is always played in full
+        if not self.speaking or self._hangup_mark is not None:
+            return
+        if self._playback is not None and not self._playback.done():
+            self._playback.cancel()
+        self._outstanding_marks.clear()
+        await self._send({"event": "clear", "streamSid": self.stream_sid})
+        self.barge_ins += 1
+        logger.info(f"[MEDIA STREAM] Caller barged in on call {self.call_sid}")
+
+    async def _run_turns(self) -> None:
+        """Process greeting and utterances in order, speaking each reply."""
+        while True:
+            kind, payload = await self._turns.get()
+            try:
+                result = await self._take_turn(kind, payload)
+                if result is not None:
+                    await self._play(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    f"[MEDIA STREAM] Turn failed for call {self.call_sid}: "
+                    f"{type(e).__name__}: {str(e)}",
+                    exc_info=True,
+                )
+            finally:
+                self._discard_early_speech()
+                self._turns.task_done()
+
+    async def _take_turn(self, kind: str, payload: Any) -> Optional[TurnResult]:
+        """Get the agent's reply for one work item (None if there is nothing to say)."""
+        if kind == _GREETING:
+            greeting = await self.session_manager.get_greeting(self.call_sid)
+            return TurnResult(greeting)
+
+        text = payload
+        if kind == _AUDIO:
+            text = await self.stt.transcribe(payload)
+        if not text or not text.strip():
+            # Noise that tripped the endpointer; don't answer it
+            logger.debug(f"[MEDIA STREAM] Empty transcript for call {self.call_sid}, ignoring")
+            return None
+
+        logger.info(f"[MEDIA STREAM] Caller said '{text[:200]}' on call {self.call_sid}")
+        return await self.session_manager.process_user_text(
+            self.call_sid, text, on_response=self._start_early_speech
+        )
+
+    async def _start_early_speech(self, response_text: str) -> None:
+        """Start synthesizing a reply's first sentence before the turn has finished."""
+        self._discard_early_speech()
+        sentences = split_sentences(response_text) or [response_text]
+        task = asyncio.create_task(self.tts.synthesize(sentences[0]))
+        # Unused synthesis may fail unobserved; don't log it as unretrieved
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._early_speech = (sentences[0], task)
+
+    def _take_early_speech(self, sentence: str) -> Optional[asyncio.Task]:
+        """Claim early synthesis if the final reply starts with the same sentence."""
+        early, self._early_speech = self._early_speech, None
+        if early is None:
+            return None
+        if early[0] != sentence:
+            # Stage transitions changed the reply (e.g. the order read-back)
+            early[1].cancel()
+            return None
+        return early[1]
+
+    def _discard_early_speech(self) -> None:
+        """Cancel unused early synthesis."""
+        if self._early_speech is not None:
+            self._early_speech[1].cancel()
+            self._early_speech = None
+
+    async def _play(self, result: TurnResult) -> None:
+        """Speak a reply and wait until it has been sent (or interrupted)."""
+        self._playback = asyncio.create_task(
+            self._stream_speech(result.response_text, hangup=result.end_call)
+        )
+        # A barge-in cancels the playback task, not the worker
+        await asyncio.wait([self._playback])
+
+    async def _stream_speech(self, text: str, hangup: bool) -> None:
+        """Synthesize sentence by sentence, sending each while the next is synthesized."""
+        sentences = split_sentences(text) or [text]
+        pending = self._take_early_speech(sentences[0])
+        if pending is None:
+            pending = asyncio.create_task(self.tts.synthesize(sentences[0]))
+        try:
+            for index in range(len(sentences)):
+                audio = await pending
+                if index + 1 < len(sentences):
+                    pending = asyncio.create_task(self.tts.synthesize(sentences[index + 1]))
+                for frame in split_frames(audio):
+                    await self._send({
+                        "event": "media",
+                        "streamSid": self.stream_sid,
+                        "media": {"payload": base64.b64encode(frame).decode()},
+                    })
+
+            # Twilio echoes the mark once everything before it has played
+            self._mark_count += 1
+            name = f"reply-{self._mark_count}"
+            self._outstanding_marks.add(name)
+            if hangup:
+                self._hangup_mark = name
+            await self._send({"event": "mark", "streamSid": self.stream_sid, "mark": {"name": name}})
+        finally:
+            if not pending.done():
+                pending.cancel()
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        """Send one message; playback and barge-in share the socket."""
+        async with self._send_lock:
+            await self._send_message(message)
+
+    async def wait_idle(self) -> None:
+        """Wait until every queued turn has been answered and sent."""
+        await self._turns.join()
+
+    async def close(self) -> None:
+        """Stop background work for the stream."""
+        self._discard_early_speech()
+        for task in (self._playback, self._worker):
+            if task is not None and not task.done():
+                task.cancel()
+        for task in (self._playback, self._worker):
+            if task is not None:
+                await asyncio.gather(task, return_exceptions=True)
@@ -1,6 +1,8 @@
 """Call session models."""
+import time
 from typing import Optional, Dict, Any
 from app.services.agent.state import ConversationState
+from app.services.agent.debug_events import DebugRingBuffer
 
 
 class CallSession:
@@ -11,8 +13,44 @@ class CallSession:
         call_sid: str,
         state: ConversationState,
         call_id: Optional[int] = None,
+        last_activity: Optional[float] = None,
     ):
         self.call_sid = call_sid
         self.state = state
         self.call_id = call_id  # Database ID
+        self.last_activity = last_activity or time.time()  # Wall clock, shared across workers
+        self.debug: Optional[DebugRingBuffer] = None  # Recent diagnostics (process-local, not stored)
 
+    def touch(self) -> None:
+        """Record activity on the call (used for idle eviction)."""
+        self.last_activity = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize session for storage in a shared session store."""
+        return {
+            "call_sid": self.call_sid,
+            "call_id": self.call_id,
+            "last_activity": self.last_activity,
+            "state": self.state.model_dump(mode="json"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CallSession":
+        """Rebuild a session from its stored representation."""
+        return cls(
+            call_sid=data["call_sid"],
+            state=ConversationState.model_validate(data["state"]),
+            call_id=data.get("call_id"),
+            last_activity=data.get("last_activity"),
+        )
+
+
+class TurnResult:
+    """Outcome of one conversation turn, independent of how it is delivered."""
+
+    def __init__(self, response_text: str, end_call: bool = False):
+        self.response_text = response_text  # What the agent says next
+        self.end_call = end_call  # Hang up after speaking
+
+    def __repr__(self) -> str:
+        return f"TurnResult(response_text={self.response_text!r}, end_call={self.end_call})"
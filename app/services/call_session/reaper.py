@@ -0,0 +1,185 @@
+"""Background eviction of abandoned call sessions."""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.call_session.models import CallSession
+from app.services.call_session.store import SessionStore
+from app.services.call_session.manager import (
+    discard_call_state,
+    finalize_call,
+    hold_call,
+    is_turn_in_progress,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SessionReaper:
+    """Evicts sessions whose status callback never arrived.
+
+    Sessions are normally removed by end_session when Twilio posts the final
+    call status. If that callback is lost, the reaper finalizes the Call row
+    the same way and drops the session once it has been idle for
+    ``idle_ttl_seconds``. It also keeps the store under ``max_sessions`` and
+    ``max_bytes`` by evicting the least recently active sessions first.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        db_session_factory: Callable[[], AsyncSession],
+        idle_ttl_seconds: float = 900.0,
+        max_sessions: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        interval_seconds: float = 30.0,
+    ):
+        self.store = store
+        self.db_session_factory = db_session_factory
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+        # Eviction statistics
+        self.sweeps = 0
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+        self.evicted_bytes = 0
+        self.finalize_failures = 0
+        self.last_session_count = 0
+        self.last_session_bytes = 0
+
+    @staticmethod
+    def _session_size(session: CallSession) -> int:
+        """Approximate memory held by a session (its serialized size)."""
+        return len(json.dumps(session.to_dict()))
+
+    async def sweep(self) -> int:
+        """Run one eviction pass.
+
+        Returns:
+            Number of sessions evicted
+        """
+        now = time.time()
+        # Activity is read now: with the in-memory store these are the live
+        # sessions, which a turn may touch before their eviction comes up
+        sessions: List[Tuple[CallSession, int, float]] = [
+            (session, self._session_size(session), session.last_activity)
+            for session in await self.store.list_sessions()
+        ]
+        # Least recently active first
+        sessions.sort(key=lambda entry: entry[2])
+
+        evicted = 0
+        remaining: List[Tuple[CallSession, int, float]] = []
+        for session, size, seen_activity in sessions:
+            if now - seen_activity > self.idle_ttl_seconds:
+                if await self._evict(session.call_sid, seen_activity, size, "idle"):
+                    self.evicted_idle += 1
+                    evicted += 1
+                    continue
+            remaining.append((session, size, seen_activity))
+
+        total_bytes = sum(size for _, size, _ in remaining)
+        while remaining and self._over_budget(len(remaining), total_bytes):
+            session, size, seen_activity = remaining.pop(0)
+            if await self._evict(session.call_sid, seen_activity, size, "capacity"):
+                self.evicted_capacity += 1
+                evicted += 1
+                total_bytes -= size
+
+        self.sweeps += 1
+        self.last_session_count = len(remaining)
+        self.last_session_bytes = total_bytes
+        if evicted:
+            logger.warning(
+                f"[SESSION REAPER] Evicted {evicted} sessions "
+                f"(idle total: {self.evicted_idle}, capacity total: {self.evicted_capacity}, "
+                f"bytes total: {self.evicted_bytes}); {len(remaining)} sessions remain"
+            )
+        return evicted
+
+    def _over_budget(self, count: int, total_bytes: int) -> bool:
+        if self.max_sessions is not None and count > self.max_sessions:
+            return True
+        return self.max_bytes is not None and total_bytes > self.max_bytes
+
+    async def _evict(self, call_sid: str, seen_activity: float, size: int, reason: str) -> bool:
+        """Finalize the call record and remove the session.
+
+        The session is read again under the call's lock, so a turn that ran
+        since the sweep looked at it keeps the call alive and the record is
+        finalized from what is actually stored.
+
+        Returns:
+            False if the call is mid-turn, was active since the sweep or is gone
+        """
+        if is_turn_in_progress(call_sid):
+            return False
+
+        async with hold_call(call_sid):
+            session = await self.store.get(call_sid)
+            if session is None or session.last_activity > seen_activity:
+                return False
+            try:
+                async with self.db_session_factory() as db:
+                    db_status = await finalize_call(db, call_sid, session)
+                logger.info(
+                    f"[SESSION REAPER] Evicting session {call_sid} ({reason}, {size} bytes), "
+                    f"call record status: {db_status or 'no record'}"
+                )
+            except Exception as e:
+                # Still evict: keeping the session forever is the leak we're fixing
+                self.finalize_failures += 1
+                logger.error(
+                    f"[SESSION REAPER] Failed to finalize call {call_sid}: {e}", exc_info=True
+                )
+            await self.store.delete(call_sid)
+            discard_call_state(call_sid)
+
+        self.evicted_bytes += size
+        return True
+
+    async def run(self) -> None:
+        """Sweep forever at the configured interval."""
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[SESSION REAPER] Sweep failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """Start the background sweep task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Cancel the background sweep task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Eviction counters for monitoring."""
+        return {
+            "sweeps": self.sweeps,
+            "evicted_idle": self.evicted_idle,
+            "evicted_capacity": self.evicted_capacity,
+            "evicted_bytes": self.evicted_bytes,
+            "finalize_failures": self.finalize_failures,
+            "active_sessions": self.last_session_count,
+            "active_session_bytes": self.last_session_bytes,
+        }
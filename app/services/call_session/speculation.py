@@ -0,0 +1,195 @@
+"""Speculative turns started from Twilio partial speech results."""
+import asyncio
+import difflib
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services.agent.fast_path import normalize_utterance
+from app.services.ordering.extractor import QUANTITY_WORDS, MenuEntityExtractor
+
+logger = logging.getLogger(__name__)
+
+# Words that change what an utterance asks for, however similar the rest is
+NEGATION_WORDS = {
+    "no", "not", "don't", "dont", "never", "none", "nothing", "without", "remove", "cancel", "instead",
+}
+
+
+def key_terms(words: List[str]) -> List[str]:
+    """Quantity, number and negation words, in order ("no", "two", "10")."""
+    return [word for word in words if word.isdigit() or word in QUANTITY_WORDS or word in NEGATION_WORDS]
+
+
+def _entities(extractor: MenuEntityExtractor, text: str) -> List[Any]:
+    return [
+        (item.item_name, item.quantity, sorted(item.modifiers)) for item in extractor.extract(text).items
+    ]
+
+
+class Speculation:
+    """One in-flight speculative agent call for a call."""
+
+    def __init__(self, text: str, base_version: int, task: asyncio.Task, attempts: int):
+        self.text = text
+        self.normalized = normalize_utterance(text)
+        self.base_version = base_version  # State version the speculation started from
+        self.task = task
+        self.attempts = attempts  # Speculations started for this turn so far
+
+
+class SpeculationRegistry:
+    """Runs the agent ahead of the final transcript and hands the result over.
+
+    While the caller is still talking, Twilio posts partial transcripts. Once
+    a partial is stable enough, the agent is run on a copy of the call state.
+    When the final transcript arrives it is compared with the partial the
+    speculation used: if they match closely, the finished (or nearly finished)
+    result is adopted; otherwise it is cancelled and the turn runs normally.
+
+    ``base_version`` identifies the call state the speculation was computed
+    from; a result is only adopted against the same version, so a speculation
+    never survives a turn it didn't see. Speculations are process-local.
+    """
+
+    def __init__(self, min_words: int = 2, min_similarity: float = 0.9, max_per_turn: int = 3):
+        self.min_words = min_words
+        self.min_similarity = min_similarity
+        self.max_per_turn = max_per_turn
+        self._speculations: Dict[str, Speculation] = {}
+        self.started = 0
+        self.adopted = 0
+        self.discarded = 0
+        self.superseded = 0
+
+    def start(
+        self,
+        call_sid: str,
+        text: str,
+        base_version: int,
+        run: Callable[[], Awaitable[Any]],
+    ) -> bool:
+        """
+        Start a speculation for a partial transcript, replacing an older one.
+
+        Args:
+            call_sid: Twilio call SID
+            text: Stable partial transcript
+            base_version: Version of the call state ``run`` works from
+            run: Starts the agent call on a copy of the state
+
+        Returns:
+            True if a new speculation was started
+        """
+        normalized = normalize_utterance(text)
+        if len(normalized.split()) < self.min_words:
+            return False
+
+        attempts = 0
+        current = self._speculations.get(call_sid)
+        if current is not None:
+            if current.base_version == base_version:
+                if current.normalized == normalized:
+                    return False  # Already working on this text
+                if current.attempts >= self.max_per_turn:
+                    return False
+                attempts = current.attempts
+            current.task.cancel()
+            self.superseded += 1
+
+        task = asyncio.create_task(run())
+        # Failures surface through take(); don't log them as unretrieved
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._speculations[call_sid] = Speculation(text, base_version, task, attempts + 1)
+        self.started += 1
+        logger.debug(f"[SPECULATION] Started for call {call_sid} on '{text[:100]}'")
+        return True
+
+    async def take(
+        self,
+        call_sid: str,
+        final_text: Optional[str],
+        base_version: int,
+        extractor: Optional[MenuEntityExtractor] = None,
+    ) -> Optional[Any]:
+        """
+        Claim the speculation for a final transcript.
+
+        The two transcripts are compared word by word. Besides being similar
+        overall they must agree exactly on quantity, number and negation
+        words, and on the menu items the extractor finds in them, so "two"
+        vs "ten" or "one" vs "no" never reuses a speculative turn.
+
+        Returns:
+            The speculative result if it matches the final transcript, else None
+        """
+        speculation = self._speculations.pop(call_sid, None)
+        if speculation is None:
+            return None
+
+        partial_words = speculation.normalized.split()
+        final_words = normalize_utterance(final_text or "").split()
+        similarity = difflib.SequenceMatcher(None, partial_words, final_words).ratio()
+        if speculation.base_version != base_version:
+            mismatch = "state changed"
+        elif similarity < self.min_similarity:
+            mismatch = f"similarity {similarity:.2f}"
+        elif key_terms(partial_words) != key_terms(final_words):
+            mismatch = "quantity or negation differs"
+        elif extractor is not None and _entities(extractor, speculation.text) != _entities(
+            extractor, final_text or ""
+        ):
+            mismatch = "menu items differ"
+        else:
+            mismatch = None
+        if mismatch is not None:
+            speculation.task.cancel()
+            self.discarded += 1
+            logger.info(
+                f"[SPECULATION] Discarded for call {call_sid}: partial "
+                f"'{speculation.text[:100]}' vs final '{(final_text or '')[:100]}' ({mismatch})"
+            )
+            return None
+
+        try:
+            result = await speculation.task
+        except asyncio.CancelledError:
+            if speculation.task.cancelled():
+                self.discarded += 1
+                return None
+            raise
+        except Exception as e:
+            logger.warning(f"[SPECULATION] Speculative turn failed for call {call_sid}: {e}")
+            self.discarded += 1
+            return None
+
+        self.adopted += 1
+        logger.info(
+            f"[SPECULATION] Adopted for call {call_sid}: partial '{speculation.text[:100]}' "
+            f"for final '{(final_text or '')[:100]}' (similarity {similarity:.2f})"
+        )
+        return result
+
+    def cancel(self, call_sid: str) -> None:
+        """Drop any speculation for a call (e.g. when it ends)."""
+        speculation = self._speculations.pop(call_sid, None)
+        if speculation is not None:
+            speculation.task.cancel()
+            self.discarded += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the health endpoint."""
+        finished = self.adopted + self.discarded
+        return {
+            "started": self.started,
+            "adopted": self.adopted,
+            "discarded": self.discarded,
+            "superseded": self.superseded,
+            "in_flight": len(self._speculations),
+            "adoption_rate": round(self.adopted / finished, 3) if finished else None,
+        }
+
+    def __contains__(self, call_sid: str) -> bool:
+        return call_sid in self._speculations
+
+    def __len__(self) -> int:
+        return len(self._speculations)
@@ -0,0 +1,443 @@
+"""Call session storage backends.
+
+Twilio delivers each webhook of a call to whichever worker accepts the request,
+so live sessions must live somewhere every worker can reach. ``SessionStore``
+is the interface the session manager talks to; backends decide where sessions
+actually live.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.services.call_session.models import CallSession
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(ABC):
+    """Abstract base class for call session stores."""
+
+    @abstractmethod
+    async def get(self, call_sid: str) -> Optional[CallSession]:
+        """Get a session by Twilio call SID."""
+        pass
+
+    @abstractmethod
+    async def set(self, session: CallSession) -> None:
+        """Create or replace a session."""
+        pass
+
+    @abstractmethod
+    async def delete(self, call_sid: str) -> None:
+        """Remove a session (no-op if it doesn't exist)."""
+        pass
+
+    @abstractmethod
+    async def list_call_sids(self) -> List[str]:
+        """List the call SIDs of all stored sessions."""
+        pass
+
+    async def list_sessions(self) -> List[CallSession]:
+        """Load all stored sessions (used by the idle session reaper)."""
+        sessions = []
+        for call_sid in await self.list_call_sids():
+            session = await self.get(call_sid)
+            if session is not None:
+                sessions.append(session)
+        return sessions
+
+    async def clear(self) -> None:
+        """Remove all sessions."""
+        for call_sid in await self.list_call_sids():
+            await self.delete(call_sid)
+
+    async def close(self) -> None:
+        """Release any resources held by the store."""
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store with least-recently-used eviction.
+
+    Sessions are kept as live objects, so this backend only works with a
+    single worker process.
+
+    Unbounded by default: the session reaper enforces the session limit, and
+    it finalizes each call it evicts. ``max_sessions`` is a last-resort cap
+    that drops sessions without finalizing them, so keep it well above the
+    reaper's limit.
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None):
+        self.max_sessions = max_sessions
+        self.dropped = 0
+        self._sessions: "OrderedDict[str, CallSession]" = OrderedDict()
+
+    async def get(self, call_sid: str) -> Optional[CallSession]:
+        """Get a session and mark it as recently used."""
+        session = self._sessions.get(call_sid)
+        if session is not None:
+            self._sessions.move_to_end(call_sid)
+        return session
+
+    async def set(self, session: CallSession) -> None:
+        """Store a session, evicting the least recently used one if full."""
+        self._sessions[session.call_sid] = session
+        self._sessions.move_to_end(session.call_sid)
+        if self.max_sessions is not None:
+            while len(self._sessions) > self.max_sessions:
+                call_sid, _ = self._sessions.popitem(last=False)
+                self.dropped += 1
+                logger.warning(
+                    f"[SESSION STORE] Dropped session {call_sid} over the {self.max_sessions} "
+                    f"session cap without finalizing it ({self.dropped} dropped)"
+                )
+
+    async def delete(self, call_sid: str) -> None:
+        """Remove a session."""
+        self._sessions.pop(call_sid, None)
+
+    async def list_call_sids(self) -> List[str]:
+        """List stored call SIDs, least recently used first."""
+        return list(self._sessions.keys())
+
+    async def list_sessions(self) -> List[CallSession]:
+        """List stored sessions without changing their LRU order."""
+        return list(self._sessions.values())
+
+    async def clear(self) -> None:
+        """Remove all sessions."""
+        self._sessions.clear()
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store backed by a local SQLite file.
+
+    Lets several workers on the same host share sessions without running a
+    separate service. Queries run in a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS call_sessions ("
+                "call_sid TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def _execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """Run a statement and return all rows (called from a worker thread)."""
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+            return rows
+
+    async def get(self, call_sid: str) -> Optional[CallSession]:
+        """Load a session from the database."""
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT data FROM call_sessions WHERE call_sid = ?", (call_sid,)
+        )
+        if not rows:
+            return None
+        return CallSession.from_dict(json.loads(rows[0][0]))
+
+    async def set(self, session: CallSession) -> None:
+        """Insert or replace a session."""
+        data = json.dumps(session.to_dict())
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO call_sessions (call_sid, data, updated_at) VALUES (?, ?, ?)",
+            (session.call_sid, data, time.time()),
+        )
+
+    async def delete(self, call_sid: str) -> None:
+        """Delete a session."""
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM call_sessions WHERE call_sid = ?", (call_sid,)
+        )
+
+    async def list_call_sids(self) -> List[str]:
+        """List stored call SIDs."""
+        rows = await asyncio.to_thread(self._execute, "SELECT call_sid FROM call_sessions")
+        return [row[0] for row in rows]
+
+    async def list_sessions(self) -> List[CallSession]:
+        """Load all sessions in one query."""
+        rows = await asyncio.to_thread(self._execute, "SELECT data FROM call_sessions")
+        return [CallSession.from_dict(json.loads(row[0])) for row in rows]
+
+    async def clear(self) -> None:
+        """Delete all sessions."""
+        await asyncio.to_thread(self._execute, "DELETE FROM call_sessions")
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class RedisProtocolError(Exception):
+    """Error reply or malformed data from a Redis-protocol server."""
+
+
+class RedisConnection:
+    """Minimal asyncio client for the Redis serialization protocol (RESP).
+
+    Only supports what the session store needs, which keeps the store usable
+    against Redis, Valkey, KeyDB or a local stand-in without extra dependencies.
+    """
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        path = (parsed.path or "").lstrip("/")
+        self.db = int(path) if path else 0
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _connect(self) -> None:
+        """Open the connection, authenticating and selecting the database."""
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", str(self.db))
+
+    async def execute(self, *args: str) -> Any:
+        """Send one command and return its decoded reply."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Streams are bound to the loop that created them
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._reader = self._writer = None
+        async with self._lock:
+            if self._writer is None or self._writer.is_closing():
+                await self._connect()
+            try:
+                return await self._roundtrip(*args)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Reconnect once; the server may have closed an idle connection
+                await self._connect()
+                return await self._roundtrip(*args)
+
+    async def _roundtrip(self, *args: str) -> Any:
+        """Write a command and read the reply."""
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode() if isinstance(arg, str) else arg
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self) -> Any:
+        """Decode one RESP reply."""
+        line = await self._reader.readuntil(b"\r\n")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RedisProtocolError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(payload)
+            if count < 0:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise RedisProtocolError(f"Unexpected reply prefix: {prefix!r}")
+
+    async def close(self) -> None:
+        """Close the connection."""
+        if self._writer is not None and self._loop is asyncio.get_running_loop():
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        self._reader = self._writer = None
+
+
+class RedisSessionStore(SessionStore):
+    """Store backed by a Redis-protocol server shared by all workers and nodes."""
+
+    def __init__(
+        self,
+        url: str,
+        key_prefix: str = "voice:session:",
+        ttl_seconds: Optional[int] = 3600,
+    ):
+        self.connection = RedisConnection(url)
+        self.key_prefix = key_prefix
+        self.ttl_seconds = ttl_seconds
+        self._index_key = f"{key_prefix}index"
+
+    def _key(self, call_sid: str) -> str:
+        return f"{self.key_prefix}{call_sid}"
+
+    async def get(self, call_sid: str) -> Optional[CallSession]:
+        """Load a session."""
+        data = await self.connection.execute("GET", self._key(call_sid))
+        if data is None:
+            return None
+        return CallSession.from_dict(json.loads(data))
+
+    async def set(self, session: CallSession) -> None:
+        """Store a session, refreshing its expiry."""
+        data = json.dumps(session.to_dict())
+        if self.ttl_seconds:
+            await self.connection.execute(
+                "SET", self._key(session.call_sid), data, "EX", str(self.ttl_seconds)
+            )
+        else:
+            await self.connection.execute("SET", self._key(session.call_sid), data)
+        await self.connection.execute("SADD", self._index_key, session.call_sid)
+
+    async def delete(self, call_sid: str) -> None:
+        """Delete a session."""
+        await self.connection.execute("DEL", self._key(call_sid))
+        await self.connection.execute("SREM", self._index_key, call_sid)
+
+    async def list_call_sids(self) -> List[str]:
+        """List stored call SIDs, dropping index entries whose keys expired."""
+        members = await self.connection.execute("SMEMBERS", self._index_key) or []
+        call_sids = []
+        for member in members:
+            call_sid = member.decode()
+            if await self.connection.execute("EXISTS", self._key(call_sid)):
+                call_sids.append(call_sid)
+            else:
+                await self.connection.execute("SREM", self._index_key, call_sid)
+        return call_sids
+
+    async def close(self) -> None:
+        """Close the connection."""
+        await self.connection.close()
+
+
+class CachedSessionStore(SessionStore):
+    """Read-through local cache in front of a shared store.
+
+    Consecutive reads of a hot call within ``ttl_seconds`` are served locally
+    instead of paying a network hop. Writes go through to the backend
+    immediately. A cached entry can be stale if another worker handled a turn
+    for the same call within the TTL, so keep the TTL shorter than the gap
+    between a caller's turns (or route calls to workers stickily).
+    """
+
+    def __init__(self, backend: SessionStore, ttl_seconds: float = 2.0, max_entries: int = 1000):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[float, CallSession]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, session: CallSession) -> None:
+        self._cache[session.call_sid] = (time.monotonic() + self.ttl_seconds, session)
+        self._cache.move_to_end(session.call_sid)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def get(self, call_sid: str) -> Optional[CallSession]:
+        """Get a session from the local cache, falling back to the backend."""
+        entry = self._cache.get(call_sid)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            self._cache.move_to_end(call_sid)
+            return entry[1]
+        self.misses += 1
+        session = await self.backend.get(call_sid)
+        if session is None:
+            self._cache.pop(call_sid, None)
+        else:
+            self._remember(session)
+        return session
+
+    async def set(self, session: CallSession) -> None:
+        """Write through to the backend and refresh the cached copy."""
+        await self.backend.set(session)
+        self._remember(session)
+
+    async def delete(self, call_sid: str) -> None:
+        """Delete from the backend and the local cache."""
+        self._cache.pop(call_sid, None)
+        await self.backend.delete(call_sid)
+
+    async def list_call_sids(self) -> List[str]:
+        """List stored call SIDs from the backend."""
+        return await self.backend.list_call_sids()
+
+    async def list_sessions(self) -> List[CallSession]:
+        """Load all sessions from the backend (bypassing the local cache)."""
+        return await self.backend.list_sessions()
+
+    async def clear(self) -> None:
+        """Clear the backend and the local cache."""
+        self._cache.clear()
+        await self.backend.clear()
+
+    async def close(self) -> None:
+        """Close the backend."""
+        self._cache.clear()
+        await self.backend.close()
+
+
+def create_session_store(
+    backend: str,
+    *,
+    path: str = "./call_sessions.db",
+    url: str = "redis://localhost:6379/0",
+    max_sessions: Optional[int] = None,
+    ttl_seconds: Optional[int] = 3600,
+    cache_ttl_seconds: float = 0.0,
+) -> SessionStore:
+    """Build a session store from configuration values.
+
+    Args:
+        backend: "memory", "sqlite" or "redis"
+        path: SQLite file path (sqlite backend)
+        url: Redis URL (redis backend)
+        max_sessions: Hard LRU cap (memory backend, unbounded by default)
+        ttl_seconds: Key expiry (redis backend)
+        cache_ttl_seconds: Local read-through cache TTL for shared backends (0 disables)
+
+    Returns:
+        Configured SessionStore
+    """
+    backend = backend.lower().strip()
+    if backend == "memory":
+        return InMemorySessionStore(max_sessions=max_sessions)
+    if backend == "sqlite":
+        store: SessionStore = SQLiteSessionStore(path)
+    elif backend == "redis":
+        store = RedisSessionStore(url, ttl_seconds=ttl_seconds)
+    else:
+        raise ValueError(f"Unknown session store backend '{backend}'")
+    if cache_ttl_seconds > 0:
+        store = CachedSessionStore(store, ttl_seconds=cache_ttl_seconds)
+    return store
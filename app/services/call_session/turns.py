@@ -0,0 +1,139 @@
+"""Per-call turn serialization and replay of duplicate webhook deliveries."""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class CallLockRegistry:
+    """Hands out one asyncio lock per CallSid.
+
+    Locks are created on first use and dropped once nobody holds or waits on
+    them, so the registry only grows with the number of calls mid-turn.
+    Locks are process-local: they serialize turns handled by the same worker.
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, call_sid: str) -> AsyncIterator[None]:
+        """Hold the lock for a call for the duration of the block."""
+        lock = self._locks.get(call_sid)
+        if lock is None:
+            lock = self._locks[call_sid] = asyncio.Lock()
+        self._users[call_sid] = self._users.get(call_sid, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[call_sid] -= 1
+            if self._users[call_sid] == 0:
+                del self._users[call_sid]
+                del self._locks[call_sid]
+
+    def is_locked(self, call_sid: str) -> bool:
+        """Check whether a turn is currently in progress for a call."""
+        lock = self._locks.get(call_sid)
+        return lock is not None and lock.locked()
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+class TurnResponseCache:
+    """Answers Twilio retries of a gather webhook with the TwiML of the first delivery.
+
+    Twilio retries a delivery that timed out, with the same
+    I-Twilio-Idempotency-Token header. A finished turn's TwiML is kept for a
+    while under that token, so a retry gets it back instead of running the
+    turn again. Deliveries without a token are only matched against a turn
+    for the same call and SpeechResult that is still running: a retry
+    arrives while the original is in flight, whereas a caller repeating
+    themselves can only speak after hearing the previous reply.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], "asyncio.Future[str]"] = {}
+        self.replays = 0
+
+    @staticmethod
+    def _delivery_key(speech_result: Optional[str], idempotency_token: Optional[str]) -> Optional[str]:
+        if idempotency_token:
+            return f"token:{idempotency_token}"
+        if speech_result and speech_result.strip():
+            return "speech:" + hashlib.sha256(speech_result.strip().encode()).hexdigest()
+        return None
+
+    async def answer(
+        self,
+        call_sid: str,
+        speech_result: Optional[str],
+        idempotency_token: Optional[str],
+        run_turn: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Run a turn, unless this delivery is a retry of one already answered or running."""
+        delivery = self._delivery_key(speech_result, idempotency_token)
+        if delivery is None:
+            return await run_turn()
+        key = (call_sid, delivery)
+
+        twiml = self.get(call_sid, idempotency_token)
+        if twiml is None and key in self._in_flight:
+            twiml = await asyncio.shield(self._in_flight[key])
+            self.replays += 1
+        if twiml is not None:
+            return twiml
+
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            twiml = await run_turn()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here so an unawaited failure isn't reported
+            raise
+        finally:
+            del self._in_flight[key]
+        future.set_result(twiml)
+        self.put(call_sid, idempotency_token, twiml)
+        return twiml
+
+    def get(self, call_sid: str, idempotency_token: Optional[str]) -> Optional[str]:
+        """Return kept TwiML for a retried delivery, if any."""
+        if not idempotency_token:
+            return None
+        key = (call_sid, idempotency_token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, twiml = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self.replays += 1
+        return twiml
+
+    def put(self, call_sid: str, idempotency_token: Optional[str], twiml: str) -> None:
+        """Keep the TwiML produced for a delivery."""
+        if not idempotency_token:
+            return
+        key = (call_sid, idempotency_token)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, twiml)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard_call(self, call_sid: str) -> None:
+        """Drop all entries for a call (e.g. when it ends)."""
+        for key in [key for key in self._entries if key[0] == call_sid]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -44,3 +44,11 @@ class MenuProvider(ABC):
         """Get a menu item by name."""
         pass
 
+    def get_version(self) -> int:
+        """
+        Get a counter that changes whenever the menu changes.
+
+        Used to rebuild anything derived from the menu. Providers whose menu
+        never changes can keep the default.
+        """
+        return 0
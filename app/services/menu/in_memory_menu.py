@@ -14,6 +14,7 @@ class InMemoryMenuProvider(MenuProvider):
             menu_file = Path(__file__).parent / "data" / "menu.yaml"
         self.menu_file = Path(menu_file)
         self._menu: Optional[Menu] = None
+        self._version = 0  # Bumped on every add/update/delete
 
     async def _load_menu(self) -> Menu:
         """Load menu from YAML file."""
@@ -90,10 +91,15 @@ class InMemoryMenuProvider(MenuProvider):
                 return item
         return None
 
+    def get_version(self) -> int:
+        """Get the menu version (changes on every edit)."""
+        return self._version
+
     async def _save_menu(self) -> None:
         """Save menu to YAML file."""
         if self._menu is None:
             return
+        self._version += 1
 
         # Convert menu to dict format
         data = {
@@ -3,6 +3,8 @@ import json
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from app.services.menu.base import Menu, MenuItem, MenuProvider
+from app.services.ordering.extractor import MenuEntityExtractor
+from app.core.metrics import MENU_LOOKUP_SECONDS
 
 
 class MenuRepository:
@@ -11,23 +13,49 @@ class MenuRepository:
     def __init__(self, provider: MenuProvider):
         self.provider = provider
         self._item_requirements: Optional[Dict[str, Any]] = None
+        self._entity_extractor: Optional[MenuEntityExtractor] = None
+        self._entity_extractor_version: Optional[int] = None
+        self._entity_extractor_menu: Optional[Menu] = None
 
+    @MENU_LOOKUP_SECONDS.timed("get_menu")
     async def get_menu(self) -> Menu:
         """Get the full menu."""
         return await self.provider.get_menu()
 
+    @MENU_LOOKUP_SECONDS.timed("validate_item")
     async def validate_item(self, item_name: str) -> bool:
         """Check if an item exists."""
         return await self.provider.validate_item(item_name)
 
+    @MENU_LOOKUP_SECONDS.timed("get_item_options")
     async def get_item_options(self, item_name: str) -> List[str]:
         """Get item options."""
         return await self.provider.get_item_options(item_name)
 
+    @MENU_LOOKUP_SECONDS.timed("get_item_by_name")
     async def get_item_by_name(self, item_name: str) -> Optional[MenuItem]:
         """Get item by name."""
         return await self.provider.get_item_by_name(item_name)
 
+    def get_menu_version(self) -> int:
+        """Get the menu version (changes whenever the menu is edited)."""
+        return self.provider.get_version()
+
+    @MENU_LOOKUP_SECONDS.timed("get_entity_extractor")
+    async def get_entity_extractor(self) -> MenuEntityExtractor:
+        """Get the entity extractor for the current menu, rebuilding it after edits."""
+        version = self.get_menu_version()
+        menu = await self.get_menu()
+        if (
+            self._entity_extractor is None
+            or self._entity_extractor_version != version
+            or self._entity_extractor_menu is not menu  # Menu was reloaded
+        ):
+            self._entity_extractor = MenuEntityExtractor(menu, self._load_item_requirements())
+            self._entity_extractor_version = version
+            self._entity_extractor_menu = menu
+        return self._entity_extractor
+
     def _load_item_requirements(self) -> Dict[str, Any]:
         """Load item requirements from JSON file."""
         if self._item_requirements is None:
@@ -40,12 +68,14 @@ class MenuRepository:
                 self._item_requirements = {"items": {}, "rules": {}}
         return self._item_requirements
 
+    @MENU_LOOKUP_SECONDS.timed("get_item_requirements")
     async def get_item_requirements(self, item_name: str) -> Optional[Dict[str, Any]]:
         """Get requirements for a specific item."""
         requirements = self._load_item_requirements()
         item_name_lower = item_name.lower().strip()
         return requirements.get("items", {}).get(item_name_lower)
 
+    @MENU_LOOKUP_SECONDS.timed("get_item_requirements_text")
     async def get_item_requirements_text(self) -> str:
         """Get item requirements as formatted text for LLM context."""
         requirements = self._load_item_requirements()
@@ -74,6 +104,7 @@ class MenuRepository:
         
         return "\n".join(lines)
 
+    @MENU_LOOKUP_SECONDS.timed("get_menu_text")
     async def get_menu_text(self) -> str:
         """Get menu as formatted text for LLM context."""
         menu = await self.get_menu()
@@ -0,0 +1,257 @@
+"""Local extraction of menu items, quantities and modifiers from utterances."""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.menu.base import Menu
+
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "-": " "})
+_NON_WORD = re.compile(r"[^\w\s']+")
+
+# Quantity words callers use on the phone
+QUANTITY_WORDS = {
+    "a": 1, "an": 1, "one": 1, "single": 1,
+    "two": 2, "couple": 2, "pair": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "dozen": 12,
+}
+
+# Words that carry no order content ("can I get", "please", "and")
+FILLER_WORDS = {
+    "i", "i'd", "id", "i'll", "we", "we'd", "we'll", "can", "could", "may", "get", "have",
+    "like", "want", "would", "will", "take", "give", "me", "us", "let", "let's", "do",
+    "please", "and", "also", "plus", "with", "of", "the", "some", "order", "to", "go",
+    "um", "uh", "okay", "ok", "so", "yeah", "yes", "hi", "hello", "just", "then",
+    "thanks", "thank", "you", "too", "as", "well", "one", "ones", "each", "add",
+}
+
+# Openings that make an utterance a question to or from the agent, not an order
+# ("do you have cheeseburgers", "would you like a hamburger")
+QUESTION_PHRASES = {
+    ("do", "you"), ("would", "you"), ("will", "you"), ("did", "you"), ("are", "you"),
+    ("have", "you"), ("is", "there"), ("are", "there"), ("is", "it"), ("does",),
+}
+
+# Openings that make a trailing "?" a polite request ("can I get a burger?")
+REQUEST_OPENINGS = {
+    ("can", "i"), ("could", "i"), ("may", "i"), ("can", "we"), ("could", "we"), ("may", "we"),
+    ("can", "you"), ("could", "you"), ("i'd",), ("id",), ("i", "would"), ("i", "want"),
+    ("i'll",), ("let", "me"),
+}
+_LEADING_FILLER = {"um", "uh", "okay", "ok", "so", "yeah", "yes", "hi", "hello", "and", "also", "then"}
+
+# Size options, at least one of which is needed for items with a required size
+SIZE_OPTIONS = {"small", "medium", "large", "regular"}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with punctuation removed."""
+    return _NON_WORD.sub(" ", text.translate(_APOSTROPHES).lower()).split()
+
+
+def _plural_variants(tokens: Tuple[str, ...]) -> List[Tuple[str, ...]]:
+    """Phrase plus its plural forms ("cheeseburger" -> "cheeseburgers")."""
+    last = tokens[-1]
+    variants = [tokens]
+    if not last.endswith("s"):
+        variants.append(tokens[:-1] + (last + "s",))
+        if last.endswith(("ch", "sh", "x")):
+            variants.append(tokens[:-1] + (last + "es",))
+    return variants
+
+
+class TokenTrie:
+    """Trie over word sequences with longest-match lookup."""
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+
+    def insert(self, tokens: Iterable[str], value: Any) -> None:
+        """Map a word sequence to a value (later inserts win)."""
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[None] = value
+
+    def longest_match(self, tokens: List[str], start: int) -> Optional[Tuple[int, Any]]:
+        """
+        Find the longest phrase starting at tokens[start].
+
+        Returns:
+            (end index, value) or None if no phrase starts there
+        """
+        node = self._root
+        best = None
+        for index in range(start, len(tokens)):
+            node = node.get(tokens[index])
+            if node is None:
+                break
+            if None in node:
+                best = (index + 1, node[None])
+        return best
+
+
+class ExtractedItem:
+    """An item the caller asked for."""
+
+    def __init__(self, item_name: str, quantity: int = 1, modifiers: Optional[List[str]] = None):
+        self.item_name = item_name
+        self.quantity = quantity
+        self.modifiers = modifiers or []
+
+    def to_action(self) -> Dict[str, Any]:
+        """Agent action for this item (same shape the LLM produces)."""
+        return {
+            "type": "add_item",
+            "item_name": self.item_name,
+            "quantity": self.quantity,
+            "modifiers": list(self.modifiers),
+        }
+
+
+class Extraction:
+    """Result of running the extractor over one utterance."""
+
+    def __init__(self, items: List[ExtractedItem], unmatched: List[str], incomplete: List[str]):
+        self.items = items
+        self.unmatched = unmatched  # Words that aren't items, options, quantities or filler
+        self.incomplete = incomplete  # Items missing a required choice (e.g. size)
+
+    @property
+    def complete(self) -> bool:
+        """True when the whole utterance is an order the parser can take as is."""
+        return bool(self.items) and not self.unmatched and not self.incomplete
+
+    def actions(self) -> List[Dict[str, Any]]:
+        """add_item actions for every extracted item."""
+        return [item.to_action() for item in self.items]
+
+
+class MenuEntityExtractor:
+    """Recognizes menu items, quantities and modifiers without the LLM.
+
+    Built once per menu version from the menu and item requirements (item
+    names, their aliases and plurals, and each item's options). Utterances
+    are scanned left to right with longest-match lookups in token tries, so
+    "two cheeseburgers no onions and a large coke" becomes two add_item
+    actions. Options before an item apply to that item ("large coke"); options
+    after it apply to the item just named ("burger no onions").
+
+    Anything the extractor can't account for is reported as unmatched, and the
+    turn should go to the LLM.
+    """
+
+    def __init__(self, menu: Menu, item_requirements: Optional[Dict[str, Any]] = None):
+        requirements = (item_requirements or {}).get("items", {})
+        size_rules = (item_requirements or {}).get("rules", {}).get("size_rules", {})
+        sized_items = set(size_rules.get("items_requiring_size", []))
+
+        self._items = TokenTrie()
+        self._options = TokenTrie()
+        self._item_options: Dict[str, Set[str]] = {}
+        self._size_required: Set[str] = set()
+
+        for item in menu.items:
+            name = item.name.lower()
+            config = requirements.get(name, {})
+            phrases = [name] + [alias.lower() for alias in config.get("aliases", [])]
+            for phrase in phrases:
+                for variant in _plural_variants(tuple(tokenize(phrase))):
+                    self._items.insert(variant, item.name)
+
+            options = {option.lower() for option in item.options}
+            options.update(option.lower() for option in config.get("optional_modifiers", []))
+            self._item_options[item.name] = options
+            for option in options:
+                self._options.insert(tokenize(option), option)
+                if option.startswith("no "):
+                    # "without onions" means "no onions"
+                    self._options.insert(["without"] + tokenize(option)[1:], option)
+
+            if config.get("size_required") or name in sized_items:
+                self._size_required.add(item.name)
+
+    @staticmethod
+    def _is_request(tokens: List[str]) -> bool:
+        """True if the utterance opens like a request ("can I get...")."""
+        start = 0
+        while start < len(tokens) and tokens[start] in _LEADING_FILLER:
+            start += 1
+        return any(tuple(tokens[start:start + len(opening)]) == opening for opening in REQUEST_OPENINGS)
+
+    def extract(self, text: str) -> Extraction:
+        """Extract ordered items from an utterance."""
+        tokens = tokenize(text)
+        items: List[ExtractedItem] = []
+        unmatched: List[str] = []
+        quantity: Optional[int] = None
+        quantity_word = ""
+        leading_options: List[str] = []
+        index = 0
+
+        while index < len(tokens):
+            question = next(
+                (phrase for phrase in QUESTION_PHRASES if tuple(tokens[index:index + len(phrase)]) == phrase),
+                None,
+            )
+            if question:
+                unmatched.append(" ".join(question))
+                index += len(question)
+                continue
+
+            item_match = self._items.longest_match(tokens, index)
+            option_match = self._options.longest_match(tokens, index)
+
+            if item_match and (not option_match or item_match[0] >= option_match[0]):
+                index, item_name = item_match
+                items.append(ExtractedItem(item_name, quantity or 1, leading_options))
+                quantity, leading_options = None, []
+            elif option_match:
+                index, option = option_match
+                if (
+                    quantity is None
+                    and items
+                    and not leading_options
+                    and option in self._item_options[items[-1].item_name]
+                ):
+                    # Trailing option for the item just named
+                    if option not in items[-1].modifiers:
+                        items[-1].modifiers.append(option)
+                else:
+                    leading_options.append(option)
+            elif tokens[index].isdigit() and quantity is None:
+                quantity, quantity_word = int(tokens[index]), tokens[index]
+                index += 1
+            elif tokens[index] in QUANTITY_WORDS and quantity is None:
+                quantity, quantity_word = QUANTITY_WORDS[tokens[index]], tokens[index]
+                # "a couple of", "a dozen"
+                index += 1
+                if quantity == 1 and index < len(tokens) and tokens[index] in ("couple", "pair", "dozen"):
+                    quantity, quantity_word = QUANTITY_WORDS[tokens[index]], tokens[index]
+                    index += 1
+            elif tokens[index] in FILLER_WORDS:
+                index += 1
+            else:
+                # A pending quantity belongs to the unknown word ("a milkshake")
+                unmatched.append(tokens[index])
+                quantity = None
+                index += 1
+
+        # Options or a quantity with no item after them ("and make it large",
+        # "a cheeseburger and two") need the LLM
+        unmatched.extend(leading_options)
+        if quantity is not None:
+            unmatched.append(quantity_word)
+        if text.rstrip().endswith("?") and not self._is_request(tokens):
+            unmatched.append("?")
+        for item in items:
+            invalid = [m for m in item.modifiers if m not in self._item_options[item.item_name]]
+            unmatched.extend(invalid)
+            item.modifiers = [m for m in item.modifiers if m not in invalid]
+
+        incomplete = [
+            item.item_name
+            for item in items
+            if item.item_name in self._size_required
+            and not any(modifier in SIZE_OPTIONS for modifier in item.modifiers)
+        ]
+        return Extraction(items, unmatched, incomplete)
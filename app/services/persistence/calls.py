@@ -6,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.db.models import Call
+from app.core.metrics import DB_OPERATION_SECONDS
 
 
 class CallPersistenceService:
@@ -14,6 +15,7 @@ class CallPersistenceService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @DB_OPERATION_SECONDS.timed("create_call")
     async def create_call(self, call_sid: str) -> Call:
         """Create a new call record or return existing one."""
         # Check if call already exists
@@ -28,6 +30,7 @@ class CallPersistenceService:
         await self.db.refresh(call)
         return call
 
+    @DB_OPERATION_SECONDS.timed("get_call_by_sid")
     async def get_call_by_sid(self, call_sid: str) -> Optional[Call]:
         """Get call by Twilio call SID."""
         result = await self.db.execute(
@@ -35,6 +38,7 @@ class CallPersistenceService:
         )
         return result.scalar_one_or_none()
 
+    @DB_OPERATION_SECONDS.timed("update_call_status")
     async def update_call_status(
         self, call_sid: str, status: str, ended_at: Optional[datetime] = None
     ) -> Optional[Call]:
@@ -48,6 +52,7 @@ class CallPersistenceService:
             await self.db.refresh(call)
         return call
 
+    @DB_OPERATION_SECONDS.timed("update_call_transcript")
     async def update_call_transcript(self, call_sid: str, transcript: str) -> Optional[Call]:
         """Update call transcript."""
         call = await self.get_call_by_sid(call_sid)
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.db.models import Order, OrderItem
+from app.core.metrics import DB_OPERATION_SECONDS
 
 
 class OrderPersistenceService:
@@ -13,6 +14,7 @@ class OrderPersistenceService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @DB_OPERATION_SECONDS.timed("create_order")
     async def create_order(
         self,
         call_id: int,
@@ -31,6 +33,7 @@ class OrderPersistenceService:
         await self.db.refresh(order)
         return order
 
+    @DB_OPERATION_SECONDS.timed("confirm_order")
     async def confirm_order(self, order_id: int) -> Optional[Order]:
         """Confirm an order."""
         order = await self.get_order_by_id(order_id)
@@ -40,6 +43,7 @@ class OrderPersistenceService:
             await self.db.refresh(order)
         return order
 
+    @DB_OPERATION_SECONDS.timed("get_order_by_id")
     async def get_order_by_id(self, order_id: int) -> Optional[Order]:
         """Get order by ID with items."""
         result = await self.db.execute(
@@ -49,6 +53,7 @@ class OrderPersistenceService:
         )
         return result.scalar_one_or_none()
 
+    @DB_OPERATION_SECONDS.timed("add_order_items")
     async def add_order_items(
         self, order_id: int, items: List[Dict[str, Any]]
     ) -> List[OrderItem]:
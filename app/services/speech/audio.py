@@ -0,0 +1,110 @@
+"""Telephony audio helpers (G.711 μ-law, 8 kHz mono)."""
+import io
+import math
+import wave
+from array import array
+from typing import List
+
+# Twilio Media Streams carry 8 kHz μ-law, 20 ms (160 byte) frames
+SAMPLE_RATE = 8000
+FRAME_BYTES = 160
+FRAME_MS = 20
+
+_BIAS = 0x84
+_CLIP = 32635
+
+
+def _ulaw_to_linear(value: int) -> int:
+    """Decode one μ-law byte to a 16-bit linear sample."""
+    value = ~value & 0xFF
+    sign = value & 0x80
+    exponent = (value >> 4) & 0x07
+    mantissa = value & 0x0F
+    sample = (((mantissa << 3) + _BIAS) << exponent) - _BIAS
+    return -sample if sign else sample
+
+
+def _linear_to_ulaw(sample: int) -> int:
+    """Encode one 16-bit linear sample as a μ-law byte."""
+    sign = 0x80 if sample < 0 else 0
+    magnitude = min(abs(sample), _CLIP) + _BIAS
+    exponent = max((magnitude >> 7).bit_length() - 1, 0)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return ~(sign | (exponent << 4) | mantissa) & 0xFF
+
+
+# Lookup tables: decoding is per byte, encoding is indexed by the unsigned 16-bit sample
+ULAW_TO_LINEAR: List[int] = [_ulaw_to_linear(value) for value in range(256)]
+_LINEAR_TO_ULAW = bytes(
+    _linear_to_ulaw(index - 65536 if index >= 32768 else index) for index in range(65536)
+)
+_ULAW_SILENCE = _linear_to_ulaw(0)
+
+
+def ulaw_to_pcm16(data: bytes) -> bytes:
+    """Decode μ-law bytes to little-endian 16-bit PCM."""
+    return array("h", (ULAW_TO_LINEAR[value] for value in data)).tobytes()
+
+
+def pcm16_to_ulaw(data: bytes) -> bytes:
+    """Encode little-endian 16-bit PCM as μ-law bytes."""
+    samples = array("h")
+    samples.frombytes(data[: len(data) - len(data) % 2])
+    return bytes(_LINEAR_TO_ULAW[sample & 0xFFFF] for sample in samples)
+
+
+def ulaw_rms(data: bytes) -> float:
+    """Root-mean-square energy of a μ-law frame in linear units."""
+    if not data:
+        return 0.0
+    total = sum(ULAW_TO_LINEAR[value] ** 2 for value in data)
+    return math.sqrt(total / len(data))
+
+
+def downsample_pcm16(data: bytes, factor: int) -> bytes:
+    """Reduce the sample rate of 16-bit PCM by an integer factor.
+
+    Each output sample is the mean of ``factor`` input samples, which is a
+    crude low-pass filter but good enough for speech on a phone line.
+    """
+    samples = array("h")
+    samples.frombytes(data[: len(data) - len(data) % 2])
+    if factor <= 1:
+        return samples.tobytes()
+    usable = len(samples) - len(samples) % factor
+    return array(
+        "h",
+        (sum(samples[i:i + factor]) // factor for i in range(0, usable, factor)),
+    ).tobytes()
+
+
+def pcm16_to_wav(data: bytes, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Wrap 16-bit mono PCM in a WAV container (for transcription APIs)."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(data)
+    return buffer.getvalue()
+
+
+def ulaw_silence(duration_ms: int) -> bytes:
+    """μ-law silence of the given duration."""
+    return bytes([_ULAW_SILENCE]) * (SAMPLE_RATE * duration_ms // 1000)
+
+
+def ulaw_tone(duration_ms: int, frequency: float = 440.0, amplitude: int = 8000) -> bytes:
+    """μ-law sine tone of the given duration (test signals and placeholder audio)."""
+    count = SAMPLE_RATE * duration_ms // 1000
+    return bytes(
+        _LINEAR_TO_ULAW[
+            int(amplitude * math.sin(2 * math.pi * frequency * n / SAMPLE_RATE)) & 0xFFFF
+        ]
+        for n in range(count)
+    )
+
+
+def split_frames(data: bytes, frame_bytes: int = FRAME_BYTES) -> List[bytes]:
+    """Split audio into fixed-size frames (the last one may be short)."""
+    return [data[i:i + frame_bytes] for i in range(0, len(data), frame_bytes)]
@@ -0,0 +1,270 @@
+"""Streaming speech backends for Twilio Media Streams.
+
+Inbound audio is fed to a StreamingSTT frame by frame; it reports when the
+caller starts and stops talking (and, for providers that stream text, partial
+and final transcripts). Replies are synthesized by a StreamingTTS one sentence
+at a time as 8 kHz μ-law, ready to send back on the stream.
+"""
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Iterable, List, Optional
+
+from app.services.speech.audio import (
+    FRAME_MS,
+    SAMPLE_RATE,
+    downsample_pcm16,
+    pcm16_to_ulaw,
+    pcm16_to_wav,
+    ulaw_rms,
+    ulaw_to_pcm16,
+    ulaw_tone,
+)
+from app.services.speech.stt import SpeechToTextService
+from app.services.speech.tts import TextToSpeechService
+
+logger = logging.getLogger(__name__)
+
+# Speech event kinds
+SPEECH_STARTED = "speech_started"  # Caller started talking (used for barge-in)
+SPEECH_ENDED = "speech_ended"  # Endpoint reached; audio holds the utterance to transcribe
+PARTIAL = "partial"  # Interim transcript
+FINAL = "final"  # Final transcript for the utterance
+
+
+class SpeechEvent:
+    """Something the streaming recognizer noticed in the inbound audio."""
+
+    def __init__(self, kind: str, text: Optional[str] = None, audio: Optional[bytes] = None):
+        self.kind = kind
+        self.text = text
+        self.audio = audio
+
+    def __repr__(self) -> str:
+        return f"SpeechEvent(kind={self.kind!r}, text={self.text!r})"
+
+
+class EnergyEndpointer:
+    """Energy-based voice activity detection and endpointing.
+
+    Speech starts once frames above the energy threshold add up to
+    ``min_speech_ms``; it ends after ``end_silence_ms`` of quiet frames
+    (or when the utterance reaches ``max_utterance_ms``).
+    """
+
+    def __init__(
+        self,
+        threshold: float = 500.0,
+        min_speech_ms: int = 60,
+        end_silence_ms: int = 600,
+        max_utterance_ms: int = 15000,
+    ):
+        self.threshold = threshold
+        self.min_speech_ms = min_speech_ms
+        self.end_silence_ms = end_silence_ms
+        self.max_utterance_ms = max_utterance_ms
+        self.in_speech = False
+        self._pending: List[bytes] = []
+        self._voiced_ms = 0.0
+        self._silence_ms = 0.0
+        self._utterance = bytearray()
+
+    def process(self, frame: bytes) -> Optional[str]:
+        """Consume one μ-law frame; returns SPEECH_STARTED, SPEECH_ENDED or None."""
+        duration_ms = len(frame) * 1000 / SAMPLE_RATE
+        voiced = ulaw_rms(frame) >= self.threshold
+
+        if not self.in_speech:
+            if not voiced:
+                self._pending.clear()
+                self._voiced_ms = 0.0
+                return None
+            self._pending.append(frame)
+            self._voiced_ms += duration_ms
+            if self._voiced_ms < self.min_speech_ms:
+                return None
+            # Keep the frames that triggered detection so the first syllable isn't clipped
+            self.in_speech = True
+            self._utterance = bytearray(b"".join(self._pending))
+            self._pending.clear()
+            self._silence_ms = 0.0
+            return SPEECH_STARTED
+
+        self._utterance.extend(frame)
+        self._silence_ms = 0.0 if voiced else self._silence_ms + duration_ms
+        utterance_ms = len(self._utterance) * 1000 / SAMPLE_RATE
+        if self._silence_ms >= self.end_silence_ms or utterance_ms >= self.max_utterance_ms:
+            self.in_speech = False
+            self._voiced_ms = 0.0
+            return SPEECH_ENDED
+        return None
+
+    def take_utterance(self) -> bytes:
+        """Return and clear the audio of the last utterance."""
+        utterance = bytes(self._utterance)
+        self._utterance = bytearray()
+        return utterance
+
+
+class StreamingSTT(ABC):
+    """Abstract interface for streaming speech recognition on a call."""
+
+    @abstractmethod
+    async def feed(self, audio: bytes) -> List[SpeechEvent]:
+        """
+        Consume inbound μ-law audio.
+
+        Must return quickly: it runs on the stream's receive loop.
+
+        Returns:
+            Events detected in this audio, in order
+        """
+        pass
+
+    @abstractmethod
+    async def transcribe(self, utterance: bytes) -> str:
+        """
+        Transcribe the audio of a SPEECH_ENDED event.
+
+        Returns:
+            Transcript text (empty if nothing intelligible was said)
+        """
+        pass
+
+
+class EndpointedSTT(StreamingSTT):
+    """Streaming STT that endpoints locally and transcribes whole utterances."""
+
+    def __init__(self, endpointer: Optional[EnergyEndpointer] = None):
+        self.endpointer = endpointer if endpointer is not None else EnergyEndpointer()
+
+    async def feed(self, audio: bytes) -> List[SpeechEvent]:
+        """Run the endpointer over each 20 ms frame of the audio."""
+        events = []
+        frame_bytes = SAMPLE_RATE * FRAME_MS // 1000
+        for start in range(0, len(audio), frame_bytes):
+            kind = self.endpointer.process(audio[start:start + frame_bytes])
+            if kind == SPEECH_STARTED:
+                events.append(SpeechEvent(SPEECH_STARTED))
+            elif kind == SPEECH_ENDED:
+                events.append(SpeechEvent(SPEECH_ENDED, audio=self.endpointer.take_utterance()))
+        return events
+
+
+class WhisperStreamingSTT(EndpointedSTT):
+    """Endpoints locally and sends each utterance to Whisper."""
+
+    def __init__(
+        self,
+        stt_service: SpeechToTextService,
+        endpointer: Optional[EnergyEndpointer] = None,
+    ):
+        super().__init__(endpointer)
+        self.stt_service = stt_service
+
+    async def transcribe(self, utterance: bytes) -> str:
+        """Transcribe an utterance as 8 kHz WAV."""
+        wav = pcm16_to_wav(ulaw_to_pcm16(utterance))
+        text = await self.stt_service.transcribe_audio(wav, format="wav")
+        return text.strip()
+
+
+class ScriptedStreamingSTT(EndpointedSTT):
+    """Local recognizer for tests and development.
+
+    Endpoints real audio but returns the next line of a script as each
+    utterance's transcript, so calls can be driven without a network.
+    """
+
+    def __init__(self, transcripts: Iterable[str], endpointer: Optional[EnergyEndpointer] = None):
+        super().__init__(endpointer)
+        self.transcripts = deque(transcripts)
+
+    async def transcribe(self, utterance: bytes) -> str:
+        """Return the next scripted transcript."""
+        return self.transcripts.popleft() if self.transcripts else ""
+
+
+class StreamingTTS(ABC):
+    """Abstract interface for synthesizing replies on a media stream."""
+
+    @abstractmethod
+    async def synthesize(self, text: str) -> bytes:
+        """
+        Synthesize text for the phone line.
+
+        Returns:
+            8 kHz μ-law audio
+        """
+        pass
+
+
+class OpenAIStreamingTTS(StreamingTTS):
+    """OpenAI speech synthesis, converted to 8 kHz μ-law."""
+
+    # Raw PCM from the speech endpoint is 24 kHz, 16-bit mono
+    SOURCE_SAMPLE_RATE = 24000
+
+    def __init__(self, tts_service: TextToSpeechService, voice: str = "alloy", model: str = "tts-1"):
+        self.tts_service = tts_service
+        self.voice = voice
+        self.model = model
+
+    async def synthesize(self, text: str) -> bytes:
+        """Request raw PCM (no decoder needed) and resample it for telephony."""
+        response = await self.tts_service.client.audio.speech.create(
+            model=self.model,
+            voice=self.voice,
+            input=text,
+            response_format="pcm",
+        )
+        pcm = downsample_pcm16(response.content, self.SOURCE_SAMPLE_RATE // SAMPLE_RATE)
+        return pcm16_to_ulaw(pcm)
+
+
+class ToneStreamingTTS(StreamingTTS):
+    """Local synthesizer for tests and development: a tone as long as the text."""
+
+    def __init__(self, ms_per_char: int = 10):
+        self.ms_per_char = ms_per_char
+
+    async def synthesize(self, text: str) -> bytes:
+        """Return a tone whose length follows the text length."""
+        return ulaw_tone(max(len(text), 1) * self.ms_per_char)
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a reply into sentences so playback can start after the first one."""
+    return [sentence for sentence in _SENTENCE_END.split(text.strip()) if sentence]
+
+
+def create_streaming_stt(
+    backend: str,
+    stt_service: SpeechToTextService,
+    *,
+    threshold: float = 500.0,
+    min_speech_ms: int = 60,
+    end_silence_ms: int = 600,
+) -> StreamingSTT:
+    """Create a recognizer for one media stream (recognizers hold per-call state)."""
+    endpointer = EnergyEndpointer(
+        threshold=threshold, min_speech_ms=min_speech_ms, end_silence_ms=end_silence_ms
+    )
+    if backend == "whisper":
+        return WhisperStreamingSTT(stt_service, endpointer)
+    raise ValueError(f"Unknown streaming STT backend: {backend}")
+
+
+def create_streaming_tts(
+    backend: str, tts_service: TextToSpeechService, *, voice: str = "alloy"
+) -> StreamingTTS:
+    """Create a synthesizer for media streams."""
+    if backend == "openai":
+        return OpenAIStreamingTTS(tts_service, voice=voice)
+    if backend == "tone":
+        return ToneStreamingTTS()
+    raise ValueError(f"Unknown streaming TTS backend: {backend}")
@@ -2,14 +2,14 @@
 import base64
 from typing import Optional
 from openai import AsyncOpenAI
-from app.core.config import settings
+from app.core.dependencies import get_model_clients
 
 
 class SpeechToTextService:
     """Service for converting speech to text."""
 
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
+        self.client = client or get_model_clients().openai
 
     async def transcribe_audio(
         self, audio_data: bytes, format: str = "wav"
@@ -47,17 +47,15 @@ class SpeechToTextService:
         Returns:
             Transcribed text
         """
-        import httpx
-
-        async with httpx.AsyncClient() as client:
-            # Fetch the recording
-            response = await client.get(recording_url)
-            response.raise_for_status()
-
-            # Transcribe the audio
-            transcript = await self.client.audio.transcriptions.create(
-                model="whisper-1",
-                file=("recording.wav", response.content, "audio/wav"),
-            )
-            return transcript.text
+        # Fetch the recording over the shared keep-alive pool
+        http_client = get_model_clients().http_client
+        response = await http_client.get(recording_url)
+        response.raise_for_status()
+
+        # Transcribe the audio
+        transcript = await self.client.audio.transcriptions.create(
+            model="whisper-1",
+            file=("recording.wav", response.content, "audio/wav"),
+        )
+        return transcript.text
 
@@ -1,14 +1,48 @@
 """Text-to-speech service."""
-from typing import Optional
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 from openai import AsyncOpenAI
 from app.core.config import settings
+from app.core.dependencies import get_model_clients
+
+
+# Placeholder for the action URL while a gather template is compiled
+_ACTION_URL_SLOT = "\x00action_url\x00"
+
+
+class GatherTwimlTemplate:
+    """Gather TwiML rendered once, with the action URL filled in per call."""
+
+    def __init__(self, parts: List[bytes]):
+        self.parts = parts
+
+    def render(self, action_url: str) -> bytes:
+        """Produce the TwiML bytes for a specific action URL."""
+        return action_url.encode().join(self.parts)
+
+
+def _escape_xml(text: str) -> str:
+    """Escape XML special characters for TwiML."""
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&apos;")
+    )
+
+
+# Compiled templates keyed on (text, speech timeout, partial result URL), least recently used first.
+# Bounded so callers compiling arbitrary text can't grow it without limit.
+_GATHER_TEMPLATES_MAX = 256
+_gather_templates: "OrderedDict[Tuple[str, str, Optional[str]], GatherTwimlTemplate]" = OrderedDict()
 
 
 class TextToSpeechService:
     """Service for converting text to speech."""
 
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
+        self.client = client or get_model_clients().openai
 
     async def synthesize_speech(
         self,
@@ -47,45 +81,107 @@ class TextToSpeechService:
         Returns:
             TwiML XML string
         """
-        # Escape XML special characters
-        escaped_text = (
-            text.replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-            .replace('"', "&quot;")
-            .replace("'", "&apos;")
-        )
+        escaped_text = _escape_xml(text)
 
         return f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response>
     <Say voice="Polly.Joanna-Neural">{escaped_text}</Say>
 </Response>"""
 
-    def generate_twiml_with_gather(self, text: str, action_url: str) -> str:
+    def generate_twiml_with_gather(
+        self, text: str, action_url: str, partial_url: Optional[str] = None
+    ) -> str:
         """
         Generate TwiML with Gather for collecting user input.
 
         Args:
             text: Text to speak before gathering
             action_url: URL to send gathered input to
+            partial_url: URL to send partial transcripts to while the caller speaks
 
         Returns:
             TwiML XML string
         """
-        escaped_text = (
-            text.replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-            .replace('"', "&quot;")
-            .replace("'", "&apos;")
+        escaped_text = _escape_xml(text)
+        partial_attrs = (
+            f' partialResultCallback="{partial_url}" partialResultCallbackMethod="POST"'
+            if partial_url
+            else ""
         )
 
         return f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response>
-    <Gather action="{action_url}" method="POST" input="speech" speechTimeout="{settings.speech_timeout}" language="en-US">
+    <Gather action="{action_url}" method="POST" input="speech" speechTimeout="{settings.speech_timeout}" language="en-US"{partial_attrs}>
         <Say voice="Polly.Joanna-Neural">{escaped_text}</Say>
     </Gather>
     <Say voice="Polly.Joanna-Neural">I didn't catch that. {escaped_text}</Say>
     <Redirect>{action_url}</Redirect>
 </Response>"""
 
+    def generate_twiml_hangup(self, text: str) -> str:
+        """
+        Generate TwiML that speaks a final message and ends the call.
+
+        Args:
+            text: Closing text to speak
+
+        Returns:
+            TwiML XML string
+        """
+        escaped_text = _escape_xml(text)
+
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Say voice="Polly.Joanna-Neural">{escaped_text}</Say>
+    <Pause length="1"/>
+    <Hangup/>
+</Response>"""
+
+    def generate_twiml_stream(self, stream_url: str) -> str:
+        """
+        Generate TwiML that connects the call to a bidirectional media stream.
+
+        The call hangs up when the stream is closed.
+
+        Args:
+            stream_url: WebSocket URL (wss://) of the media stream endpoint
+
+        Returns:
+            TwiML XML string
+        """
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Response>
+    <Connect>
+        <Stream url="{_escape_xml(stream_url)}"/>
+    </Connect>
+    <Hangup/>
+</Response>"""
+
+    def compile_twiml_with_gather(
+        self, text: str, partial_url: Optional[str] = None
+    ) -> GatherTwimlTemplate:
+        """
+        Get a precompiled Gather TwiML template for fixed text (e.g. the greeting).
+
+        Escaping and formatting happen once per text; rendering only joins bytes.
+
+        Args:
+            text: Text to speak before gathering
+            partial_url: URL to send partial transcripts to while the caller speaks
+
+        Returns:
+            GatherTwimlTemplate to render with an action URL
+        """
+        key = (text, settings.speech_timeout, partial_url)
+        template = _gather_templates.get(key)
+        if template is None:
+            twiml = self.generate_twiml_with_gather(text, _ACTION_URL_SLOT, partial_url)
+            template = GatherTwimlTemplate(
+                [part.encode() for part in twiml.split(_ACTION_URL_SLOT)]
+            )
+            _gather_templates[key] = template
+            if len(_gather_templates) > _GATHER_TEMPLATES_MAX:
+                _gather_templates.popitem(last=False)
+        else:
+            _gather_templates.move_to_end(key)
+        return template
@@ -0,0 +1 @@
+"""Developer tools: load tests, benchmarks and simulations run against the app."""
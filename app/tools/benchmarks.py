@@ -0,0 +1,315 @@
+"""Micro-benchmarks for the CPU work done on every turn.
+
+Each benchmark runs at a realistic size (a restaurant menu, a short order)
+and a stress size (hundreds of menu items, a long order and transcript).
+Results can be saved as a baseline and later runs compared against it;
+compare exits non-zero when anything got slower than the threshold.
+
+    python -m app.tools.benchmarks run --save-baseline
+    python -m app.tools.benchmarks run --compare
+    python -m app.tools.benchmarks compare old.json new.json --threshold 0.2
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BASELINE = Path(".benchmarks") / "baseline.json"
+
+# Menu items, order items and transcript entries per size
+SIZES: Dict[str, Dict[str, int]] = {
+    "realistic": {"menu_items": 30, "order_items": 4, "transcript_turns": 12, "response_chars": 160},
+    "stress": {"menu_items": 500, "order_items": 40, "transcript_turns": 200, "response_chars": 4000},
+}
+
+MENU_CATEGORIES = ["burgers", "sides", "drinks", "desserts", "salads", "specials"]
+
+# name -> factory(size) returning the operation to time (sync or async, no arguments)
+BENCHMARKS: Dict[str, Callable[[Dict[str, int]], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """Register a benchmark factory under a name."""
+
+    def register(factory: Callable[[Dict[str, int]], Callable[[], Any]]) -> Callable:
+        BENCHMARKS[name] = factory
+        return factory
+
+    return register
+
+
+def build_menu_repository(items: int):
+    """Menu repository over a generated menu, loaded up front so no file is read."""
+    from app.services.menu.base import Menu, MenuItem
+    from app.services.menu.in_memory_menu import InMemoryMenuProvider
+    from app.services.menu.repository import MenuRepository
+
+    categories = MENU_CATEGORIES
+    menu_items = [
+        MenuItem(
+            name=f"item {n} {categories[n % len(categories)]}",
+            description=f"House {categories[n % len(categories)]} number {n}, made to order",
+            price=4.0 + (n % 17) * 0.75,
+            category=categories[n % len(categories)],
+            options=["large", "small", "no onions", "extra cheese"][: 1 + n % 4],
+        )
+        for n in range(items)
+    ]
+    provider = InMemoryMenuProvider(menu_file="/nonexistent/menu.yaml")
+    provider._menu = Menu(items=menu_items, categories=categories)
+    return MenuRepository(provider)
+
+
+def build_state(size: Dict[str, int]):
+    """Conversation state with an order and transcript of the given size."""
+    from app.services.agent.stages import ConversationStage
+    from app.services.agent.state import ConversationState, OrderItem
+
+    state = ConversationState(call_sid="CAbenchmark", stage=ConversationStage.ORDERING)
+    for n in range(size["order_items"]):
+        state.add_order_item(
+            OrderItem(item_name=f"item {n}", quantity=1 + n % 3, modifiers=["no onions"] * (n % 2))
+        )
+    for n in range(size["transcript_turns"]):
+        state.add_transcript_turn("Customer", f"can I also get item {n} with extra cheese please")
+        state.add_transcript_turn("Agent", f"Sure, I've added item {n}. Anything else?")
+    return state
+
+
+@benchmark("menu.get_menu_text")
+def bench_menu_text(size: Dict[str, int]) -> Callable[[], Any]:
+    repository = build_menu_repository(size["menu_items"])
+    return repository.get_menu_text
+
+
+@benchmark("menu.get_item_by_name")
+def bench_item_by_name(size: Dict[str, int]) -> Callable[[], Any]:
+    provider = build_menu_repository(size["menu_items"]).provider
+    # Worst case for a scan: the last item, spoken with different case and spacing
+    last = size["menu_items"] - 1
+    name = f" ITEM {last} {MENU_CATEGORIES[last % len(MENU_CATEGORIES)].upper()} "
+    return lambda: provider.get_item_by_name(name)
+
+
+@benchmark("menu.validate_item")
+def bench_validate_item(size: Dict[str, int]) -> Callable[[], Any]:
+    provider = build_menu_repository(size["menu_items"]).provider
+    return lambda: provider.validate_item("something not on the menu")
+
+
+@benchmark("prompt.get_system_prompt")
+def bench_system_prompt(size: Dict[str, int]) -> Callable[[], Any]:
+    from app.services.agent.prompt import get_system_prompt
+
+    menu_text = asyncio.run(build_menu_repository(size["menu_items"]).get_menu_text())
+    return lambda: get_system_prompt(menu_text)
+
+
+@benchmark("prompt.get_user_prompt")
+def bench_user_prompt(size: Dict[str, int]) -> Callable[[], Any]:
+    from app.services.agent.prompt import get_user_prompt
+
+    state = build_state(size)
+    return lambda: get_user_prompt(
+        state.get_recent_transcript(),
+        "and can I get a large fries with that",
+        state.stage,
+        state.get_order_summary(),
+    )
+
+
+@benchmark("tts.generate_twiml_with_gather")
+def bench_twiml_gather(size: Dict[str, int]) -> Callable[[], Any]:
+    from app.services.speech.tts import TextToSpeechService
+
+    tts = TextToSpeechService()
+    sentence = "You've got 2x cheeseburger (no onions) & a large fries <extra salt> for Pat's order. "
+    text = (sentence * (size["response_chars"] // len(sentence) + 1))[: size["response_chars"]]
+    action_url = "https://example.com/webhooks/voice/gather?CallSid=CAbenchmark"
+    return lambda: tts.generate_twiml_with_gather(text, action_url)
+
+
+@benchmark("state.get_order_summary")
+def bench_order_summary(size: Dict[str, int]) -> Callable[[], Any]:
+    return build_state(size).get_order_summary
+
+
+@benchmark("state.get_transcript_text")
+def bench_transcript_text(size: Dict[str, int]) -> Callable[[], Any]:
+    return build_state(size).get_transcript_text
+
+
+@benchmark("stages.handle_stage_transitions")
+def bench_stage_transitions(size: Dict[str, int]) -> Callable[[], Any]:
+    from app.services.agent.stage_transitions import StageTransitionHandler
+    from app.services.agent.stages import ConversationStage
+
+    state = build_state(size)
+
+    def transition() -> None:
+        # ORDERING -> REVIEW on "that's all"; reset so every call takes the same path
+        state.stage = ConversationStage.ORDERING
+        StageTransitionHandler.handle_stage_transitions(
+            state, "no that's all thanks", "reviewing", {"response": "", "intent": "reviewing"}
+        )
+
+    return transition
+
+
+def _timer(operation: Callable[[], Any], loop: asyncio.AbstractEventLoop) -> Callable[[int], float]:
+    """Function timing `number` calls of the operation, in seconds."""
+    # One warm-up call, which also tells async operations apart
+    probe = operation()
+    if inspect.iscoroutine(probe):
+        loop.run_until_complete(probe)
+
+        async def run(number: int) -> float:
+            started = time.perf_counter()
+            for _ in range(number):
+                await operation()
+            return time.perf_counter() - started
+
+        return lambda number: loop.run_until_complete(run(number))
+
+    def run_sync(number: int) -> float:
+        started = time.perf_counter()
+        for _ in range(number):
+            operation()
+        return time.perf_counter() - started
+
+    return run_sync
+
+
+def measure(operation: Callable[[], Any], min_time: float = 0.2, repeats: int = 5) -> Dict[str, float]:
+    """Time an operation; per-call nanoseconds (best and median of the repeats)."""
+    loop = asyncio.new_event_loop()
+    try:
+        timer = _timer(operation, loop)
+        # Grow the loop count until one repeat takes long enough to time reliably
+        number = 1
+        while True:
+            elapsed = timer(number)
+            if elapsed >= min_time / repeats or number >= 10_000_000:
+                break
+            number *= 10 if elapsed < min_time / repeats / 10 else 2
+        per_call = sorted(timer(number) / number * 1e9 for _ in range(repeats))
+    finally:
+        loop.close()
+    return {"best_ns": round(per_call[0], 1), "median_ns": round(statistics.median(per_call), 1), "loops": number}
+
+
+def run_benchmarks(
+    names: Optional[Sequence[str]] = None,
+    sizes: Sequence[str] = tuple(SIZES),
+    min_time: float = 0.2,
+    repeats: int = 5,
+) -> Dict[str, Dict[str, float]]:
+    """Run the selected benchmarks; results keyed by "name[size]"."""
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if names and not any(selected in name for selected in names):
+            continue
+        for size in sizes:
+            results[f"{name}[{size}]"] = measure(factory(SIZES[size]), min_time, repeats)
+    return results
+
+
+def compare(
+    baseline: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+    threshold: float = 0.15,
+) -> List[Tuple[str, float, float, float]]:
+    """Benchmarks slower than the baseline by more than the threshold (a fraction).
+
+    Best times are compared since they are the least affected by noise.
+    Returns (name, baseline ns, current ns, change) for each regression.
+    """
+    regressions = []
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before or not before["best_ns"]:
+            continue
+        change = result["best_ns"] / before["best_ns"] - 1
+        if change > threshold:
+            regressions.append((name, before["best_ns"], result["best_ns"], change))
+    return regressions
+
+
+def _report(path: Path) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _print_results(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Any]] = None) -> None:
+    width = max((len(name) for name in results), default=0)
+    for name, result in results.items():
+        line = f"{name:<{width}}  {result['best_ns'] / 1000:>10.2f} us  (median {result['median_ns'] / 1000:.2f} us)"
+        before = (baseline or {}).get(name)
+        if before:
+            line += f"  {result['best_ns'] / before['best_ns'] - 1:+.1%} vs baseline"
+        print(line)
+
+
+def _print_regressions(regressions: List[Tuple[str, float, float, float]], threshold: float) -> int:
+    if not regressions:
+        print(f"No regressions above {threshold:.0%}")
+        return 0
+    print(f"{len(regressions)} regression(s) above {threshold:.0%}:")
+    for name, before, after, change in regressions:
+        print(f"  {name}: {before / 1000:.2f} us -> {after / 1000:.2f} us ({change:+.1%})")
+    return 1
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks")
+    run.add_argument("names", nargs="*", help="Only benchmarks whose name contains one of these")
+    run.add_argument("--size", choices=list(SIZES), action="append", help="Sizes to run (default: all)")
+    run.add_argument("--min-time", type=float, default=0.2, help="Seconds to spend timing each benchmark")
+    run.add_argument("--output", help="Write results to this JSON file")
+    run.add_argument("--save-baseline", nargs="?", const=str(DEFAULT_BASELINE), help="Store results as the baseline")
+    run.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE), help="Compare with a baseline file")
+    run.add_argument("--threshold", type=float, default=0.15, help="Slowdown that counts as a regression (0.15 = 15%%)")
+
+    diff = commands.add_parser("compare", help="Compare two result files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=0.15, help="Slowdown that counts as a regression (0.15 = 15%%)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        baseline, current = _report(Path(args.baseline)), _report(Path(args.current))
+        _print_results(current["results"], baseline["results"])
+        return _print_regressions(compare(baseline["results"], current["results"], args.threshold), args.threshold)
+
+    results = run_benchmarks(args.names, args.size or tuple(SIZES), args.min_time)
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    baseline = _report(Path(args.compare))["results"] if args.compare else None
+    _print_results(results, baseline)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+    if baseline is not None:
+        return _print_regressions(compare(baseline, results, args.threshold), args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
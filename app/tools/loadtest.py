@@ -0,0 +1,298 @@
+"""Load test that drives the Twilio voice webhooks with simulated callers.
+
+Each virtual caller posts the incoming-call webhook, one gather webhook per
+line of its script (as Twilio would, form encoded), then the completed
+status callback. By default the app runs in this process with the stub LLM
+backend; --base-url targets a running instance instead (start it with
+LLM_BACKEND=stub). SQLite serializes writes, so point DATABASE_URL at
+Postgres for numbers that reflect production.
+
+    python -m app.tools.loadtest --callers 2000 --concurrency 200 --output loadtest.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Conversations against the bundled menu; one list of utterances per caller.
+# Sized items are ordered with their size, so every script can end in an order.
+DEFAULT_SCRIPTS: List[List[str]] = [
+    ["can I get a cheeseburger", "that's all", "yes"],
+    [
+        "I'd like two hamburgers and large fries", "and a large coca cola",
+        "no that's it", "yes that's right",
+    ],
+    ["um what do you have", "large onion rings and a small sprite please", "that's everything", "yes"],
+    [
+        "a cheeseburger with no onions", "actually make that two", "and a small water",
+        "that's all", "correct",
+    ],
+]
+
+WEBHOOK_PATHS = {
+    "incoming": "/webhooks/voice/incoming",
+    "gather": "/webhooks/voice/gather",
+    "status": "/webhooks/voice/status",
+}
+
+
+def percentile(values: Sequence[float], fraction: float) -> Optional[float]:
+    """Value at a percentile (0-1) of the samples, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(fraction * len(ordered)), len(ordered) - 1)
+    return ordered[index]
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LoadTestResults:
+    """Latencies and failures collected while callers run."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {kind: [] for kind in WEBHOOK_PATHS}
+        self.errors: Dict[str, int] = {kind: 0 for kind in WEBHOOK_PATHS}
+        self.error_samples: List[str] = []
+        self.calls_completed = 0
+        self.calls_hung_up = 0
+
+    def record(self, kind: str, seconds: float, error: Optional[str] = None) -> None:
+        self.latencies[kind].append(seconds)
+        if error is not None:
+            self.errors[kind] += 1
+            if len(self.error_samples) < 20:
+                self.error_samples.append(f"{kind}: {error}")
+
+    def summary(self, elapsed_seconds: float) -> Dict[str, Any]:
+        """Throughput, latency percentiles (ms) and error rates per webhook."""
+        turns = len(self.latencies["gather"])
+        endpoints = {}
+        for kind, samples in self.latencies.items():
+            endpoints[kind] = {
+                "requests": len(samples),
+                "errors": self.errors[kind],
+                "error_rate": self.errors[kind] / len(samples) if samples else 0.0,
+                **{
+                    f"p{int(fraction * 100)}_ms": _ms(percentile(samples, fraction))
+                    for fraction in (0.5, 0.95, 0.99)
+                },
+                "max_ms": _ms(max(samples) if samples else None),
+            }
+        return {
+            "elapsed_seconds": round(elapsed_seconds, 3),
+            "calls_completed": self.calls_completed,
+            "calls_hung_up_by_agent": self.calls_hung_up,
+            "turns": turns,
+            "turns_per_second": round(turns / elapsed_seconds, 2) if elapsed_seconds > 0 else None,
+            "turn_latency": endpoints["gather"],
+            "endpoints": endpoints,
+            "error_samples": self.error_samples,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+async def _post(
+    client: httpx.AsyncClient,
+    results: LoadTestResults,
+    kind: str,
+    data: Dict[str, str],
+    params: Optional[Dict[str, str]] = None,
+) -> Optional[str]:
+    """Post one webhook, recording its latency; returns the body, or None on failure."""
+    started = time.perf_counter()
+    try:
+        response = await client.post(WEBHOOK_PATHS[kind], data=data, params=params)
+    except httpx.HTTPError as e:
+        results.record(kind, time.perf_counter() - started, f"{type(e).__name__}: {e}")
+        return None
+    elapsed = time.perf_counter() - started
+    if response.status_code != 200:
+        results.record(kind, elapsed, f"HTTP {response.status_code}")
+        return None
+    results.record(kind, elapsed)
+    return response.text
+
+
+async def run_caller(
+    client: httpx.AsyncClient,
+    results: LoadTestResults,
+    call_sid: str,
+    script: Sequence[str],
+    think_time_seconds: float = 0.0,
+) -> None:
+    """Play one call: incoming webhook, a gather per utterance, then the status callback."""
+    caller = {"CallSid": call_sid, "AccountSid": "ACloadtest", "From": "+15550000000", "To": "+15551111111"}
+    twiml = await _post(client, results, "incoming", {**caller, "CallStatus": "ringing"})
+    if twiml is not None:
+        for utterance in script:
+            if think_time_seconds:
+                await asyncio.sleep(think_time_seconds)
+            twiml = await _post(
+                client,
+                results,
+                "gather",
+                {**caller, "CallStatus": "in-progress", "SpeechResult": utterance, "Confidence": "0.92"},
+                params={"CallSid": call_sid},
+            )
+            if twiml is not None and "<Hangup" in twiml:
+                results.calls_hung_up += 1
+                break
+    await _post(client, results, "status", {**caller, "CallStatus": "completed", "CallDuration": "42"})
+    results.calls_completed += 1
+
+
+async def run_load_test(
+    client: httpx.AsyncClient,
+    callers: int,
+    concurrency: int,
+    scripts: Sequence[Sequence[str]] = DEFAULT_SCRIPTS,
+    think_time_seconds: float = 0.0,
+) -> Dict[str, Any]:
+    """Run `callers` calls, at most `concurrency` at a time, and summarize them."""
+    results = LoadTestResults()
+    limit = asyncio.Semaphore(concurrency)
+    run_id = f"{int(time.time())}"
+
+    async def caller(n: int) -> None:
+        async with limit:
+            await run_caller(
+                client, results, f"CAload{run_id}{n:07d}", scripts[n % len(scripts)], think_time_seconds
+            )
+
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    await asyncio.gather(*(caller(n) for n in range(callers)))
+    summary = results.summary(time.perf_counter() - started)
+    rss_after = rss_bytes()
+    summary["memory"] = {
+        "rss_before_mb": round(rss_before / 2**20, 1),
+        "rss_after_mb": round(rss_after / 2**20, 1),
+        "rss_growth_mb": round((rss_after - rss_before) / 2**20, 1),
+    }
+    return summary
+
+
+def load_scripts(path: str) -> List[List[str]]:
+    """Read scripts from a JSON file: a list of lists of utterances."""
+    with open(path) as f:
+        scripts = json.load(f)
+    if not scripts or not all(isinstance(script, list) for script in scripts):
+        raise ValueError(f"{path} must hold a non-empty list of utterance lists")
+    return scripts
+
+
+async def _run(args: argparse.Namespace, scripts: List[List[str]]) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+            return await run_load_test(client, args.callers, args.concurrency, scripts, args.think_time)
+
+    # In process: the stub backend stands in for the LLM, nothing leaves the machine
+    from app.core.config import settings
+    from app.core.dependencies import get_session_store
+    from app.main import app
+
+    settings.llm_backend = "stub"
+    settings.llm_stub_latency_ms = args.llm_latency_ms
+    settings.llm_stub_latency_jitter_ms = args.llm_latency_jitter_ms
+    settings.llm_stub_latency_distribution = "lognormal" if args.llm_latency_jitter_ms else "fixed"
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app) if args.lifespan else nullcontext():
+        counters_before = _agent_counters()
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=args.timeout
+        ) as client:
+            summary = await run_load_test(client, args.callers, args.concurrency, scripts, args.think_time)
+        # Errors the app answered gracefully still return 200, so count them server side
+        summary["agent"] = {
+            name: {kind: count - counters_before[name].get(kind, 0) for kind, count in counts.items()}
+            for name, counts in _agent_counters().items()
+        }
+        # Sessions still in the store after every call ended point to a leak
+        summary["sessions_left"] = len(await get_session_store().list_call_sids())
+    return summary
+
+
+def _agent_counters() -> Dict[str, Dict[str, float]]:
+    from app.core import metrics
+
+    return {
+        name: {"/".join(labels) or "total": value for labels, value in counter.values().items()}
+        for name, counter in (
+            ("errors", metrics.AGENT_ERRORS),
+            ("fallbacks", metrics.AGENT_FALLBACKS),
+            ("turn_limit_hits", metrics.TURN_LIMIT_HITS),
+        )
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--callers", type=int, default=500, help="Calls to place")
+    parser.add_argument("--concurrency", type=int, default=100, help="Calls in progress at once")
+    parser.add_argument("--scripts", help="JSON file of scripted conversations (lists of utterances)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds a caller waits before each utterance")
+    parser.add_argument("--base-url", help="Target a running instance instead of the in-process app")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Median stub LLM latency (in process)")
+    parser.add_argument("--llm-latency-jitter-ms", type=float, default=150.0, help="Stub LLM latency spread (in process)")
+    parser.add_argument("--no-lifespan", dest="lifespan", action="store_false", help="Skip app startup/shutdown (in process)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output", default="loadtest-summary.json", help="Where to write the JSON summary")
+    args = parser.parse_args(argv)
+
+    if not args.base_url:
+        # Keep the in-process run self-contained unless a database is configured
+        os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./loadtest.db")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+    scripts = load_scripts(args.scripts) if args.scripts else DEFAULT_SCRIPTS
+
+    summary = asyncio.run(_run(args, scripts))
+    summary["run"] = {
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.base_url or "in-process",
+        "callers": args.callers,
+        "concurrency": args.concurrency,
+        "scripts": len(scripts),
+        "think_time_seconds": args.think_time,
+        "llm_latency_ms": None if args.base_url else args.llm_latency_ms,
+    }
+    with open(args.output, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    turn = summary["turn_latency"]
+    print(
+        f"{summary['turns']} turns in {summary['elapsed_seconds']}s "
+        f"({summary['turns_per_second']} turns/s); turn p50/p95/p99 "
+        f"{turn['p50_ms']}/{turn['p95_ms']}/{turn['p99_ms']} ms; "
+        f"errors {sum(e['errors'] for e in summary['endpoints'].values())}; "
+        f"RSS +{summary['memory']['rss_growth_mb']} MB -> {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
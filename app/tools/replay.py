@@ -0,0 +1,421 @@
+"""Replay stored calls through the agent under different configurations.
+
+The customer side of each finished call's transcript (Call.transcript) is
+fed turn by turn through CallSessionManager for every configuration given,
+and the report compares turns to completion, per-turn latency, LLM calls
+and token usage, and whether the final order matches the one persisted
+for the call. Replays write to a throwaway database, never to
+the one transcripts are read from.
+
+    python -m app.tools.replay --limit 200 --parallel 16 \\
+        --config baseline \\
+        --config "small-context:context_token_budget=300" \\
+        --config "no-fast-path:fast_path=off,model=gpt-4o-mini,temperature=0.2"
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter as Tally
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.db.database import Base
+from app.db.models import Call, Order
+from app.services.agent.agent import AgentService
+from app.services.agent.circuit_breaker import CircuitBreaker
+from app.services.agent.context import ContextBuilder
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.hedging import HedgedCaller
+from app.services.agent.llm import create_llm_backend
+from app.services.agent.prompt import PromptCompiler
+from app.services.agent.response_cache import ResponseCache
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.store import InMemorySessionStore
+from app.services.menu.repository import MenuRepository
+from app.tools.loadtest import percentile
+
+CUSTOMER_PREFIX = "Customer: "
+
+# An order line as compared across runs: (item name, quantity, sorted modifiers)
+OrderLine = Tuple[str, int, Tuple[str, ...]]
+
+
+class ReplayConversation:
+    """The customer's side of a stored call and the order persisted for it."""
+
+    def __init__(self, call_sid: str, utterances: List[str], persisted_order: Optional[List[OrderLine]]):
+        self.call_sid = call_sid
+        self.utterances = utterances
+        self.persisted_order = persisted_order  # None when the call has no confirmed order
+
+
+class AgentConfig:
+    """One agent setup to replay conversations under."""
+
+    OPTIONS = ("backend", "model", "temperature", "context_token_budget", "fast_path", "response_cache")
+
+    def __init__(
+        self,
+        name: str,
+        backend: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        context_token_budget: Optional[int] = None,
+        fast_path: bool = True,
+        response_cache: bool = True,
+    ):
+        self.name = name
+        self.backend = backend or settings.llm_backend
+        self.model = model or settings.llm_model
+        self.temperature = temperature if temperature is not None else settings.llm_temperature
+        self.context_token_budget = context_token_budget or settings.context_token_budget
+        self.fast_path = fast_path
+        self.response_cache = response_cache
+
+    @classmethod
+    def parse(cls, spec: str) -> "AgentConfig":
+        """Parse "name" or "name:key=value,key=value" (keys from OPTIONS)."""
+        name, _, options = spec.partition(":")
+        values: Dict[str, Any] = {}
+        for option in filter(None, options.split(",")):
+            key, sep, value = option.partition("=")
+            key = key.strip()
+            if not sep or key not in cls.OPTIONS:
+                raise ValueError(f"Bad config option '{option}' (expected key=value, keys: {cls.OPTIONS})")
+            value = value.strip()
+            if key == "temperature":
+                values[key] = float(value)
+            elif key == "context_token_budget":
+                values[key] = int(value)
+            elif key in ("fast_path", "response_cache"):
+                values[key] = value.lower() in ("on", "true", "yes", "1")
+            else:
+                values[key] = value
+        return cls(name.strip(), **values)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "model": self.model if self.backend == "openai" else None,
+            "temperature": self.temperature if self.backend == "openai" else None,
+            "context_token_budget": self.context_token_budget,
+            "fast_path": self.fast_path,
+            "response_cache": self.response_cache,
+        }
+
+
+def check_unique_names(configs: Sequence[AgentConfig]) -> None:
+    """Reports are keyed by configuration name, so two configs can't share one."""
+    duplicates = [name for name, count in Tally(c.name for c in configs).items() if count > 1]
+    if duplicates:
+        raise ValueError(f"Configuration names must be unique: {duplicates}")
+
+
+class _NoFastPath(FastPathMatcher):
+    """Matcher that sends every turn to the LLM."""
+
+    def match(self, state, user_input, extractor=None) -> None:
+        self.misses += 1
+        return None
+
+
+def normalize_order(items: Sequence[Tuple[str, int, Optional[Sequence[str]]]]) -> List[OrderLine]:
+    """Order lines in a form that compares equal regardless of item and modifier order."""
+    return sorted(
+        (name.lower().strip(), quantity, tuple(sorted(m.lower().strip() for m in modifiers or [])))
+        for name, quantity, modifiers in items
+    )
+
+
+def customer_utterances(transcript: str) -> List[str]:
+    """The customer's turns from a stored transcript."""
+    return [
+        line[len(CUSTOMER_PREFIX):].strip()
+        for line in transcript.splitlines()
+        if line.startswith(CUSTOMER_PREFIX) and line[len(CUSTOMER_PREFIX):].strip()
+    ]
+
+
+async def load_conversations(
+    db: AsyncSession, limit: int = 100, call_sids: Optional[Sequence[str]] = None
+) -> List[ReplayConversation]:
+    """Most recent completed calls with a transcript, and their confirmed orders."""
+    query = (
+        select(Call)
+        .options(selectinload(Call.orders).selectinload(Order.items))
+        .where(Call.transcript.isnot(None), Call.status == "completed")
+        .order_by(Call.started_at.desc())
+        .limit(limit)
+    )
+    if call_sids:
+        query = query.where(Call.call_sid.in_(call_sids))
+    calls = (await db.execute(query)).scalars().all()
+
+    conversations = []
+    for call in calls:
+        utterances = customer_utterances(call.transcript)
+        if not utterances:
+            continue
+        confirmed = [order for order in call.orders if order.status == "confirmed"]
+        persisted = None
+        if confirmed:
+            latest = max(confirmed, key=lambda order: order.created_at)
+            persisted = normalize_order(
+                [(item.item_name, item.quantity, item.modifiers) for item in latest.items]
+            )
+        conversations.append(ReplayConversation(call.call_sid, utterances, persisted))
+    return conversations
+
+
+class ConfigRun:
+    """Agent, stores and counters for replaying under one configuration."""
+
+    def __init__(self, config: AgentConfig, menu_repository: MenuRepository, sessions: async_sessionmaker):
+        self.config = config
+        self.menu_repository = menu_repository
+        self.sessions = sessions
+        self.session_store = InMemorySessionStore()
+        self.call_record_writer = CallRecordWriter(sessions)
+        self.prompt_compiler = PromptCompiler()
+        self.fast_path = FastPathMatcher() if config.fast_path else _NoFastPath(rules=[])
+        client = None
+        if config.backend == "openai":
+            from app.core.dependencies import get_model_clients
+
+            client = get_model_clients().openai
+        self.agent = AgentService(
+            menu_repository,
+            client=client,
+            fast_path=self.fast_path,
+            response_cache=ResponseCache(
+                max_entries=settings.response_cache_max_entries if config.response_cache else 0,
+                ttl_seconds=settings.response_cache_ttl_seconds,
+            ),
+            prompt_compiler=self.prompt_compiler,
+            backend=create_llm_backend(
+                config.backend,
+                client=client,
+                menu_repository=menu_repository,
+                model=config.model,
+                temperature=config.temperature,
+            ),
+            # Own hedger and breaker so one configuration's failures don't steer another's
+            hedger=HedgedCaller(
+                percentile=settings.llm_hedge_percentile,
+                min_samples=settings.llm_hedge_min_samples,
+                default_delay_seconds=settings.llm_hedge_default_delay_seconds,
+                enabled=settings.llm_hedging_enabled,
+            ),
+            breaker=CircuitBreaker(
+                failure_rate_threshold=settings.llm_breaker_failure_rate,
+                window=settings.llm_breaker_window,
+                min_calls=settings.llm_breaker_min_calls,
+                open_seconds=settings.llm_breaker_open_seconds,
+            ),
+        )
+        self.agent.context_builder = ContextBuilder(
+            token_budget=config.context_token_budget,
+            summary_max_tokens=settings.context_summary_max_tokens,
+            min_recent_turns=settings.context_min_recent_turns,
+        )
+        self.results: List[Dict[str, Any]] = []
+
+    async def replay(self, conversation: ReplayConversation) -> Dict[str, Any]:
+        """Play one conversation's customer turns until the agent ends the call."""
+        call_sid = f"{conversation.call_sid}:{self.config.name}"
+        latencies = []
+        completed = False
+        async with self.sessions() as db:
+            manager = CallSessionManager(
+                db,
+                self.agent,
+                self.menu_repository,
+                session_store=self.session_store,
+                call_record_writer=self.call_record_writer,
+            )
+            await manager.get_greeting(call_sid)
+            for utterance in conversation.utterances:
+                started = time.perf_counter()
+                result = await manager.process_user_text(call_sid, utterance)
+                latencies.append(time.perf_counter() - started)
+                if result.end_call:
+                    completed = True
+                    break
+
+            session = await manager.get_session(call_sid)
+            final_order = normalize_order(
+                [(item.item_name, item.quantity, item.modifiers) for item in session.state.current_order]
+            )
+            await manager.end_session(call_sid)
+
+        result = {
+            "call_sid": conversation.call_sid,
+            "completed": completed,
+            "turns": len(latencies),
+            "latencies": latencies,
+            "order_matches": (
+                final_order == conversation.persisted_order
+                if conversation.persisted_order is not None
+                else None
+            ),
+            "final_order": final_order,
+            "persisted_order": conversation.persisted_order,
+        }
+        self.results.append(result)
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        """Aggregate this configuration's results."""
+        results = self.results
+        completed = [r for r in results if r["completed"]]
+        turns = [float(r["turns"]) for r in completed]
+        latencies = [seconds for r in results for seconds in r["latencies"]]
+        compared = [r for r in results if r["order_matches"] is not None]
+        matched = [r for r in compared if r["order_matches"]]
+        compiler = self.prompt_compiler
+        return {
+            "config": self.config.describe(),
+            "conversations": len(results),
+            "completed": len(completed),
+            "completion_rate": _rate(len(completed), len(results)),
+            "turns_to_completion": {
+                "mean": round(sum(turns) / len(turns), 2) if turns else None,
+                "p50": percentile(turns, 0.5),
+                "p90": percentile(turns, 0.9),
+                "max": max(turns) if turns else None,
+            },
+            "turn_latency_ms": {
+                f"p{int(fraction * 100)}": _ms(percentile(latencies, fraction))
+                for fraction in (0.5, 0.95, 0.99)
+            },
+            "llm_calls": compiler.turns,
+            "llm_calls_per_conversation": round(compiler.turns / len(results), 2) if results else None,
+            "fast_path_hits": sum(self.fast_path.hits.values()),
+            "tokens": {
+                "prompt": compiler.prompt_tokens,
+                "cached": compiler.cached_tokens,
+                "completion": compiler.completion_tokens,
+                "per_conversation": (
+                    round((compiler.prompt_tokens + compiler.completion_tokens) / len(results), 1)
+                    if results
+                    else None
+                ),
+            },
+            "order_match_rate": _rate(len(matched), len(compared)),
+            "order_mismatches": [
+                {"call_sid": r["call_sid"], "replayed": r["final_order"], "persisted": r["persisted_order"]}
+                for r in compared
+                if not r["order_matches"]
+            ][:20],
+        }
+
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 3) if whole else None
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+async def create_sandbox() -> async_sessionmaker:
+    """Sessions on an empty throwaway database for the replays to write to.
+
+    A file rather than an in-memory database, so concurrent conversations
+    each get their own connection instead of interleaving on a shared one.
+    """
+    directory = tempfile.mkdtemp(prefix="replay-sandbox-")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{os.path.join(directory, 'sandbox.db')}", connect_args={"timeout": 30}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def run_experiment(
+    conversations: Sequence[ReplayConversation],
+    configs: Sequence[AgentConfig],
+    menu_repository: MenuRepository,
+    parallel: int = 8,
+) -> Dict[str, Any]:
+    """Replay every conversation under every configuration, `parallel` at a time."""
+    sandbox = await create_sandbox()
+    runs = [ConfigRun(config, menu_repository, sandbox) for config in configs]
+    limit = asyncio.Semaphore(parallel)
+
+    async def replay(run: ConfigRun, conversation: ReplayConversation) -> None:
+        async with limit:
+            await run.replay(conversation)
+
+    # One configuration at a time so they don't compete for the model's rate limit
+    for run in runs:
+        await asyncio.gather(*(replay(run, conversation) for conversation in conversations))
+        await run.call_record_writer.drain()
+    return {run.config.name: run.report() for run in runs}
+
+
+def _print_table(report: Dict[str, Any]) -> None:
+    header = f"{'config':<20} {'done':>6} {'turns':>6} {'p50 ms':>8} {'p95 ms':>8} {'llm/call':>9} {'tok/call':>9} {'match':>6}"
+    print(header)
+    for name, row in report.items():
+        print(
+            f"{name:<20} {_fmt(row['completion_rate']):>6} {_fmt(row['turns_to_completion']['mean']):>6} "
+            f"{_fmt(row['turn_latency_ms']['p50']):>8} {_fmt(row['turn_latency_ms']['p95']):>8} "
+            f"{_fmt(row['llm_calls_per_conversation']):>9} {_fmt(row['tokens']['per_conversation']):>9} "
+            f"{_fmt(row['order_match_rate']):>6}"
+        )
+
+
+def _fmt(value: Any) -> str:
+    return "-" if value is None else str(value)
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    from app.core.dependencies import get_menu_repository
+    from app.db.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        conversations = await load_conversations(db, args.limit, args.call_sid)
+    print(f"Replaying {len(conversations)} conversations under {len(args.config)} configuration(s)")
+    configs = [AgentConfig.parse(spec) for spec in args.config]
+    check_unique_names(configs)
+    return await run_experiment(conversations, configs, get_menu_repository(), args.parallel)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--config",
+        action="append",
+        help=f"NAME[:key=value,...] with keys {', '.join(AgentConfig.OPTIONS)}; repeat to compare",
+    )
+    parser.add_argument("--limit", type=int, default=100, help="Most recent completed calls to replay")
+    parser.add_argument("--call-sid", action="append", help="Replay only these calls")
+    parser.add_argument("--parallel", type=int, default=8, help="Conversations replayed at once")
+    parser.add_argument("--output", default="replay-report.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+    args.config = args.config or ["current"]
+
+    report = asyncio.run(_main(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    _print_table(report)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
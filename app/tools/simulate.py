@@ -0,0 +1,443 @@
+"""Dialogue-efficiency simulator: synthetic callers ordering from the menu.
+
+Each simulated caller is given an order drawn from the menu and a persona
+that decides how it talks: decisive (everything in one sentence), rambling
+(an item at a time, with filler), revising (changes the order at read-back)
+or noisy_asr (decisive, but through a lossy speech recognizer). Callers
+react to the conversation state, answering follow-up questions and
+confirming the read-back, until the agent ends the call.
+
+The report gives, per configuration and persona, the distribution of turns
+and LLM calls per order, error and degraded-mode turns, how often the
+order came out right (a call only counts as completed if it did), and
+time to order (agent processing, plus an estimate of the spoken call
+length). Comparing configurations shows whether fast paths and caching
+actually shorten calls.
+
+    python -m app.tools.simulate --conversations 100 --config current --config "no-fast-path:fast_path=off"
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from app.services.agent.llm import LLMBackend, LLMCompletion, Messages
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+from app.services.call_session.manager import CallSessionManager
+from app.services.menu.base import Menu
+from app.services.menu.repository import MenuRepository
+from app.services.ordering.extractor import SIZE_OPTIONS
+from app.tools.loadtest import percentile
+from app.tools.replay import AgentConfig, ConfigRun, check_unique_names, create_sandbox, normalize_order
+
+PERSONAS = ("decisive", "rambling", "revising", "noisy_asr")
+
+# Hard stop for callers the agent can't finish with (the manager's own limit is 20)
+MAX_CALLER_TURNS = 25
+
+# Speaking rate used to estimate how long the call takes on the phone
+WORDS_PER_SECOND = 2.5
+
+NUMBER_WORDS = {1: "a", 2: "two", 3: "three", 4: "four", 5: "five"}
+FILLERS = ["um", "uh", "so", "like", "you know", "let me think", "okay so", "yeah"]
+# Words speech recognizers commonly get wrong on orders
+MISHEARINGS = {
+    "two": "to",
+    "four": "for",
+    "fries": "freeze",
+    "large": "lodge",
+    "coke": "coat",
+    "burger": "burglar",
+    "onions": "unions",
+    "water": "waiter",
+    "sprite": "spite",
+}
+
+
+class GoalItem:
+    """An item the simulated caller wants."""
+
+    def __init__(
+        self,
+        name: str,
+        quantity: int = 1,
+        modifiers: Optional[List[str]] = None,
+        sizes: Optional[List[str]] = None,
+    ):
+        self.name = name
+        self.quantity = quantity
+        self.modifiers = modifiers or []
+        self.sizes = sizes or []  # Sizes the item comes in, for when the agent asks
+
+    def phrase(self) -> str:
+        """How a caller says it: "two cheeseburgers with no onions"."""
+        name = self.name
+        if self.quantity > 1 and not name.endswith("s"):
+            name += "s"
+        text = f"{NUMBER_WORDS.get(self.quantity, str(self.quantity))} {name}"
+        if self.modifiers:
+            text += " with " + " and ".join(self.modifiers)
+        return text
+
+
+def make_goal(menu: Menu, rng: random.Random, max_items: int = 3) -> List[GoalItem]:
+    """A plausible order: one to max_items distinct menu items, some with an option."""
+    items = rng.sample(menu.items, k=min(len(menu.items), rng.randint(1, max_items)))
+    goal = []
+    for item in items:
+        modifiers = [rng.choice(item.options)] if item.options and rng.random() < 0.4 else []
+        sizes = [option for option in item.options if option in SIZE_OPTIONS]
+        quantity = rng.choice([1, 1, 1, 2])
+        goal.append(GoalItem(item.name, quantity=quantity, modifiers=modifiers, sizes=sizes))
+    return goal
+
+
+def mishear(text: str, rng: random.Random, error_rate: float = 0.15) -> str:
+    """Run an utterance through a lossy recognizer: dropped and misheard words, no punctuation."""
+    words = []
+    for word in re.sub(r"[^\w\s']", "", text.lower()).split():
+        roll = rng.random()
+        if roll < error_rate / 3:
+            continue
+        if roll < error_rate and word in MISHEARINGS:
+            word = MISHEARINGS[word]
+        words.append(word)
+    return " ".join(words) or text
+
+
+def _join(phrases: List[str]) -> str:
+    if len(phrases) == 1:
+        return phrases[0]
+    return ", ".join(phrases[:-1]) + " and " + phrases[-1]
+
+
+class SimulatedCaller:
+    """Decides what a persona says next, given the conversation so far."""
+
+    def __init__(self, persona: str, goal: List[GoalItem], rng: random.Random):
+        if persona not in PERSONAS:
+            raise ValueError(f"Unknown persona: {persona}")
+        self.persona = persona
+        self.goal = goal
+        self.rng = rng
+        self.revised = False
+        self._order_lines = self._plan_order_lines()
+        self._retries = 0
+        self._last_line: Optional[str] = None
+        self._order_size_before: Optional[int] = None
+
+    def _plan_order_lines(self) -> List[str]:
+        phrases = [item.phrase() for item in self.goal]
+        if self.persona == "rambling":
+            return [
+                f"{self.rng.choice(FILLERS)} {self.rng.choice(['can I get', 'I think I want', 'give me'])} "
+                f"{phrase}, {self.rng.choice(FILLERS)}"
+                for phrase in phrases
+            ]
+        return [f"{self.rng.choice(['can I get', 'I would like', 'let me get'])} {_join(phrases)}"]
+
+    def _say(self, text: str) -> str:
+        return mishear(text, self.rng) if self.persona == "noisy_asr" else text
+
+    def next_utterance(self, state: ConversationState) -> Optional[str]:
+        """The caller's next line, or None when the call is over."""
+        if state.stage == ConversationStage.CONCLUSION:
+            return None
+
+        if state.pending_modifiers_item_name:
+            wanted = next(
+                (item for item in self.goal if item.name == state.pending_modifiers_item_name.lower()), None
+            )
+            if wanted and wanted.modifiers:
+                return self._say(" and ".join(wanted.modifiers))
+            return self._say("no that's fine as it is")
+
+        size_answer = self._answer_size_question(state)
+        if size_answer is not None:
+            return self._say(size_answer)
+
+        if state.stage in (ConversationStage.GREETING, ConversationStage.ORDERING):
+            # A line that added nothing was probably misunderstood; say it again
+            if (
+                self._last_line is not None
+                and len(state.current_order) == self._order_size_before
+                and self._retries < 2
+            ):
+                self._retries += 1
+                return self._order_line(self._last_line, len(state.current_order))
+            if self._order_lines:
+                self._retries = 0
+                return self._order_line(self._order_lines.pop(0), len(state.current_order))
+            self._last_line = None
+            return self._say(self.rng.choice(["that's all", "that's it", "no that's everything"]))
+
+        if state.stage == ConversationStage.REVIEW:
+            if self.persona == "revising" and not self.revised:
+                self.revised = True
+                return self._revise()
+            return self._say(self.rng.choice(["yes that's right", "yes", "correct"]))
+
+        # REVISION: the change has been made
+        return self._say("that's all")
+
+    def _answer_size_question(self, state: ConversationState) -> Optional[str]:
+        """Pick a size when the agent's last line asks for one of an item the caller wants."""
+        agent_lines = [line for line in state.transcript if line.startswith("Agent: ")]
+        if not agent_lines or "size" not in agent_lines[-1].lower():
+            return None
+        question = agent_lines[-1].lower()
+        for item in self.goal:
+            if item.name in question and item.sizes and not set(item.modifiers) & SIZE_OPTIONS:
+                size = self.rng.choice(item.sizes)
+                item.modifiers.append(size)
+                return size
+        return None
+
+    def _order_line(self, line: str, order_size: int) -> str:
+        self._last_line = line
+        self._order_size_before = order_size
+        return self._say(line)
+
+    def _revise(self) -> str:
+        """Change the order at read-back: drop the last item, or add one more of it."""
+        item = self.goal[-1]
+        if len(self.goal) > 1:
+            self.goal.pop()
+            return f"actually can you remove the {item.name}"
+        item.quantity += 1
+        return f"actually can you add one more {item.name}"
+
+
+class ConversationStats:
+    """What one simulated call took."""
+
+    def __init__(self, persona: str):
+        self.persona = persona
+        self.turns = 0
+        self.llm_calls = 0
+        self.degraded_turns = 0
+        self.error_turns = 0
+        self.processing_seconds = 0.0
+        self.spoken_words = 0
+        self.completed = False
+        self.order_correct = False
+        self.items_correct = False
+
+    @property
+    def call_seconds(self) -> float:
+        """Estimated length on the phone: speech both ways plus agent processing."""
+        return self.spoken_words / WORDS_PER_SECOND + self.processing_seconds
+
+
+# Stats of the conversation a model call belongs to (set per simulated call task)
+_current_stats: ContextVar[Optional[ConversationStats]] = ContextVar("simulated_call_stats", default=None)
+
+
+class CountingBackend(LLMBackend):
+    """Wraps a backend to count calls against the simulated conversation making them."""
+
+    def __init__(self, inner: LLMBackend, counter: str):
+        self.inner = inner
+        self.counter = counter
+
+    def _count(self) -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            setattr(stats, self.counter, getattr(stats, self.counter) + 1)
+
+    async def complete(self, messages: Messages) -> LLMCompletion:
+        self._count()
+        return await self.inner.complete(messages)
+
+    async def stream(self, messages: Messages) -> AsyncIterator[str]:
+        self._count()
+        async for chunk in self.inner.stream(messages):
+            yield chunk
+
+
+async def simulate_call(
+    run: ConfigRun, call_sid: str, persona: str, goal: List[GoalItem], rng: random.Random
+) -> ConversationStats:
+    """Play one simulated caller against the agent until the call ends."""
+    stats = ConversationStats(persona)
+    _current_stats.set(stats)
+    caller = SimulatedCaller(persona, goal, rng)
+
+    async with run.sessions() as db:
+        manager = CallSessionManager(
+            db,
+            run.agent,
+            run.menu_repository,
+            session_store=run.session_store,
+            call_record_writer=run.call_record_writer,
+        )
+        greeting = await manager.get_greeting(call_sid)
+        stats.spoken_words += len(greeting.split())
+        session = await manager.get_session(call_sid)
+
+        while stats.turns < MAX_CALLER_TURNS:
+            utterance = caller.next_utterance(session.state)
+            if utterance is None:
+                break
+            errors_before = session.state.consecutive_errors
+            started = time.perf_counter()
+            result = await manager.process_user_text(call_sid, utterance)
+            stats.processing_seconds += time.perf_counter() - started
+            stats.turns += 1
+            stats.spoken_words += len(utterance.split()) + len(result.response_text.split())
+
+            session = await manager.get_session(call_sid)
+            if session.state.consecutive_errors > errors_before:
+                stats.error_turns += 1
+            if result.end_call:
+                break
+
+        final = normalize_order(
+            [(item.item_name, item.quantity, item.modifiers) for item in session.state.current_order]
+        )
+        wanted = normalize_order([(item.name, item.quantity, item.modifiers) for item in caller.goal])
+        stats.order_correct = final == wanted
+        # A call only counts as done if it ended on the order the caller wanted
+        concluded = session.state.stage == ConversationStage.CONCLUSION
+        stats.completed = concluded and bool(final) and stats.order_correct
+        stats.items_correct = [line[:2] for line in final] == [line[:2] for line in wanted]
+        await manager.end_session(call_sid)
+    return stats
+
+
+def summarize(stats: Sequence[ConversationStats]) -> Dict[str, Any]:
+    """Distributions over a set of simulated calls."""
+
+    def distribution(values: List[float]) -> Dict[str, Optional[float]]:
+        return {
+            "mean": round(sum(values) / len(values), 2) if values else None,
+            "p50": _round(percentile(values, 0.5)),
+            "p90": _round(percentile(values, 0.9)),
+            "max": _round(max(values)) if values else None,
+        }
+
+    completed = [s for s in stats if s.completed]
+    return {
+        "conversations": len(stats),
+        "completion_rate": _rate(len(completed), len(stats)),
+        "order_correct_rate": _rate(sum(s.order_correct for s in stats), len(stats)),
+        "items_correct_rate": _rate(sum(s.items_correct for s in stats), len(stats)),
+        "turns_per_order": distribution([float(s.turns) for s in completed]),
+        "llm_calls_per_order": distribution([float(s.llm_calls) for s in completed]),
+        "error_turns_per_call": distribution([float(s.error_turns) for s in stats]),
+        "degraded_turns_per_call": distribution([float(s.degraded_turns) for s in stats]),
+        "processing_seconds_per_order": distribution([s.processing_seconds for s in completed]),
+        "estimated_call_seconds": distribution([s.call_seconds for s in completed]),
+    }
+
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 3) if whole else None
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+async def run_simulation(
+    configs: Sequence[AgentConfig],
+    menu_repository: MenuRepository,
+    personas: Sequence[str] = PERSONAS,
+    conversations: int = 50,
+    seed: int = 0,
+    parallel: int = 8,
+) -> Dict[str, Any]:
+    """Simulate `conversations` calls per persona under each configuration.
+
+    Every configuration hears the same callers with the same orders (the
+    seed fixes them), so differences come from the agent alone.
+    """
+    menu = await menu_repository.get_menu()
+    sandbox = await create_sandbox()
+    limit = asyncio.Semaphore(parallel)
+    report = {}
+
+    for config in configs:
+        run = ConfigRun(config, menu_repository, sandbox)
+        run.agent.backend = CountingBackend(run.agent.backend, "llm_calls")
+        run.agent.degraded_backend = CountingBackend(run.agent.degraded_backend, "degraded_turns")
+        results: Dict[str, List[ConversationStats]] = {persona: [] for persona in personas}
+
+        async def call(persona: str, n: int) -> None:
+            rng = random.Random(f"{seed}:{persona}:{n}")
+            goal = make_goal(menu, rng)
+            async with limit:
+                stats = await simulate_call(run, f"CAsim-{config.name}-{persona}-{n}", persona, goal, rng)
+            results[persona].append(stats)
+
+        # Each call runs in its own task, so its context carries its own stats
+        await asyncio.gather(*(call(persona, n) for persona in personas for n in range(conversations)))
+        await run.call_record_writer.drain()
+
+        report[config.name] = {
+            "config": config.describe(),
+            "all": summarize([s for persona_stats in results.values() for s in persona_stats]),
+            "personas": {persona: summarize(persona_stats) for persona, persona_stats in results.items()},
+        }
+    return report
+
+
+def _print_table(report: Dict[str, Any]) -> None:
+    print(f"{'config':<18} {'persona':<11} {'done':>6} {'right':>6} {'turns':>6} {'llm':>6} {'errors':>7} {'call s':>7}")
+    for name, result in report.items():
+        rows = [("all", result["all"])] + list(result["personas"].items())
+        for persona, row in rows:
+            print(
+                f"{name:<18} {persona:<11} {_fmt(row['completion_rate']):>6} {_fmt(row['order_correct_rate']):>6} "
+                f"{_fmt(row['turns_per_order']['mean']):>6} {_fmt(row['llm_calls_per_order']['mean']):>6} "
+                f"{_fmt(row['error_turns_per_call']['mean']):>7} {_fmt(row['estimated_call_seconds']['p50']):>7}"
+            )
+
+
+def _fmt(value: Any) -> str:
+    return "-" if value is None else str(value)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--config",
+        action="append",
+        help=f"NAME[:key=value,...] with keys {', '.join(AgentConfig.OPTIONS)}; repeat to compare",
+    )
+    parser.add_argument("--persona", action="append", choices=PERSONAS, help="Personas to simulate (default: all)")
+    parser.add_argument("--conversations", type=int, default=50, help="Simulated calls per persona")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for orders and caller behaviour")
+    parser.add_argument("--parallel", type=int, default=8, help="Calls simulated at once")
+    parser.add_argument("--output", default="simulation-report.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    from app.core.dependencies import get_menu_repository
+
+    configs = [AgentConfig.parse(spec) for spec in args.config or ["current"]]
+    check_unique_names(configs)
+    report = asyncio.run(
+        run_simulation(
+            configs,
+            get_menu_repository(),
+            personas=args.persona or PERSONAS,
+            conversations=args.conversations,
+            seed=args.seed,
+            parallel=args.parallel,
+        )
+    )
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    _print_table(report)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
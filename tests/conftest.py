@@ -167,12 +167,13 @@ def clean_auth_sessions():
 
 
 @pytest.fixture
-def clean_call_sessions():
+async def clean_call_sessions():
     """Clean up call sessions before and after tests."""
-    from app.services.call_session import manager
-    manager._sessions.clear()
-    yield
-    manager._sessions.clear()
+    from app.core.dependencies import get_session_store
+    store = get_session_store()
+    await store.clear()
+    yield store
+    await store.clear()
 
 
 @pytest.fixture(autouse=True)
@@ -224,6 +225,25 @@ def reset_menu_cache(test_menu_path):
     repo.provider._menu = None
 
 
+@pytest.fixture(autouse=True)
+def reset_response_cache():
+    """Clear the shared LLM response cache so mocked responses don't leak between tests."""
+    from app.core.dependencies import get_response_cache
+    cache = get_response_cache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_circuit_breaker():
+    """Start each test with a closed LLM breaker so injected failures don't leak between tests."""
+    from app.core import dependencies
+    dependencies._llm_circuit_breaker = None
+    yield
+    dependencies._llm_circuit_breaker = None
+
+
 # Pytest configuration
 def pytest_configure(config):
     """Configure pytest."""
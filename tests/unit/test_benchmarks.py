@@ -0,0 +1,54 @@
+"""Unit tests for the per-turn micro-benchmarks."""
+import json
+
+from app.tools import benchmarks
+from app.tools.benchmarks import compare, measure, run_benchmarks
+
+
+class TestBenchmarks:
+    """Test running benchmarks and comparing against a baseline."""
+
+    def test_every_benchmark_runs_at_every_size(self):
+        results = run_benchmarks(min_time=0.001, repeats=1)
+
+        assert len(results) == len(benchmarks.BENCHMARKS) * len(benchmarks.SIZES)
+        assert results["menu.get_menu_text[stress]"]["best_ns"] > 0
+
+    def test_name_filter(self):
+        results = run_benchmarks(["twiml"], sizes=["realistic"], min_time=0.001, repeats=1)
+        assert list(results) == ["tts.generate_twiml_with_gather[realistic]"]
+
+    def test_measure_awaits_async_operations(self):
+        calls = []
+
+        async def operation():
+            calls.append(1)
+
+        result = measure(operation, min_time=0.001, repeats=2)
+
+        # Warm-up and calibration calls come on top of the timed repeats
+        assert len(calls) > 2 * result["loops"]
+        assert result["best_ns"] <= result["median_ns"]
+
+    def test_compare_flags_slowdowns_above_threshold(self):
+        baseline = {"a[realistic]": {"best_ns": 100.0}, "b[realistic]": {"best_ns": 100.0}}
+        current = {
+            "a[realistic]": {"best_ns": 110.0},
+            "b[realistic]": {"best_ns": 130.0},
+            "new[realistic]": {"best_ns": 5.0},
+        }
+
+        regressions = compare(baseline, current, threshold=0.15)
+
+        assert [(name, round(change, 2)) for name, _, _, change in regressions] == [("b[realistic]", 0.3)]
+
+    def test_compare_command_exit_status(self, tmp_path):
+        def write(name, best_ns):
+            path = tmp_path / name
+            path.write_text(json.dumps({"results": {"a[stress]": {"best_ns": best_ns, "median_ns": best_ns}}}))
+            return str(path)
+
+        baseline = write("baseline.json", 100.0)
+
+        assert benchmarks.main(["compare", baseline, write("same.json", 101.0)]) == 0
+        assert benchmarks.main(["compare", baseline, write("slow.json", 150.0)]) == 1
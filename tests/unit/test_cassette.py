@@ -0,0 +1,170 @@
+"""Unit tests for recording and replaying model API traffic."""
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.core.cassette import RECORD, REPLAY, Cassette, CassetteError, CassetteTransport, request_key
+from app.core.clients import ModelClients
+
+COMPLETION = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 1700000000,
+    "model": "gpt-4o-mini",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": '{"response": "One burger.", "intent": "ordering"}'},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 900, "completion_tokens": 12, "total_tokens": 912},
+}
+
+
+class SlowChunks(httpx.AsyncByteStream):
+    """Body that arrives in pieces, like a streamed completion."""
+
+    def __init__(self, chunks, gap_seconds):
+        self.chunks = chunks
+        self.gap_seconds = gap_seconds
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.gap_seconds)
+            yield chunk
+
+
+def upstream(handler_calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        handler_calls.append(request)
+        if request.url.path.endswith("/chat/completions") and json.loads(request.content).get("stream"):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream", "set-cookie": "secret"},
+                stream=SlowChunks([b"data: one\n\n", b"data: two\n\n", b"data: [DONE]\n\n"], 0.02),
+            )
+        if request.url.path.endswith("/audio/speech"):
+            return httpx.Response(200, headers={"content-type": "audio/mpeg"}, content=b"\xff\xfb\x90\x00")
+        return httpx.Response(200, json=COMPLETION)
+
+    return httpx.MockTransport(handler)
+
+
+async def record(tmp_path, requests):
+    """Record requests against the fake upstream and return the saved cassette path."""
+    path = str(tmp_path / "model.json.gz")
+    calls = []
+    transport = CassetteTransport(upstream(calls), Cassette(path), mode=RECORD)
+    async with httpx.AsyncClient(transport=transport) as client:
+        for method, url, kwargs in requests:
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+    return path, calls
+
+
+class TestCassette:
+    """Test the recording format and request matching."""
+
+    def test_json_key_order_does_not_change_the_key(self):
+        url = "https://api.openai.com/v1/chat/completions"
+        a = httpx.Request("POST", url, content=b'{"model": "m", "temperature": 0.5}',
+                          headers={"content-type": "application/json"})
+        b = httpx.Request("POST", url, content=b'{"temperature":0.5,"model":"m"}',
+                          headers={"content-type": "application/json"})
+        c = httpx.Request("POST", url, content=b'{"temperature":0.7,"model":"m"}',
+                          headers={"content-type": "application/json"})
+
+        assert request_key(a) == request_key(b) != request_key(c)
+
+    def test_multipart_boundary_does_not_change_the_key(self):
+        url = "https://api.openai.com/v1/audio/transcriptions"
+        files = {"file": ("speech.wav", b"RIFF....", "audio/wav")}
+        a = httpx.Request("POST", url, files=files, data={"model": "whisper-1"})
+        b = httpx.Request("POST", url, files=files, data={"model": "whisper-1"})
+        a.read()
+        b.read()
+
+        assert a.headers["content-type"] != b.headers["content-type"]
+        assert request_key(a) == request_key(b)
+
+    def test_repeats_last_interaction_once_exhausted(self):
+        cassette = Cassette(interactions=[{"key": "k", "n": 1}, {"key": "k", "n": 2}])
+
+        assert [cassette.find("k")["n"] for _ in range(3)] == [1, 2, 2]
+        assert cassette.find("other") is None
+        cassette.rewind()
+        assert cassette.find("k")["n"] == 1
+
+
+class TestCassetteTransport:
+    """Test recording and replaying through httpx."""
+
+    @pytest.mark.asyncio
+    async def test_record_then_replay_offline(self, tmp_path):
+        body = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "a burger"}]}
+        path, calls = await record(
+            tmp_path,
+            [
+                ("POST", "https://api.openai.com/v1/chat/completions", {"json": body}),
+                ("POST", "https://api.openai.com/v1/audio/speech", {"json": {"input": "hi"}}),
+            ],
+        )
+        assert len(calls) == 2
+        assert calls[0].headers["accept-encoding"] == "identity"
+
+        cassette = Cassette.load(path)
+        assert len(cassette) == 2
+        # Only the headers worth keeping are stored
+        assert "set-cookie" not in json.dumps(cassette.interactions)
+
+        transport = CassetteTransport(None, cassette, mode=REPLAY)
+        async with httpx.AsyncClient(transport=transport) as client:
+            completion = await client.post("https://api.openai.com/v1/chat/completions", json=body)
+            speech = await client.post("https://api.openai.com/v1/audio/speech", json={"input": "hi"})
+            with pytest.raises(CassetteError):
+                await client.post("https://api.openai.com/v1/audio/speech", json={"input": "bye"})
+
+        assert completion.json() == COMPLETION
+        assert speech.content == b"\xff\xfb\x90\x00"
+        assert speech.headers["content-type"] == "audio/mpeg"
+
+    @pytest.mark.asyncio
+    async def test_streamed_chunks_and_timing_are_replayed(self, tmp_path):
+        body = {"model": "gpt-4o-mini", "stream": True, "messages": []}
+        path, _ = await record(
+            tmp_path, [("POST", "https://api.openai.com/v1/chat/completions", {"json": body})]
+        )
+        chunk_times = [chunk["t"] for chunk in Cassette.load(path).interactions[0]["response"]["chunks"]]
+        assert len(chunk_times) == 3 and chunk_times == sorted(chunk_times)
+
+        async def replay(realtime):
+            transport = CassetteTransport(None, Cassette.load(path), mode=REPLAY, realtime=realtime)
+            async with httpx.AsyncClient(transport=transport) as client:
+                started = time.perf_counter()
+                async with client.stream("POST", "https://api.openai.com/v1/chat/completions", json=body) as response:
+                    chunks = [chunk async for chunk in response.aiter_raw()]
+                return chunks, time.perf_counter() - started
+
+        chunks, fast = await replay(realtime=False)
+        assert chunks == [b"data: one\n\n", b"data: two\n\n", b"data: [DONE]\n\n"]
+        _, paced = await replay(realtime=True)
+        assert paced >= chunk_times[-1] / 1000 * 0.9
+        assert fast < paced
+
+    @pytest.mark.asyncio
+    async def test_model_clients_replay_a_completion(self, tmp_path):
+        request = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "a burger"}], "temperature": 0.5}
+        path, _ = await record(
+            tmp_path, [("POST", "https://api.openai.com/v1/chat/completions", {"json": request})]
+        )
+        clients = ModelClients(api_key="test-key", max_retries=0, cassette=Cassette.load(path))
+
+        completion = await clients.openai.chat.completions.create(**request)
+        await clients.aclose()
+
+        assert completion.choices[0].message.content == COMPLETION["choices"][0]["message"]["content"]
+        assert completion.usage.completion_tokens == 12
@@ -0,0 +1,172 @@
+"""Unit tests for the LLM circuit breaker and degraded mode."""
+import time
+import pytest
+
+from app.core import dependencies
+from app.services.agent.agent import AgentService
+from app.services.agent.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.llm import StubBackend
+from app.services.agent.prompt import PromptCompiler
+from app.services.agent.response_cache import ResponseCache
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+
+
+def open_breaker(**kwargs):
+    breaker = CircuitBreaker(min_calls=2, **kwargs)
+    breaker.allow_request()
+    breaker.record_failure()
+    breaker.allow_request()
+    breaker.record_failure()
+    return breaker
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    def test_opens_at_failure_rate(self):
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, min_calls=4)
+        for failed in (False, True, False):
+            assert breaker.allow_request()
+            breaker.record_failure() if failed else breaker.record_success()
+        assert breaker.state == CLOSED  # Not enough calls yet
+
+        breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow_request()
+        assert breaker.stats()["rejected"] == 1
+
+    def test_stays_closed_below_threshold(self):
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, min_calls=2)
+        for _ in range(3):
+            breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+    def test_probe_success_closes(self):
+        breaker = open_breaker(open_seconds=0.05)
+        time.sleep(0.06)
+
+        assert breaker.allow_request()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow_request()  # Only one probe at a time
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.failure_rate() == 0
+
+    def test_lost_probe_is_given_up(self):
+        breaker = open_breaker(open_seconds=0.05)
+        time.sleep(0.06)
+        assert breaker.allow_request()  # This probe's turn never reports back
+
+        time.sleep(0.06)
+        assert breaker.allow_request()
+
+    def test_probe_failure_reopens(self):
+        breaker = open_breaker(open_seconds=0)
+        breaker.allow_request()
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert [(t["from"], t["to"]) for t in breaker.stats()["transitions"]] == [
+            (CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, OPEN),
+        ]
+
+
+class TestDegradedMode:
+    """Test agent turns while the breaker is open."""
+
+    def make_agent(self, test_menu_repository, backend, breaker):
+        return AgentService(
+            test_menu_repository,
+            fast_path=FastPathMatcher(rules=[]),
+            response_cache=ResponseCache(),
+            prompt_compiler=PromptCompiler(),
+            backend=backend,
+            breaker=breaker,
+        )
+
+    @pytest.mark.asyncio
+    async def test_failures_trip_breaker_then_turns_use_menu(self, test_menu_repository):
+        backend = StubBackend(rate_limit_rate=1.0)
+        breaker = CircuitBreaker(min_calls=2, open_seconds=60)
+        agent = self.make_agent(test_menu_repository, backend, breaker)
+
+        for utterance in ("what's good here", "do you have specials"):
+            state = ConversationState(call_sid="CA_breaker", stage=ConversationStage.ORDERING)
+            assert (await agent.process_user_input(state, utterance))["error"] is True
+        assert breaker.state == OPEN
+
+        state = ConversationState(call_sid="CA_breaker", stage=ConversationStage.ORDERING)
+        response = await agent.process_user_input(state, "two burgers and a soda please")
+
+        assert backend.calls == 2  # The open breaker skipped the LLM
+        assert "error" not in response
+        assert [a["item_name"] for a in response["actions"]] == ["burger", "soda"]
+        assert len(agent.response_cache) == 0  # Degraded answers aren't cached
+
+    @pytest.mark.asyncio
+    async def test_malformed_answers_trip_breaker(self, test_menu_repository):
+        backend = StubBackend(malformed_rate=1.0)
+        breaker = CircuitBreaker(min_calls=2, open_seconds=60)
+        agent = self.make_agent(test_menu_repository, backend, breaker)
+
+        for utterance in ("what's good here", "do you have specials"):
+            state = ConversationState(call_sid="CA_breaker", stage=ConversationStage.ORDERING)
+            assert (await agent.process_user_input(state, utterance))["error"] is True
+
+        assert breaker.state == OPEN
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "stage, utterance",
+        [
+            (ConversationStage.REVISION, "remove the burger"),
+            (ConversationStage.ORDERING, "I don't want a burger"),
+            (ConversationStage.ORDERING, "a burger and fries"),
+        ],
+    )
+    async def test_degraded_turns_ask_again_unless_sure(self, test_menu_repository, stage, utterance):
+        backend = StubBackend()
+        agent = self.make_agent(test_menu_repository, backend, open_breaker(open_seconds=60))
+        state = ConversationState(call_sid="CA_breaker", stage=stage)
+
+        response = await agent.process_user_input(state, utterance)
+
+        assert backend.calls == 0
+        assert response["action"] == {"type": "none"}
+        assert "actions" not in response
+        assert response["response"].startswith("Sorry, I didn't catch all of that")
+
+    @pytest.mark.asyncio
+    async def test_degraded_turn_names_missing_size(self, test_menu_repository):
+        agent = self.make_agent(test_menu_repository, StubBackend(), open_breaker(open_seconds=60))
+        state = ConversationState(call_sid="CA_breaker", stage=ConversationStage.ORDERING)
+
+        response = await agent.process_user_input(state, "a burger and fries")
+
+        assert response["response"].endswith("with a size for the fries?")
+
+    @pytest.mark.asyncio
+    async def test_probe_restores_llm(self, test_menu_repository):
+        backend = StubBackend()
+        breaker = open_breaker(open_seconds=0)
+        agent = self.make_agent(test_menu_repository, backend, breaker)
+        state = ConversationState(call_sid="CA_breaker", stage=ConversationStage.ORDERING)
+
+        await agent.process_user_input(state, "what's good here")
+
+        assert backend.calls == 1
+        assert breaker.state == CLOSED
+
+    def test_breaker_on_health(self, test_client):
+        breaker = dependencies.get_llm_circuit_breaker()
+        breaker.state = OPEN
+
+        body = test_client.get("/health").json()
+
+        assert body["status"] == "degraded"
+        assert body["llm_circuit_breaker"]["state"] == OPEN
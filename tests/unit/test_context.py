@@ -0,0 +1,108 @@
+"""Unit tests for the token-budgeted conversation context."""
+import pytest
+
+from app.services.agent.agent import AgentService
+from app.services.agent.context import ContextBuilder, estimate_tokens, summarize_turn
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.prompt import PromptCompiler
+from app.services.agent.response_cache import ResponseCache
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+
+
+def make_state(turns: int) -> ConversationState:
+    state = ConversationState(call_sid="CA_context", stage=ConversationStage.ORDERING)
+    state.add_transcript_turn("Customer", "no onions on everything please")
+    state.add_transcript_turn("Agent", "Sure, no onions on anything.")
+    for index in range(turns):
+        state.add_transcript_turn("Customer", f"add burger number {index}")
+        state.add_transcript_turn("Agent", "Got it, anything else?")
+    return state
+
+
+class TestContextBuilder:
+    """Test budgeting and incremental summarization."""
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("a large coke, please") == 5
+        assert estimate_tokens("supercalifragilistic") == 4
+
+    def test_short_call_fits_verbatim(self):
+        state = make_state(2)
+
+        context = ContextBuilder(token_budget=600).build(state)
+
+        assert context == state.get_transcript_text()
+        assert state.summarized_turn_count == 0
+
+    def test_older_turns_folded_into_summary(self):
+        state = make_state(6)
+
+        context = ContextBuilder(token_budget=120, summary_max_tokens=60).build(state)
+
+        assert estimate_tokens(context) <= 130  # Budget plus the section headers
+        assert "- Customer said: no onions on everything please" in state.context_summary
+        assert "Sure, no onions" not in state.context_summary
+        assert context.endswith("Customer: add burger number 5\nAgent: Got it, anything else?")
+        assert state.summarized_turn_count > 0
+
+    def test_summary_is_incremental(self):
+        builder = ContextBuilder(token_budget=120, summary_max_tokens=60)
+        state = make_state(20)
+        builder.build(state)
+        summarized = state.summarized_turn_count
+
+        state.add_transcript_turn("Customer", "and a soda")
+        builder.build(state)
+
+        # Only the turns that just left the window are folded
+        assert summarized < state.summarized_turn_count <= summarized + 2
+        assert state.context_summary.count("burger number 1\n") <= 1
+
+    def test_summary_is_capped(self):
+        state = make_state(200)
+
+        ContextBuilder(token_budget=120, summary_max_tokens=30).build(state)
+
+        assert estimate_tokens(state.context_summary) <= 30
+        assert "no onions" not in state.context_summary
+
+    def test_long_turns_are_clipped(self):
+        state = ConversationState(call_sid="CA_context")
+        state.add_transcript_turn("Customer", "so um " * 300 + "a burger")
+
+        context = ContextBuilder(token_budget=100, summary_max_tokens=20, min_recent_turns=1).build(state)
+
+        assert estimate_tokens(context) <= 45
+        assert context.endswith("...")
+
+    def test_summarize_turn(self):
+        assert summarize_turn("Agent: Anything else?") == ""
+        assert summarize_turn("Customer: a coke") == "- Customer said: a coke"
+
+
+class TestAgentContext:
+    """Test the context the agent sends."""
+
+    @pytest.mark.asyncio
+    async def test_prompt_size_stays_flat(self, test_menu_repository, mock_openai):
+        agent = AgentService(
+            test_menu_repository,
+            client=mock_openai,
+            fast_path=FastPathMatcher(rules=[]),
+            response_cache=ResponseCache(max_entries=0),
+            prompt_compiler=PromptCompiler(),
+        )
+        agent.context_builder = ContextBuilder(token_budget=120, summary_max_tokens=40)
+        state = ConversationState(call_sid="CA_context", stage=ConversationStage.ORDERING)
+
+        sizes = []
+        for index in range(30):
+            await agent.process_user_input(state, f"tell me about item number {index}")
+            messages = mock_openai.chat.completions.create.await_args.kwargs["messages"]
+            sizes.append(len(messages[1]["content"]))
+
+        assert max(sizes[10:]) - min(sizes[10:]) < 100
+        assert "Earlier in the call:" in messages[1]["content"]
+        assert "tell me about item number 28" in messages[1]["content"]
@@ -0,0 +1,130 @@
+"""Unit tests for per-call debug event buffers."""
+import json
+import pytest
+from unittest.mock import Mock
+
+from app.services.agent.agent import AgentService
+from app.services.agent.debug_events import (
+    MAX_FIELD_CHARS,
+    DebugBufferRegistry,
+    DebugRingBuffer,
+    debug_events,
+    record_debug_event,
+)
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.llm import RuleBasedBackend, StubBackend
+from app.services.agent.prompt import PromptCompiler
+from app.services.agent.response_cache import ResponseCache
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+from app.services.call_session import manager as manager_module
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.models import CallSession
+
+
+class TestDebugRingBuffer:
+    """Test the ring buffer and registry."""
+
+    def test_keeps_last_events(self):
+        buffer = DebugRingBuffer(capacity=3)
+        for n in range(5):
+            buffer.record("turn", n=n)
+
+        assert [event["n"] for event in buffer.events()] == [2, 3, 4]
+
+    def test_long_fields_are_clipped(self):
+        buffer = DebugRingBuffer()
+        buffer.record("llm_prompt", user_prompt="x" * (MAX_FIELD_CHARS + 10))
+
+        assert len(buffer.events()[0]["user_prompt"]) == MAX_FIELD_CHARS + 3
+
+    def test_record_outside_a_turn_is_a_noop(self):
+        buffer = DebugRingBuffer()
+        record_debug_event("ignored")
+        with debug_events(buffer):
+            record_debug_event("kept", value=1)
+        record_debug_event("ignored")
+
+        assert [event["kind"] for event in buffer.events()] == ["kept"]
+
+    def test_flush_to_directory(self, tmp_path):
+        buffer = DebugRingBuffer()
+        buffer.record("agent_input", utterance="a burger")
+
+        events = buffer.flush("CA_dump", "agent_error", str(tmp_path))
+
+        (path,) = tmp_path.iterdir()
+        dump = json.loads(path.read_text())
+        assert path.name.startswith("CA_dump-") and path.name.endswith("-agent_error.json")
+        assert dump["events"] == events
+        assert dump["events"][0]["utterance"] == "a burger"
+
+    def test_registry_drops_least_recent_call(self):
+        registry = DebugBufferRegistry(max_calls=2)
+        first = registry.for_call("CA_1")
+        registry.for_call("CA_2")
+        assert registry.for_call("CA_1") is first
+
+        registry.for_call("CA_3")
+        assert registry.get("CA_2") is None
+        assert registry.get("CA_1") is first
+
+
+class TestDebugFlushing:
+    """Test when the session manager writes buffers out."""
+
+    def make_manager(self, test_db, test_menu_repository, backend):
+        agent = AgentService(
+            test_menu_repository,
+            fast_path=FastPathMatcher(rules=[]),
+            response_cache=ResponseCache(max_entries=0),
+            prompt_compiler=PromptCompiler(),
+            backend=backend,
+        )
+        return CallSessionManager(
+            test_db, agent, test_menu_repository, call_record_writer=Mock(spec=CallRecordWriter)
+        )
+
+    @pytest.mark.asyncio
+    async def test_healthy_turns_are_buffered_not_written(
+        self, test_db, test_menu_repository, clean_call_sessions, monkeypatch
+    ):
+        flush = Mock()
+        monkeypatch.setattr(DebugRingBuffer, "flush", flush)
+        manager = self.make_manager(test_db, test_menu_repository, RuleBasedBackend(test_menu_repository))
+        state = ConversationState(call_sid="CA_debug_ok", stage=ConversationStage.ORDERING)
+        await clean_call_sessions.set(CallSession("CA_debug_ok", state, call_id=1))
+
+        await manager.process_user_speech("CA_debug_ok", "I'd like a burger and um maybe a coke")
+
+        kinds = [event["kind"] for event in manager_module._debug_buffers.get("CA_debug_ok").events()]
+        assert kinds == ["agent_input", "llm_prompt", "llm_output", "agent_output"]
+        flush.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_error_turn_flushes_buffer(
+        self, test_db, test_menu_repository, clean_call_sessions, caplog
+    ):
+        manager = self.make_manager(test_db, test_menu_repository, StubBackend(rate_limit_rate=1.0))
+        state = ConversationState(call_sid="CA_debug_err", stage=ConversationStage.ORDERING)
+        await clean_call_sessions.set(CallSession("CA_debug_err", state, call_id=1))
+
+        await manager.process_user_speech("CA_debug_err", "what's good here")
+
+        dumped = [r.getMessage() for r in caplog.records if r.getMessage().startswith("[DEBUG EVENTS] {")]
+        kinds = [json.loads(line.split(" ", 2)[2])["kind"] for line in dumped]
+        assert kinds == ["agent_input", "llm_prompt", "llm_error"]
+        assert len(manager_module._debug_buffers.get("CA_debug_err")) == 0
+
+    def test_operator_dump(self, authenticated_client, monkeypatch):
+        registry = DebugBufferRegistry()
+        registry.for_call("CA_live").record("agent_input", utterance="hi")
+        monkeypatch.setattr(manager_module, "_debug_buffers", registry)
+
+        response = authenticated_client.post("/api/calls/CA_live/debug")
+        missing = authenticated_client.post("/api/calls/CA_gone/debug")
+
+        assert response.status_code == 200
+        assert response.json()["events"][0]["utterance"] == "hi"
+        assert missing.status_code == 404
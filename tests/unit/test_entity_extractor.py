@@ -0,0 +1,160 @@
+"""Unit tests for the local menu entity extractor."""
+import pytest
+from unittest.mock import Mock
+
+from app.services.agent.agent import AgentService
+from app.services.agent.fast_path import FastPathMatcher, describe_items
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.models import CallSession
+from app.services.menu.base import Menu, MenuItem
+from app.services.ordering.extractor import ExtractedItem, MenuEntityExtractor
+
+REQUIREMENTS = {
+    "items": {
+        "cheeseburger": {"aliases": ["cheese burger"], "optional_modifiers": ["no pickles"]},
+        "coca cola": {"aliases": ["coke", "cola"], "size_required": True},
+    },
+    "rules": {"size_rules": {"items_requiring_size": ["fries"]}},
+}
+
+
+@pytest.fixture
+def extractor():
+    menu = Menu(items=[
+        MenuItem(name="cheeseburger", price=8.0, category="mains", options=["no onions", "extra cheese"]),
+        MenuItem(name="fries", price=3.5, category="sides", options=["large", "small"]),
+        MenuItem(name="coca cola", price=2.0, category="drinks", options=["large", "small"]),
+    ])
+    return MenuEntityExtractor(menu, REQUIREMENTS)
+
+
+class TestMenuEntityExtractor:
+    """Test recognizing items, quantities and modifiers."""
+
+    def test_quantities_plurals_and_aliases(self, extractor):
+        extraction = extractor.extract("Can I get two cheeseburgers and a large coke, please?")
+
+        assert extraction.complete
+        assert extraction.actions() == [
+            {"type": "add_item", "item_name": "cheeseburger", "quantity": 2, "modifiers": []},
+            {"type": "add_item", "item_name": "coca cola", "quantity": 1, "modifiers": ["large"]},
+        ]
+
+    def test_leading_and_trailing_options(self, extractor):
+        extraction = extractor.extract("a cheese burger without onions and no pickles, and small fries")
+
+        assert extraction.complete
+        assert [item.modifiers for item in extraction.items] == [["no onions", "no pickles"], ["small"]]
+
+    def test_option_for_next_item(self, extractor):
+        extraction = extractor.extract("a cheeseburger large fries")
+
+        assert extraction.items[0].modifiers == []
+        assert extraction.items[1].modifiers == ["large"]
+
+    def test_unknown_words_are_unmatched(self, extractor):
+        extraction = extractor.extract("a cheeseburger and a milkshake")
+
+        assert extraction.unmatched == ["milkshake"]
+        assert not extraction.complete
+
+    def test_dangling_option_is_unmatched(self, extractor):
+        extraction = extractor.extract("a cheeseburger and large")
+
+        assert extraction.unmatched == ["large"]
+        assert not extraction.complete
+
+    def test_questions_are_unmatched(self, extractor):
+        for text in ["do you have cheeseburgers?", "would you like a cheeseburger", "a cheeseburger?"]:
+            extraction = extractor.extract(text)
+            assert extraction.unmatched, text
+            assert not extraction.complete
+
+        assert extractor.extract("um could I get a cheeseburger?").complete
+
+    def test_trailing_quantity_is_unmatched(self, extractor):
+        extraction = extractor.extract("a cheeseburger and two")
+
+        assert extraction.unmatched == ["two"]
+        assert not extraction.complete
+
+    def test_missing_required_size(self, extractor):
+        extraction = extractor.extract("a cheeseburger and fries")
+
+        assert extraction.incomplete == ["fries"]
+        assert not extraction.complete
+
+    def test_describe_items(self, extractor):
+        extraction = extractor.extract("two cheeseburgers with extra cheese and a large coke")
+
+        assert describe_items(extraction.items) == (
+            "two cheeseburgers with extra cheese and a large coca cola"
+        )
+
+    def test_describe_items_plural_names(self):
+        assert describe_items([ExtractedItem("fries")]) == "an order of fries"
+        assert describe_items([ExtractedItem("fries", modifiers=["large"])]) == "a large fries"
+
+
+class TestExtractorRepository:
+    """Test building the extractor from the menu repository."""
+
+    @pytest.mark.asyncio
+    async def test_rebuilt_when_menu_changes(self, test_menu_repository):
+        extractor = await test_menu_repository.get_entity_extractor()
+        assert await test_menu_repository.get_entity_extractor() is extractor
+        assert not extractor.extract("a milkshake").complete
+
+        await test_menu_repository.provider.add_item(
+            MenuItem(name="milkshake", price=4.0, category="drinks")
+        )
+
+        rebuilt = await test_menu_repository.get_entity_extractor()
+        assert rebuilt is not extractor
+        assert rebuilt.extract("a milkshake").complete
+
+
+class TestFastPathExtraction:
+    """Test plain orders resolved without the LLM."""
+
+    @pytest.mark.asyncio
+    async def test_matcher_returns_actions(self, test_menu_repository):
+        extractor = await test_menu_repository.get_entity_extractor()
+        state = ConversationState(call_sid="CA_extract", stage=ConversationStage.ORDERING)
+
+        match = FastPathMatcher().match(state, "a burger with no onions and large fries", extractor)
+
+        assert match["intent"] == "ordering"
+        assert [action["item_name"] for action in match["actions"]] == ["burger", "fries"]
+        assert match["response"] == "Got it, a burger with no onions and a large fries. Anything else?"
+
+    @pytest.mark.asyncio
+    async def test_incomplete_order_goes_to_llm(self, test_menu_repository):
+        extractor = await test_menu_repository.get_entity_extractor()
+        state = ConversationState(call_sid="CA_extract", stage=ConversationStage.ORDERING)
+
+        assert FastPathMatcher().match(state, "a burger and fries", extractor) is None
+
+    @pytest.mark.asyncio
+    async def test_turn_adds_every_item(
+        self, test_db, test_menu_repository, mock_openai, clean_call_sessions
+    ):
+        agent = AgentService(test_menu_repository, client=mock_openai, fast_path=FastPathMatcher())
+        manager = CallSessionManager(
+            test_db, agent, test_menu_repository, call_record_writer=Mock(spec=CallRecordWriter)
+        )
+        state = ConversationState(call_sid="CA_extract", stage=ConversationStage.ORDERING)
+        await clean_call_sessions.set(CallSession("CA_extract", state, call_id=1))
+
+        twiml = await manager.process_user_speech("CA_extract", "two burgers and a small fries")
+
+        mock_openai.chat.completions.create.assert_not_awaited()
+        assert "Got it, two burgers and a small fries. Anything else?" in twiml
+        session = await manager.get_session("CA_extract")
+        assert [(item.item_name, item.quantity) for item in session.state.current_order] == [
+            ("burger", 2),
+            ("fries", 1),
+        ]
@@ -0,0 +1,138 @@
+"""Unit tests for the fast-path intent matcher."""
+import pytest
+from unittest.mock import Mock
+
+from app.core.config import settings
+from app.services.agent.agent import AgentService
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState, OrderItem
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.models import CallSession
+
+
+def make_state(stage: ConversationStage, items: int = 1, read_back: bool = False) -> ConversationState:
+    return ConversationState(
+        call_sid="CA_fast",
+        stage=stage,
+        current_order=[OrderItem(item_name="burger") for _ in range(items)],
+        order_read_back=read_back,
+        menu_context="menu",
+    )
+
+
+class TestFastPathMatcher:
+    """Test which utterances are resolved locally."""
+
+    @pytest.mark.parametrize("utterance", [
+        "That's all.",
+        "that’s it",
+        "No thanks, that's all.",
+        "um, nope, that'll be all, thank you",
+        "thats everything",
+    ])
+    def test_done_ordering(self, utterance):
+        match = FastPathMatcher().match(make_state(ConversationStage.ORDERING), utterance)
+        assert match == {
+            "response": "Great, let me read your order back.",
+            "intent": "reviewing",
+            "action": {"type": "none"},
+        }
+
+    @pytest.mark.parametrize("utterance", [
+        "that's all and a coke",
+        "no",
+        "I'm done with the burger, add fries",
+        "",
+    ])
+    def test_ambiguous_goes_to_llm(self, utterance):
+        assert FastPathMatcher().match(make_state(ConversationStage.ORDERING), utterance) is None
+
+    @pytest.mark.parametrize("utterance", ["Yes.", "yeah that's correct", "Yep, sounds good, thanks!"])
+    def test_confirm_after_read_back(self, utterance):
+        state = make_state(ConversationStage.REVIEW, read_back=True)
+        assert FastPathMatcher().match(state, utterance)["intent"] == "concluding"
+
+    def test_confirm_needs_read_back_and_plain_yes(self):
+        matcher = FastPathMatcher()
+        assert matcher.match(make_state(ConversationStage.REVIEW), "yes") is None
+        state = make_state(ConversationStage.REVIEW, read_back=True)
+        assert matcher.match(state, "yes but no onions on the burger") is None
+
+    def test_rules_are_stage_specific(self):
+        matcher = FastPathMatcher()
+        assert matcher.match(make_state(ConversationStage.GREETING), "that's all") is None
+        assert matcher.match(make_state(ConversationStage.REVISION), "that's all")["intent"] == "reviewing"
+        assert matcher.match(make_state(ConversationStage.ORDERING), "yes") is None
+
+    def test_waits_on_pending_modifier_question(self):
+        state = make_state(ConversationStage.ORDERING)
+        state.pending_modifiers_item_name = "burger"
+        assert FastPathMatcher().match(state, "that's all") is None
+
+    def test_stats(self):
+        matcher = FastPathMatcher()
+        matcher.match(make_state(ConversationStage.ORDERING), "that's all")
+        matcher.match(make_state(ConversationStage.ORDERING), "a burger please")
+
+        stats = matcher.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["by_rule"]["done_ordering"] == 1
+
+
+class TestAgentFastPath:
+    """Test fast-path turns through the agent and session manager."""
+
+    @pytest.mark.asyncio
+    async def test_skips_llm_and_transitions(self, test_menu_repository, mock_openai):
+        agent = AgentService(test_menu_repository, client=mock_openai, fast_path=FastPathMatcher())
+        state = make_state(ConversationStage.ORDERING)
+
+        response = await agent.process_user_input(state, "that's all, thanks")
+
+        mock_openai.chat.completions.create.assert_not_awaited()
+        assert state.stage == ConversationStage.REVIEW
+        assert response["intent"] == "reviewing"
+        assert state.transcript[0] == "Customer: that's all, thanks"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_llm(self, test_menu_repository, mock_openai):
+        agent = AgentService(test_menu_repository, client=mock_openai, fast_path=FastPathMatcher())
+
+        await agent.process_user_input(
+            make_state(ConversationStage.ORDERING), "that's all and a coke"
+        )
+
+        mock_openai.chat.completions.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_setting(self, test_menu_repository, mock_openai, monkeypatch):
+        monkeypatch.setattr(settings, "fast_path_enabled", False)
+        agent = AgentService(test_menu_repository, client=mock_openai, fast_path=FastPathMatcher())
+
+        await agent.process_user_input(make_state(ConversationStage.ORDERING), "that's all")
+
+        mock_openai.chat.completions.create.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_done_ordering_reads_back_order(
+        self, test_db, test_menu_repository, mock_openai, clean_call_sessions
+    ):
+        agent = AgentService(test_menu_repository, client=mock_openai, fast_path=FastPathMatcher())
+        manager = CallSessionManager(
+            test_db, agent, test_menu_repository, call_record_writer=Mock(spec=CallRecordWriter)
+        )
+        session = CallSession("CA_fast", make_state(ConversationStage.ORDERING), call_id=1)
+        await clean_call_sessions.set(session)
+
+        twiml = await manager.process_user_speech("CA_fast", "That's all.")
+
+        mock_openai.chat.completions.create.assert_not_awaited()
+        assert "Here&apos;s your order: burger." in twiml
+        assert "Your total is $10.93" in twiml
+        stored = await manager.get_session("CA_fast")
+        assert stored.state.stage == ConversationStage.REVIEW
+        assert stored.state.consecutive_errors == 0
@@ -0,0 +1,165 @@
+"""Unit tests for turn deadlines and hedged LLM requests."""
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock
+
+from app.core.config import settings
+from app.services.agent.agent import AgentService
+from app.services.agent.deadline import Deadline, current_deadline, turn_deadline
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.hedging import HedgedCaller
+from app.services.agent.llm import LLMRateLimitError, LLMTimeoutError, StubBackend
+from app.services.agent.prompt import PromptCompiler
+from app.services.agent.response_cache import ResponseCache
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.models import CallSession
+
+
+def scripted_request(*delays):
+    """Request factory whose nth attempt answers after delays[n] seconds."""
+    calls = []
+
+    async def request():
+        attempt = len(calls)
+        calls.append(attempt)
+        await asyncio.sleep(delays[attempt])
+        return f"attempt {attempt}"
+
+    return request, calls
+
+
+class TestDeadline:
+    """Test deadline scoping."""
+
+    def test_turn_deadline_is_scoped(self):
+        assert current_deadline() is None
+        deadline = Deadline.start(5)
+        with turn_deadline(deadline):
+            assert current_deadline() is deadline
+            assert 4 < deadline.remaining() <= 5
+        assert current_deadline() is None
+        assert Deadline.start(0) is None
+
+
+class TestHedgedCaller:
+    """Test hedging and deadline enforcement."""
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        hedger = HedgedCaller(default_delay_seconds=0.5)
+        request, calls = scripted_request(0)
+
+        assert await hedger.call(request) == "attempt 0"
+        assert calls == [0]
+        assert hedger.stats()["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        hedger = HedgedCaller(default_delay_seconds=0.02)
+        request, calls = scripted_request(5, 0)
+
+        started = time.monotonic()
+        assert await hedger.call(request, Deadline(2)) == "attempt 1"
+
+        assert time.monotonic() - started < 1
+        stats = hedger.stats()
+        assert (stats["hedged"], stats["hedge_wins"], stats["hedge_win_rate"]) == (1, 1, 1.0)
+
+    @pytest.mark.asyncio
+    async def test_first_answer_still_wins_after_hedge(self):
+        hedger = HedgedCaller(default_delay_seconds=0.01)
+        request, calls = scripted_request(0.05, 5)
+
+        assert await hedger.call(request) == "attempt 0"
+        assert calls == [0, 1]
+        assert hedger.stats()["hedge_wins"] == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_exceeded(self):
+        hedger = HedgedCaller(default_delay_seconds=0.01)
+        request, calls = scripted_request(5, 5)
+
+        with pytest.raises(LLMTimeoutError):
+            await hedger.call(request, Deadline(0.05))
+        assert hedger.stats()["deadline_exceeded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_hedged(self):
+        hedger = HedgedCaller(default_delay_seconds=0.01)
+        attempts = []
+
+        async def request():
+            attempts.append(1)
+            raise LLMRateLimitError("429")
+
+        with pytest.raises(LLMRateLimitError):
+            await hedger.call(request)
+        assert len(attempts) == 1
+
+    @pytest.mark.asyncio
+    async def test_hedge_delay_follows_percentile(self):
+        hedger = HedgedCaller(percentile=0.9, min_samples=10, default_delay_seconds=3)
+        assert hedger.hedge_delay() == 3
+        for latency in range(1, 11):
+            hedger.latencies.record(latency / 100)
+        assert hedger.hedge_delay() == 0.1
+
+
+class SlowBackend(StubBackend):
+    def __init__(self):
+        super().__init__(latency_ms=5000)
+
+
+class TestTurnBudget:
+    """Test the fallback when a turn runs out of budget."""
+
+    def make_agent(self, test_menu_repository):
+        return AgentService(
+            test_menu_repository,
+            fast_path=FastPathMatcher(rules=[]),
+            response_cache=ResponseCache(),
+            prompt_compiler=PromptCompiler(),
+            backend=SlowBackend(),
+            hedger=HedgedCaller(default_delay_seconds=0.01),
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("stage,expected", [
+        (ConversationStage.ORDERING, "What would you like to order?"),
+        (ConversationStage.REVIEW, "Does your order sound right?"),
+    ])
+    async def test_stage_fallback(self, test_menu_repository, stage, expected):
+        agent = self.make_agent(test_menu_repository)
+        state = ConversationState(call_sid="CA_budget", stage=stage)
+
+        with turn_deadline(Deadline(0.05)):
+            response = await agent.process_user_input(state, "hmm let me think about it")
+
+        assert expected in response["response"]
+        assert response["error"] is True
+        assert state.stage == stage
+        assert agent.hedger.stats()["hedged"] == 1
+
+    @pytest.mark.asyncio
+    async def test_webhook_answers_within_budget(
+        self, test_db, test_menu_repository, clean_call_sessions, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "turn_budget_seconds", 0.1)
+        manager = CallSessionManager(
+            test_db,
+            self.make_agent(test_menu_repository),
+            test_menu_repository,
+            call_record_writer=Mock(spec=CallRecordWriter),
+        )
+        state = ConversationState(call_sid="CA_budget", stage=ConversationStage.ORDERING)
+        await clean_call_sessions.set(CallSession("CA_budget", state, call_id=1))
+
+        started = time.monotonic()
+        twiml = await manager.process_user_speech("CA_budget", "hmm let me think about it")
+
+        assert time.monotonic() - started < 1
+        assert "What would you like to order?" in twiml
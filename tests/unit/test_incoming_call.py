@@ -0,0 +1,127 @@
+"""Unit tests for the incoming call fast path and write-behind call records."""
+import pytest
+from collections import OrderedDict
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.services.agent.agent import AgentService
+from app.services.agent.state import OrderItem
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.call_session.manager import CallSessionManager
+from app.services.persistence.calls import CallPersistenceService
+from app.services.speech import tts as tts_module
+
+
+@pytest.fixture
+def call_record_writer(test_db_engine):
+    """Writer bound to the test database."""
+    return CallRecordWriter(
+        async_sessionmaker(test_db_engine, class_=AsyncSession, expire_on_commit=False)
+    )
+
+
+@pytest.fixture
+def manager(test_db, test_menu_repository, call_record_writer, clean_call_sessions):
+    """Session manager with a real agent (no LLM calls are made here)."""
+    agent = AgentService(test_menu_repository, client=Mock())
+    return CallSessionManager(
+        test_db, agent, test_menu_repository, call_record_writer=call_record_writer
+    )
+
+
+class TestIncomingCallFastPath:
+    """Test answering a call without database or menu round trips."""
+
+    @pytest.mark.asyncio
+    async def test_start_call_renders_greeting_without_db(self, manager, test_menu_repository):
+        manager.db = AsyncMock()  # Any use of the request session would be recorded
+        test_menu_repository.get_menu_text = AsyncMock()
+
+        twiml = await manager.start_call("CA_fast", base_url="https://example.com")
+
+        greeting = manager.agent_service.get_greeting_text()
+        expected = manager.tts_service.generate_twiml_with_gather(
+            greeting, "https://example.com/webhooks/voice/gather?CallSid=CA_fast"
+        )
+        assert twiml == expected.encode()
+        assert manager.db.method_calls == []
+        test_menu_repository.get_menu_text.assert_not_awaited()
+
+        session = await manager.get_session("CA_fast")
+        assert session.call_id is None
+        assert session.state.transcript == [f"Agent: {greeting}"]
+
+    @pytest.mark.asyncio
+    async def test_start_call_stores_session_once(self, manager):
+        manager.session_store.set = AsyncMock(wraps=manager.session_store.set)
+
+        await manager.start_call("CA_once")
+
+        assert manager.session_store.set.await_count == 1
+
+    def test_gather_templates_are_bounded(self, manager, monkeypatch):
+        monkeypatch.setattr(tts_module, "_gather_templates", OrderedDict())
+        monkeypatch.setattr(tts_module, "_GATHER_TEMPLATES_MAX", 2)
+        tts = manager.tts_service
+
+        first = tts.compile_twiml_with_gather("Hi!")
+        tts.compile_twiml_with_gather("Hello!")
+        assert tts.compile_twiml_with_gather("Hi!") is first
+        tts.compile_twiml_with_gather("Welcome!")
+
+        assert [key[0] for key in tts_module._gather_templates] == ["Hi!", "Welcome!"]
+
+    @pytest.mark.asyncio
+    async def test_call_record_created_in_background(self, manager, call_record_writer, test_db):
+        await manager.start_call("CA_bg")
+
+        call_id = await call_record_writer.wait("CA_bg")
+
+        call = await CallPersistenceService(test_db).get_call_by_sid("CA_bg")
+        assert call is not None
+        assert call.id == call_id
+
+    @pytest.mark.asyncio
+    async def test_finished_insert_id_is_kept(self, manager, call_record_writer, test_db):
+        manager.call_persistence.create_call = AsyncMock()
+        session = await manager.create_session("CA_done")
+        await call_record_writer.drain()
+        assert call_record_writer.pending_count == 0
+
+        call_id = await manager._resolve_call_id(session)
+
+        call = await CallPersistenceService(test_db).get_call_by_sid("CA_done")
+        assert call_id == call.id
+        manager.call_persistence.create_call.assert_not_awaited()
+
+    def test_finished_insert_ids_are_bounded(self):
+        writer = CallRecordWriter(Mock(), max_created=2)
+        for number, call_sid in enumerate(["CA1", "CA2", "CA3"]):
+            task = Mock(cancelled=Mock(return_value=False), result=Mock(return_value=number))
+            writer._finished(call_sid, task)
+
+        assert list(writer._created) == ["CA2", "CA3"]
+
+    @pytest.mark.asyncio
+    async def test_call_id_resolved_before_order_persistence(self, manager, test_db):
+        await manager.start_call("CA_order")
+        session = await manager.get_session("CA_order")
+        session.state.add_order_item(OrderItem(item_name="burger"))
+
+        assert await manager._persist_order(session) is True
+
+        call = await CallPersistenceService(test_db).get_call_by_sid("CA_order")
+        assert session.call_id == call.id
+
+    @pytest.mark.asyncio
+    async def test_call_id_resolved_when_insert_ran_elsewhere(self, manager, test_db):
+        # Session created on another worker: nothing in flight locally
+        session = await manager.create_session("CA_elsewhere")
+        await manager.call_record_writer.drain()
+        session.call_id = None
+        manager.call_record_writer = CallRecordWriter(manager.call_record_writer.db_session_factory)
+
+        call_id = await manager._resolve_call_id(session)
+
+        call = await CallPersistenceService(test_db).get_call_by_sid("CA_elsewhere")
+        assert call_id == call.id
@@ -0,0 +1,147 @@
+"""Unit tests for incremental JSON parsing and streamed agent completions."""
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.core.config import settings
+from app.services.agent.agent import AgentService
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.json_stream import JsonObjectStream
+from app.services.agent.prompt import PromptCompiler
+from app.services.agent.response_cache import ResponseCache
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+
+COMPLETION = json.dumps({
+    "response": "One burger with \"extra\" cheese {and} no onions. Anything else?",
+    "intent": "ordering",
+    "action": {
+        "type": "add_item",
+        "item_name": "burger",
+        "quantity": 1,
+        "modifiers": "extra cheese, no onions",
+    },
+}, indent=2)
+
+
+def chunked(text: str, size: int):
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+class TestJsonObjectStream:
+    """Test field extraction across chunk boundaries."""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 16, len(COMPLETION)])
+    def test_fields_complete_in_order(self, size):
+        parser = JsonObjectStream()
+        completed = []
+        for chunk in chunked(COMPLETION, size):
+            completed.extend(parser.feed(chunk))
+
+        assert completed == [
+            ("response", "One burger with \"extra\" cheese {and} no onions. Anything else?"),
+            ("intent", "ordering"),
+        ]
+        assert parser.result() == json.loads(COMPLETION)
+
+    def test_response_ready_before_action(self):
+        parser = JsonObjectStream()
+        cut = COMPLETION.index('"intent"')
+
+        assert parser.feed(COMPLETION[:cut])[0][0] == "response"
+        assert parser.feed(COMPLETION[cut:]) == [("intent", "ordering")]
+
+    def test_nested_strings_and_escapes(self):
+        parser = JsonObjectStream()
+        text = '{"action": {"note": "a } and \\" quote"}, "items": [1, "x]"], "response": "caf\\u00e9\\nok"}'
+
+        completed = [field for chunk in chunked(text, 4) for field in parser.feed(chunk)]
+
+        assert completed == [("response", "café\nok")]
+
+    def test_incomplete_object(self):
+        parser = JsonObjectStream()
+        parser.feed('{"response": "Hi')
+
+        assert parser.fields == {}
+        with pytest.raises(json.JSONDecodeError):
+            parser.result()
+
+
+class FakeStream:
+    """Async iterator over completion chunks, like the SDK's stream."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for text in self.chunks:
+            yield Mock(choices=[Mock(delta=Mock(content=text))])
+
+
+@pytest.fixture
+def streaming_agent(test_menu_repository):
+    client = Mock()
+    client.chat.completions.create = AsyncMock(return_value=FakeStream(chunked(COMPLETION, 5)))
+    return AgentService(
+        test_menu_repository,
+        client=client,
+        fast_path=FastPathMatcher(rules=[]),
+        response_cache=ResponseCache(),
+        prompt_compiler=PromptCompiler(),
+    )
+
+
+class TestStreamingAgent:
+    """Test the agent's streaming mode."""
+
+    @pytest.mark.asyncio
+    async def test_response_handed_over_early(self, streaming_agent):
+        state = ConversationState(call_sid="CA_json", stage=ConversationStage.ORDERING)
+        early = []
+
+        async def on_response(text):
+            # Intent and action haven't been applied yet
+            assert state.transcript == ["Customer: what's good today"]
+            early.append(text)
+
+        response = await streaming_agent.process_user_input(state, "what's good today", on_response=on_response)
+
+        assert early == [response["response"]]
+        assert response["action"]["item_name"] == "burger"
+        create = streaming_agent.client.chat.completions.create
+        assert create.await_args.kwargs["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_not_streamed_without_callback(self, test_menu_repository, mock_openai):
+        agent = AgentService(test_menu_repository, client=mock_openai, fast_path=FastPathMatcher(rules=[]))
+        state = ConversationState(call_sid="CA_json", stage=ConversationStage.ORDERING)
+
+        await agent.process_user_input(state, "what's good today")
+
+        assert "stream" not in mock_openai.chat.completions.create.await_args.kwargs
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_setting(self, test_menu_repository, mock_openai, monkeypatch):
+        monkeypatch.setattr(settings, "llm_streaming_enabled", False)
+        agent = AgentService(test_menu_repository, client=mock_openai, fast_path=FastPathMatcher(rules=[]))
+        on_response = AsyncMock()
+
+        response = await agent.process_user_input(
+            ConversationState(call_sid="CA_json"), "what's good today", on_response=on_response
+        )
+
+        on_response.assert_not_awaited()
+        assert response["response"] == "Test response"
+
+    @pytest.mark.asyncio
+    async def test_malformed_stream_is_an_error(self, streaming_agent):
+        streaming_agent.client.chat.completions.create.return_value = FakeStream(['{"response": "Hi", "in'])
+        state = ConversationState(call_sid="CA_json", stage=ConversationStage.ORDERING)
+
+        response = await streaming_agent.process_user_input(state, "hello there", on_response=AsyncMock())
+
+        assert response["error"] is True
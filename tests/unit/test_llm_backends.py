@@ -0,0 +1,213 @@
+"""Unit tests for LLM backends."""
+import json
+import httpx
+import openai
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.services.agent.agent import AgentService
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.llm import (
+    LLMRateLimitError,
+    LLMTimeoutError,
+    OpenAIBackend,
+    RuleBasedBackend,
+    StubBackend,
+    create_llm_backend,
+)
+from app.services.agent.prompt import PromptCompiler, get_user_prompt
+from app.services.agent.response_cache import ResponseCache
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+
+
+def messages(user_input: str, stage: ConversationStage = ConversationStage.ORDERING, transcript: str = ""):
+    return [
+        {"role": "system", "content": "system"},
+        {"role": "user", "content": get_user_prompt(transcript, user_input, conversation_stage=stage)},
+    ]
+
+
+class TestRuleBasedBackend:
+    """Test deterministic answers from the menu."""
+
+    @pytest.mark.asyncio
+    async def test_adds_menu_item(self, test_menu_repository):
+        completion = await RuleBasedBackend(test_menu_repository).complete(
+            messages("can I get two burgers with extra cheese")
+        )
+
+        answer = json.loads(completion.content)
+        assert answer["intent"] == "ordering"
+        assert answer["action"] == {
+            "type": "add_item", "item_name": "burger", "quantity": 2, "modifiers": "extra cheese",
+        }
+
+    @pytest.mark.asyncio
+    async def test_done_and_confirm(self, test_menu_repository):
+        backend = RuleBasedBackend(test_menu_repository)
+
+        done = json.loads((await backend.complete(messages("that's all"))).content)
+        confirm = json.loads(
+            (await backend.complete(messages("yes", ConversationStage.REVIEW))).content
+        )
+
+        assert done["intent"] == "reviewing"
+        assert confirm["intent"] == "concluding"
+
+    @pytest.mark.asyncio
+    async def test_unknown_request(self, test_menu_repository):
+        completion = await RuleBasedBackend(test_menu_repository).complete(messages("a milkshake"))
+
+        assert json.loads(completion.content)["action"] == {"type": "none"}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("stage", [ConversationStage.REVIEW, ConversationStage.REVISION])
+    async def test_removal_after_read_back(self, test_menu_repository, stage):
+        completion = await RuleBasedBackend(test_menu_repository).complete(
+            messages("actually can you remove the burger", stage)
+        )
+
+        answer = json.loads(completion.content)
+        assert answer["intent"] == "revising"
+        assert answer["actions"] == [{"type": "remove_item", "item_name": "burger"}]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "utterance", ["I don't want a burger", "no burger", "remove the burger", "do you have burgers?"]
+    )
+    async def test_refusals_and_questions_add_nothing(self, test_menu_repository, utterance):
+        completion = await RuleBasedBackend(test_menu_repository).complete(messages(utterance))
+
+        answer = json.loads(completion.content)
+        assert answer["action"] == {"type": "none"}
+        assert "actions" not in answer
+
+    @pytest.mark.asyncio
+    async def test_missing_size_is_asked_not_added(self, test_menu_repository):
+        backend = RuleBasedBackend(test_menu_repository)
+
+        answer = json.loads((await backend.complete(messages("a burger and two fries"))).content)
+        assert [action["item_name"] for action in answer["actions"]] == ["burger"]
+        assert answer["response"] == "Got it, a burger. What size would you like for the two fries?"
+
+        transcript = f"Customer: a burger and two fries\nAgent: {answer['response']}"
+        sized = json.loads((await backend.complete(messages("large please", transcript=transcript))).content)
+        assert sized["actions"] == [
+            {"type": "add_item", "item_name": "fries", "quantity": 2, "modifiers": "large"}
+        ]
+
+
+class TestStubBackend:
+    """Test latency and failure injection."""
+
+    @pytest.mark.asyncio
+    async def test_failure_rates(self):
+        backend = StubBackend(rate_limit_rate=0.3, malformed_rate=0.3, seed=7)
+        outcomes = {"rate_limited": 0, "malformed": 0, "ok": 0}
+
+        for _ in range(300):
+            try:
+                content = (await backend.complete(messages("hi"))).content
+            except LLMRateLimitError:
+                outcomes["rate_limited"] += 1
+                continue
+            try:
+                json.loads(content)
+                outcomes["ok"] += 1
+            except json.JSONDecodeError:
+                outcomes["malformed"] += 1
+
+        assert all(60 < count < 120 for count in outcomes.values())
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        backend = StubBackend(timeout_rate=1.0, timeout_ms=1)
+
+        with pytest.raises(LLMTimeoutError):
+            await backend.complete(messages("hi"))
+
+    def test_latency_distributions(self):
+        assert StubBackend(latency_ms=50).sample_latency_ms() == 50
+        uniform = StubBackend(latency_ms=100, latency_jitter_ms=20, latency_distribution="uniform", seed=1)
+        assert all(80 <= uniform.sample_latency_ms() <= 120 for _ in range(100))
+        lognormal = StubBackend(latency_ms=100, latency_jitter_ms=100, latency_distribution="lognormal", seed=1)
+        samples = sorted(lognormal.sample_latency_ms() for _ in range(1001))
+        assert 80 < samples[500] < 125  # Median near latency_ms
+        assert samples[990] > 300  # Long tail
+
+    def test_seed_is_repeatable(self):
+        first = StubBackend(latency_ms=100, latency_jitter_ms=50, latency_distribution="uniform", seed=3)
+        second = StubBackend(latency_ms=100, latency_jitter_ms=50, latency_distribution="uniform", seed=3)
+        assert [first.sample_latency_ms() for _ in range(5)] == [second.sample_latency_ms() for _ in range(5)]
+
+    def test_unknown_distribution(self):
+        with pytest.raises(ValueError):
+            StubBackend(latency_distribution="normalish")
+
+
+class TestOpenAIBackend:
+    """Test error translation for the OpenAI backend."""
+
+    @pytest.mark.asyncio
+    async def test_translates_errors(self):
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        client = Mock()
+        backend = OpenAIBackend(client)
+
+        client.chat.completions.create = AsyncMock(side_effect=openai.APITimeoutError(request=request))
+        with pytest.raises(LLMTimeoutError):
+            await backend.complete(messages("hi"))
+
+        response = httpx.Response(429, request=request)
+        client.chat.completions.create = AsyncMock(
+            side_effect=openai.RateLimitError("slow down", response=response, body=None)
+        )
+        with pytest.raises(LLMRateLimitError):
+            await backend.complete(messages("hi"))
+
+    def test_factory(self, test_menu_repository):
+        assert isinstance(create_llm_backend("rules", menu_repository=test_menu_repository), RuleBasedBackend)
+        assert isinstance(create_llm_backend("stub", latency_ms=5), StubBackend)
+        with pytest.raises(ValueError):
+            create_llm_backend("openai")
+        with pytest.raises(ValueError):
+            create_llm_backend("bard")
+
+
+class TestAgentBackends:
+    """Test the agent against offline backends."""
+
+    def make_agent(self, test_menu_repository, backend):
+        return AgentService(
+            test_menu_repository,
+            fast_path=FastPathMatcher(rules=[]),
+            response_cache=ResponseCache(max_entries=0),
+            prompt_compiler=PromptCompiler(),
+            backend=backend,
+        )
+
+    @pytest.mark.asyncio
+    async def test_offline_turn(self, test_menu_repository):
+        agent = self.make_agent(test_menu_repository, RuleBasedBackend(test_menu_repository))
+        state = ConversationState(call_sid="CA_llm", stage=ConversationStage.ORDERING)
+
+        response = await agent.process_user_input(state, "I'd like a burger and um maybe a coke")
+
+        assert response["action"]["item_name"] == "burger"
+        assert "error" not in response
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", [
+        StubBackend(rate_limit_rate=1.0),
+        StubBackend(timeout_rate=1.0, timeout_ms=1),
+        StubBackend(malformed_rate=1.0),
+    ])
+    async def test_failures_become_error_responses(self, test_menu_repository, backend):
+        agent = self.make_agent(test_menu_repository, backend)
+        state = ConversationState(call_sid="CA_llm", stage=ConversationStage.ORDERING)
+
+        response = await agent.process_user_input(state, "what's good here")
+
+        assert response["error"] is True
+        assert state.stage == ConversationStage.ORDERING
@@ -0,0 +1,87 @@
+"""Unit tests for the webhook load test harness."""
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.database import get_db
+from app.main import app
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.menu.in_memory_menu import InMemoryMenuProvider
+from app.services.menu.repository import MenuRepository
+from app.tools.loadtest import DEFAULT_SCRIPTS, LoadTestResults, percentile, run_load_test
+
+
+class TestLoadTestResults:
+    """Test the summary arithmetic."""
+
+    def test_percentile(self):
+        samples = [float(n) for n in range(1, 101)]
+        assert percentile(samples, 0.5) == 51.0
+        assert percentile(samples, 0.99) == 100.0
+        assert percentile([], 0.5) is None
+
+    def test_summary(self):
+        results = LoadTestResults()
+        results.record("gather", 0.1)
+        results.record("gather", 0.3, error="HTTP 500")
+
+        summary = results.summary(elapsed_seconds=2.0)
+
+        assert summary["turns"] == 2
+        assert summary["turns_per_second"] == 1.0
+        assert summary["turn_latency"]["error_rate"] == 0.5
+        assert summary["turn_latency"]["max_ms"] == 300.0
+        assert summary["error_samples"] == ["gather: HTTP 500"]
+
+
+class TestDefaultScripts:
+    """Test the bundled caller scripts."""
+
+    @pytest.mark.asyncio
+    async def test_sized_items_are_ordered_with_a_size(self):
+        # Without a size the agent asks for one, and the script never answers
+        extractor = await MenuRepository(provider=InMemoryMenuProvider()).get_entity_extractor()
+
+        for script in DEFAULT_SCRIPTS:
+            for utterance in script:
+                assert extractor.extract(utterance).incomplete == [], utterance
+
+
+class TestRunLoadTest:
+    """Test driving the webhooks through the app."""
+
+    @pytest.mark.asyncio
+    async def test_scripted_callers_complete(
+        self, test_client, test_db_engine, clean_call_sessions, monkeypatch
+    ):
+        # A session per request, as in production, so concurrent calls don't share one
+        sessions = async_sessionmaker(test_db_engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def get_test_db():
+            async with sessions() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = get_test_db
+        writer = CallRecordWriter(sessions)
+        monkeypatch.setattr(
+            "app.services.call_session.manager.get_call_record_writer", lambda: writer
+        )
+        monkeypatch.setattr(settings, "llm_backend", "stub")
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            summary = await run_load_test(
+                client,
+                callers=6,
+                concurrency=3,
+                scripts=[["I'd like a burger and fries", "that's all", "yes"]],
+            )
+
+        assert summary["calls_completed"] == 6
+        assert summary["endpoints"]["incoming"]["requests"] == 6
+        assert summary["endpoints"]["status"]["requests"] == 6
+        assert summary["turns"] >= 6
+        assert all(endpoint["errors"] == 0 for endpoint in summary["endpoints"].values())
+        assert summary["turn_latency"]["p50_ms"] is not None
+        assert await clean_call_sessions.list_call_sids() == []
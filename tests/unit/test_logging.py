@@ -0,0 +1,128 @@
+"""Unit tests for the logging pipeline."""
+import json
+import logging
+import queue
+
+from app.core import logging as app_logging
+from app.core.logging import (
+    CallContextFilter,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    TextFormatter,
+    call_context,
+    current_call_sid,
+    parse_sample_rates,
+)
+
+
+def make_record(name="app.test", level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class TestCallContext:
+    """Test CallSid correlation."""
+
+    def test_call_context_is_scoped(self):
+        assert current_call_sid() is None
+        with call_context("CA123"):
+            assert current_call_sid() == "CA123"
+        assert current_call_sid() is None
+
+    def test_filter_tags_records(self):
+        record = make_record()
+        with call_context("CA123"):
+            CallContextFilter().filter(record)
+        assert record.call_sid == "CA123"
+
+
+class TestFormatters:
+    """Test record formatting."""
+
+    def test_json_formatter(self):
+        record = make_record()
+        record.call_sid = "CA123"
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["message"] == "hello world"
+        assert entry["call_sid"] == "CA123"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "app.test"
+        assert entry["ts"].endswith("Z")
+
+    def test_text_formatter_appends_call_sid(self):
+        record = make_record()
+        record.call_sid = "CA123"
+        assert TextFormatter().format(record).endswith("hello world [CA123]")
+
+        record.call_sid = None
+        assert TextFormatter().format(record).endswith("hello world")
+
+
+class TestSampling:
+    """Test per-logger sampling."""
+
+    def test_parse_sample_rates(self):
+        assert parse_sample_rates("app.a=0.1, app.b = 2,bad,app.c=x") == {"app.a": 0.1, "app.b": 1.0}
+        assert parse_sample_rates("") == {}
+
+    def test_most_specific_rate_wins(self):
+        sampler = SamplingFilter({"app": 0.5, "app.services.agent": 0.0})
+
+        assert sampler.rate_for("app.services.agent.agent") == 0.0
+        assert sampler.rate_for("app.api.health") == 0.5
+        assert sampler.rate_for("uvicorn") == 1.0
+
+    def test_samples_below_warning_only(self):
+        sampler = SamplingFilter({"app": 0.0})
+
+        assert not sampler.filter(make_record(level=logging.INFO))
+        assert sampler.filter(make_record(level=logging.WARNING))
+        assert sampler.filter(make_record(name="other"))
+
+    def test_sampling_rate_is_roughly_kept(self):
+        sampler = SamplingFilter({"app": 0.25}, seed=7)
+        kept = sum(sampler.filter(make_record()) for _ in range(2000))
+        assert 400 < kept < 600
+
+
+class TestQueueHandler:
+    """Test handing records to the writer thread."""
+
+    def test_message_rendered_before_queueing(self):
+        handler = NonBlockingQueueHandler(queue.Queue())
+        items = ["a"]
+        handler.handle(make_record(msg="items %s", args=(items,)))
+        items.append("b")  # Mutated after logging
+
+        record = handler.queue.get_nowait()
+        assert record.getMessage() == "items ['a']"
+        assert record.args is None
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(make_record())
+        handler.handle(make_record())
+
+        assert handler.dropped == 1
+        assert handler.queue.qsize() == 1
+
+    def test_setup_writes_from_background_thread(self, monkeypatch, capsys):
+        monkeypatch.setattr(app_logging.settings, "log_format", "json")
+        monkeypatch.setattr(app_logging.settings, "log_async", True)
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        try:
+            app_logging.setup_logging()
+            assert isinstance(root.handlers[0], NonBlockingQueueHandler)
+            with call_context("CA_log"):
+                logging.getLogger("app.test").info("turn %d", 3)
+            app_logging.shutdown_logging()  # Flushes the queue
+        finally:
+            app_logging.shutdown_logging()
+            root.handlers[:] = saved_handlers
+            root.setLevel(saved_level)
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+        assert {"message": "turn 3", "call_sid": "CA_log"}.items() <= lines[-1].items()
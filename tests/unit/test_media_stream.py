@@ -0,0 +1,275 @@
+"""Unit tests for the Twilio Media Streams pipeline."""
+import asyncio
+import base64
+import pytest
+from unittest.mock import AsyncMock, Mock
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api.webhooks.voice import get_session_manager, get_streaming_stt, get_streaming_tts
+from app.services.agent.agent import AgentService
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.media_stream import MediaStreamHandler
+from app.services.call_session.models import TurnResult
+from app.services.speech.audio import (
+    FRAME_BYTES,
+    pcm16_to_ulaw,
+    split_frames,
+    ulaw_silence,
+    ulaw_to_pcm16,
+    ulaw_tone,
+)
+from app.services.speech.streaming import (
+    SPEECH_ENDED,
+    SPEECH_STARTED,
+    EnergyEndpointer,
+    ScriptedStreamingSTT,
+    ToneStreamingTTS,
+    split_sentences,
+)
+
+
+def utterance(speech_ms: int = 400, silence_ms: int = 800) -> bytes:
+    """Caller audio: a burst of speech-level signal followed by silence."""
+    return ulaw_tone(speech_ms, frequency=300.0) + ulaw_silence(silence_ms)
+
+
+def media_messages(audio: bytes, stream_sid: str = "MZ1"):
+    """Twilio inbound media messages for audio, one per 20 ms frame."""
+    return [
+        {
+            "event": "media",
+            "streamSid": stream_sid,
+            "media": {"track": "inbound", "payload": base64.b64encode(frame).decode()},
+        }
+        for frame in split_frames(audio)
+    ]
+
+
+def start_message(call_sid: str, stream_sid: str = "MZ1"):
+    return {
+        "event": "start",
+        "streamSid": stream_sid,
+        "start": {"streamSid": stream_sid, "callSid": call_sid, "tracks": ["inbound"]},
+    }
+
+
+@pytest.fixture
+def manager(test_db, test_menu_repository, clean_call_sessions):
+    """Session manager whose agent answers every utterance with a fixed reply."""
+    agent = AgentService(test_menu_repository, client=Mock())
+    agent.process_user_input = AsyncMock(return_value={
+        "response": "Sure. Anything else?",
+        "intent": "ordering",
+        "action": {"type": "none"},
+    })
+    return CallSessionManager(
+        test_db, agent, test_menu_repository, call_record_writer=Mock(spec=CallRecordWriter)
+    )
+
+
+class Recorder:
+    """Collects messages sent to Twilio."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, message):
+        self.messages.append(message)
+
+    def events(self, kind):
+        return [message for message in self.messages if message["event"] == kind]
+
+
+class TestAudio:
+    """Test μ-law helpers and endpointing."""
+
+    def test_ulaw_round_trip(self):
+        pcm = ulaw_to_pcm16(pcm16_to_ulaw(ulaw_to_pcm16(bytes(range(256)))))
+        assert pcm == ulaw_to_pcm16(bytes(range(256)))
+        assert len(ulaw_silence(20)) == FRAME_BYTES
+
+    def test_endpointer_detects_utterance(self):
+        endpointer = EnergyEndpointer(end_silence_ms=600)
+        events = [endpointer.process(frame) for frame in split_frames(utterance(400, 800))]
+
+        assert [event for event in events if event] == [SPEECH_STARTED, SPEECH_ENDED]
+        # 400 ms of speech plus the 600 ms of silence that ended it
+        assert len(endpointer.take_utterance()) == 8 * 1000
+
+    def test_endpointer_ignores_clicks(self):
+        endpointer = EnergyEndpointer(min_speech_ms=60)
+        audio = ulaw_tone(20) + ulaw_silence(200) + ulaw_tone(20) + ulaw_silence(200)
+        assert not any(endpointer.process(frame) for frame in split_frames(audio))
+
+    def test_split_sentences(self):
+        assert split_sentences("Sure. Anything else? ") == ["Sure.", "Anything else?"]
+
+
+class TestMediaStreamHandler:
+    """Test the STT -> agent -> TTS loop on one stream."""
+
+    @pytest.mark.asyncio
+    async def test_greets_then_answers_utterance(self, manager):
+        send = Recorder()
+        stt = ScriptedStreamingSTT(["a burger please"])
+        handler = MediaStreamHandler(manager, stt, ToneStreamingTTS(), send)
+
+        await handler.handle_event(start_message("CA_stream"))
+        await handler.wait_idle()
+        greeting_frames = len(send.events("media"))
+        assert greeting_frames > 0
+        assert [m["mark"]["name"] for m in send.events("mark")] == ["reply-1"]
+        await handler.handle_event({"event": "mark", "streamSid": "MZ1", "mark": {"name": "reply-1"}})
+
+        for message in media_messages(utterance()):
+            await handler.handle_event(message)
+        await handler.wait_idle()
+
+        manager.agent_service.process_user_input.assert_awaited_once()
+        assert manager.agent_service.process_user_input.await_args.args[1] == "a burger please"
+        assert len(send.events("media")) > greeting_frames
+        assert all(len(base64.b64decode(m["media"]["payload"])) <= FRAME_BYTES
+                   for m in send.events("media"))
+        assert send.events("clear") == []
+        session = await manager.get_session("CA_stream")
+        assert session.state.transcript[0].startswith("Agent: ")
+        await handler.close()
+
+    @pytest.mark.asyncio
+    async def test_barge_in_clears_buffered_audio(self, manager):
+        send = Recorder()
+        handler = MediaStreamHandler(
+            manager, ScriptedStreamingSTT(["two burgers"]), ToneStreamingTTS(), send
+        )
+        await handler.handle_event(start_message("CA_barge"))
+        await handler.wait_idle()
+        assert handler.speaking  # Greeting sent, Twilio hasn't confirmed playback
+
+        for message in media_messages(utterance()):
+            await handler.handle_event(message)
+        await handler.wait_idle()
+
+        assert len(send.events("clear")) == 1
+        assert handler.barge_ins == 1
+        manager.agent_service.process_user_input.assert_awaited_once()
+        await handler.close()
+
+    @pytest.mark.asyncio
+    async def test_barge_in_cancels_synthesis_in_progress(self, manager):
+        class SlowTTS(ToneStreamingTTS):
+            async def synthesize(self, text):
+                await asyncio.sleep(10)
+                return await super().synthesize(text)
+
+        send = Recorder()
+        handler = MediaStreamHandler(manager, ScriptedStreamingSTT([]), SlowTTS(), send)
+        await handler.handle_event(start_message("CA_slow"))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert handler.speaking
+
+        for message in media_messages(utterance()):
+            await handler.handle_event(message)
+        await asyncio.wait_for(handler.wait_idle(), timeout=1)
+
+        assert len(send.events("clear")) == 1
+        assert send.events("media") == []
+        # Empty transcript: nothing to answer
+        manager.agent_service.process_user_input.assert_not_awaited()
+        await handler.close()
+
+    @pytest.mark.asyncio
+    async def test_closes_after_goodbye_played(self, manager):
+        send = Recorder()
+        handler = MediaStreamHandler(
+            manager, ScriptedStreamingSTT(["that's all"]), ToneStreamingTTS(), send
+        )
+        manager.process_user_text = AsyncMock(return_value=TurnResult("Goodbye!", end_call=True))
+        await handler.handle_event(start_message("CA_bye"))
+        await handler.wait_idle()
+        await handler.handle_event({"event": "mark", "mark": {"name": "reply-1"}})
+
+        for message in media_messages(utterance()):
+            await handler.handle_event(message)
+        await handler.wait_idle()
+
+        assert await handler.handle_event({"event": "mark", "mark": {"name": "reply-2"}}) is False
+        await handler.close()
+
+
+    @pytest.mark.asyncio
+    async def test_reuses_early_synthesis(self, manager):
+        class RecordingTTS(ToneStreamingTTS):
+            def __init__(self):
+                super().__init__()
+                self.texts = []
+
+            async def synthesize(self, text):
+                self.texts.append(text)
+                return await super().synthesize(text)
+
+        async def process_user_input(state, user_input, on_response=None):
+            await on_response("Sure. Anything else?")
+            return {"response": "Sure. Anything else?", "intent": "ordering", "action": {"type": "none"}}
+
+        manager.agent_service.process_user_input = AsyncMock(side_effect=process_user_input)
+        tts = RecordingTTS()
+        handler = MediaStreamHandler(manager, ScriptedStreamingSTT(["a burger"]), tts, Recorder())
+        await handler.handle_event(start_message("CA_early"))
+        await handler.wait_idle()
+        await handler.handle_event({"event": "mark", "mark": {"name": "reply-1"}})
+        tts.texts.clear()
+
+        for message in media_messages(utterance()):
+            await handler.handle_event(message)
+        await handler.wait_idle()
+
+        # The first sentence was synthesized once, while the turn was still running
+        assert tts.texts == ["Sure.", "Anything else?"]
+        await handler.close()
+
+
+class TestMediaStreamEndpoint:
+    """Test the WebSocket endpoint end to end with local backends."""
+
+    def test_stream_call(self, manager):
+        app.dependency_overrides[get_session_manager] = lambda: manager
+        app.dependency_overrides[get_streaming_stt] = lambda: ScriptedStreamingSTT(["a burger"])
+        app.dependency_overrides[get_streaming_tts] = lambda: ToneStreamingTTS(ms_per_char=1)
+        try:
+            with TestClient(app).websocket_connect("/webhooks/voice/stream") as websocket:
+                websocket.send_json({"event": "connected", "protocol": "Call"})
+                websocket.send_json(start_message("CA_ws"))
+
+                # Greeting audio, then its mark
+                message = websocket.receive_json()
+                while message["event"] == "media":
+                    message = websocket.receive_json()
+                assert message["event"] == "mark"
+                websocket.send_json({"event": "mark", "mark": {"name": message["mark"]["name"]}})
+
+                for media in media_messages(utterance()):
+                    websocket.send_json(media)
+
+                message = websocket.receive_json()
+                assert message["event"] == "media"
+                assert message["streamSid"] == "MZ1"
+                while message["event"] == "media":
+                    message = websocket.receive_json()
+                assert message["mark"]["name"] == "reply-2"
+
+                websocket.send_json({"event": "stop", "streamSid": "MZ1"})
+        finally:
+            app.dependency_overrides.clear()
+
+        manager.agent_service.process_user_input.assert_awaited_once()
+
+    def test_incoming_call_connects_stream(self, test_client, monkeypatch):
+        monkeypatch.setattr("app.api.webhooks.voice.settings.voice_transport", "stream")
+
+        response = test_client.post("/webhooks/voice/incoming", data={"CallSid": "CA_in"})
+
+        assert response.status_code == 200
+        assert '<Stream url="ws://testserver/webhooks/voice/stream"/>' in response.text
@@ -0,0 +1,102 @@
+"""Unit tests for the metrics registry and /metrics endpoint."""
+import asyncio
+import pytest
+
+from app.core import metrics
+from app.core.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+class TestMetricTypes:
+    """Test recording and the text exposition format."""
+
+    def test_counter(self):
+        errors = Counter("errors_total", "Errors", ("kind",))
+        errors.inc("timeout")
+        errors.inc("timeout", amount=2)
+
+        assert errors.value("timeout") == 3
+        assert errors.render().splitlines() == [
+            "# HELP errors_total Errors",
+            "# TYPE errors_total counter",
+            'errors_total{kind="timeout"} 3',
+        ]
+
+    def test_wrong_label_count_rejected(self):
+        errors = Counter("errors_total", "Errors", ("kind",))
+        with pytest.raises(ValueError):
+            errors.inc()
+
+    def test_gauge(self):
+        sessions = Gauge("sessions", "Sessions")
+        sessions.set(4)
+        sessions.set(2)
+        assert sessions.render().splitlines()[-1] == "sessions 2"
+
+    def test_histogram_buckets_are_cumulative(self):
+        latency = Histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            latency.observe(value, "ordering")
+
+        samples = latency.samples()
+        assert samples == [
+            'latency_seconds_bucket{stage="ordering",le="0.1"} 1',
+            'latency_seconds_bucket{stage="ordering",le="1"} 3',
+            'latency_seconds_bucket{stage="ordering",le="+Inf"} 4',
+            'latency_seconds_sum{stage="ordering"} 4.25',
+            'latency_seconds_count{stage="ordering"} 4',
+        ]
+
+    def test_label_values_escaped(self):
+        errors = Counter("errors_total", "Errors", ("kind",))
+        errors.inc('say "hi"\n')
+        assert 'kind="say \\"hi\\"\\n"' in errors.render()
+
+    @pytest.mark.asyncio
+    async def test_timed_decorator_and_timer(self):
+        latency = Histogram("op_seconds", "Op", ("method",))
+
+        @latency.timed("lookup")
+        async def lookup():
+            await asyncio.sleep(0)
+            return "found"
+
+        assert await lookup() == "found"
+        with latency.time("render"):
+            pass
+
+        assert latency.count("lookup") == 1
+        assert latency.count("render") == 1
+
+    def test_registry_rejects_duplicates(self):
+        registry = MetricsRegistry()
+        registry.register(Counter("a_total", "A"))
+        with pytest.raises(ValueError):
+            registry.register(Counter("a_total", "A"))
+
+
+class TestMetricsEndpoint:
+    """Test /metrics and request timing."""
+
+    def test_metrics_endpoint(self, test_client):
+        before = metrics.HTTP_REQUEST_SECONDS.count("/health", "GET", "200")
+        test_client.get("/health")
+
+        response = test_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert metrics.HTTP_REQUEST_SECONDS.count("/health", "GET", "200") == before + 1
+        body = response.text
+        assert "# TYPE voice_agent_llm_request_seconds histogram" in body
+        assert "voice_agent_active_sessions " in body
+
+    def test_unmatched_paths_share_a_label(self, test_client):
+        before = metrics.HTTP_REQUEST_SECONDS.count("unmatched", "GET", "404")
+        test_client.get("/no/such/page")
+        assert metrics.HTTP_REQUEST_SECONDS.count("unmatched", "GET", "404") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_menu_lookups_are_timed(self, test_menu_repository):
+        before = metrics.MENU_LOOKUP_SECONDS.count("get_menu_text")
+        await test_menu_repository.get_menu_text()
+        assert metrics.MENU_LOOKUP_SECONDS.count("get_menu_text") >= before + 1
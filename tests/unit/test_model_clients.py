@@ -0,0 +1,47 @@
+"""Unit tests for application-scoped model API clients."""
+import pytest
+
+from app.core.clients import ModelClients
+from app.core import dependencies
+from app.api.webhooks.voice import get_session_manager
+from app.services.agent.agent import AgentService
+from app.services.speech.stt import SpeechToTextService
+from app.services.speech.tts import TextToSpeechService
+
+
+class TestModelClients:
+    """Test that model clients are created once and shared."""
+
+    @pytest.mark.asyncio
+    async def test_pool_limits_applied(self):
+        clients = ModelClients(
+            api_key="test-key",
+            max_connections=7,
+            max_keepalive_connections=3,
+            timeout_seconds=4.0,
+            connect_timeout_seconds=1.5,
+        )
+        pool = clients.http_client._transport._pool
+
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+        assert clients.http_client.timeout.connect == 1.5
+        assert clients.openai._client is clients.http_client
+        await clients.aclose()
+
+    def test_services_share_one_client(self, test_menu_repository):
+        shared = dependencies.get_model_clients().openai
+
+        assert AgentService(test_menu_repository).client is shared
+        assert SpeechToTextService().client is shared
+        assert TextToSpeechService().client is shared
+
+    def test_session_manager_reuses_shared_client(self, test_db, test_menu_repository):
+        shared = dependencies.get_model_clients().openai
+        first = get_session_manager(test_db, test_menu_repository)
+        second = get_session_manager(test_db, test_menu_repository)
+
+        assert first.agent_service.client is shared
+        assert second.stt_service.client is shared
+        assert second.tts_service.client is shared
+        assert dependencies.get_model_clients() is dependencies.get_model_clients()
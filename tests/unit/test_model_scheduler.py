@@ -0,0 +1,219 @@
+"""Unit tests for the model request scheduler."""
+import asyncio
+import json
+import time
+import httpx
+import pytest
+
+from app.core.clients import ModelClients
+from app.core.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_LIVE,
+    ModelScheduler,
+    ScheduledTransport,
+    current_priority,
+    parse_retry_after,
+    request_priority,
+)
+
+
+def scheduled_client(scheduler, handler):
+    """httpx client whose requests go through the scheduler to a mock handler."""
+    transport = ScheduledTransport(httpx.MockTransport(handler), scheduler)
+    return httpx.AsyncClient(transport=transport)
+
+
+class TestModelScheduler:
+    """Test admission, the adaptive window and priorities."""
+
+    @pytest.mark.asyncio
+    async def test_window_caps_concurrency(self):
+        scheduler = ModelScheduler(initial_limit=2)
+        first = await scheduler.acquire()
+        second = await scheduler.acquire()
+        third = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+
+        assert not third.done()
+        assert scheduler.stats()["queue_depth"] == 1
+
+        first.release(200)
+        slot = await asyncio.wait_for(third, timeout=1)
+        assert scheduler.in_flight == 2
+        second.release(200)
+        slot.release(200)
+        assert scheduler.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_success_grows_and_rate_limit_halves_window(self):
+        scheduler = ModelScheduler(initial_limit=4, max_limit=5)
+        for _ in range(8):
+            (await scheduler.acquire()).release(200)
+        assert scheduler.stats()["limit"] == 5  # Capped at max_limit
+
+        (await scheduler.acquire()).release(429, retry_after=0)
+        stats = scheduler.stats()
+        assert stats["limit"] == 2
+        assert stats["rate_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_window_never_below_min(self):
+        scheduler = ModelScheduler(initial_limit=2, min_limit=1)
+        for _ in range(3):
+            (await scheduler.acquire()).release(429, retry_after=0)
+        assert scheduler.stats()["limit"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_pauses_admission_for_retry_after(self):
+        scheduler = ModelScheduler(initial_limit=4)
+        (await scheduler.acquire()).release(429, retry_after=0.1)
+
+        started = time.monotonic()
+        slot = await scheduler.acquire()
+        assert time.monotonic() - started >= 0.09
+        slot.release(200)
+
+    @pytest.mark.asyncio
+    async def test_live_requests_admitted_before_background(self):
+        scheduler = ModelScheduler(initial_limit=1)
+        held = await scheduler.acquire()
+        order = []
+
+        async def wait(name, priority):
+            slot = await scheduler.acquire(priority=priority)
+            order.append(name)
+            slot.release(200)
+
+        background = asyncio.create_task(wait("background", PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        live = asyncio.create_task(wait("live", PRIORITY_LIVE))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queue_depth_by_priority"] == {"live": 1, "background": 1}
+
+        held.release(200)
+        await asyncio.gather(background, live)
+        assert order == ["live", "background"]
+
+    @pytest.mark.asyncio
+    async def test_tokens_per_minute_holds_requests(self):
+        scheduler = ModelScheduler(initial_limit=4, tokens_per_minute=100)
+        (await scheduler.acquire(tokens=80)).release(200)
+        waiting = asyncio.create_task(scheduler.acquire(tokens=40))
+        await asyncio.sleep(0.05)
+
+        assert not waiting.done()
+        assert scheduler.stats()["tokens_last_minute"] == 80
+        waiting.cancel()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        scheduler = ModelScheduler(initial_limit=1)
+        held = await scheduler.acquire()
+        waiting = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert scheduler.stats()["queue_depth"] == 0
+        held.release(200)
+        assert scheduler.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_release_is_idempotent(self):
+        scheduler = ModelScheduler()
+        slot = await scheduler.acquire()
+        slot.release(200)
+        slot.release(200)
+        assert scheduler.in_flight == 0
+
+    def test_request_priority_is_scoped(self):
+        assert current_priority() == PRIORITY_LIVE
+        with request_priority(PRIORITY_BACKGROUND):
+            assert current_priority() == PRIORITY_BACKGROUND
+        assert current_priority() == PRIORITY_LIVE
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after(httpx.Headers({"retry-after": "2"})) == 2.0
+        assert parse_retry_after(httpx.Headers({"retry-after-ms": "250", "retry-after": "1"})) == 0.25
+        assert parse_retry_after(httpx.Headers({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) is None
+        assert parse_retry_after(httpx.Headers()) is None
+
+
+class TestScheduledTransport:
+    """Test scheduling at the HTTP transport."""
+
+    @pytest.mark.asyncio
+    async def test_model_requests_hold_a_slot_until_read(self):
+        scheduler = ModelScheduler()
+
+        def handler(request):
+            return httpx.Response(200, json={"ok": True})
+
+        async with scheduled_client(scheduler, handler) as client:
+            body = json.dumps({"messages": [{"role": "user", "content": "x" * 400}]})
+            async with client.stream(
+                "POST",
+                "https://api.openai.com/v1/chat/completions",
+                content=body,
+                headers={"content-type": "application/json"},
+            ) as response:
+                assert scheduler.in_flight == 1
+                await response.aread()
+            assert scheduler.in_flight == 0
+
+        stats = scheduler.stats()
+        assert stats["admitted"] == 1
+        assert stats["tokens_last_minute"] == len(body) // 4
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_response_backs_off(self):
+        scheduler = ModelScheduler(initial_limit=4)
+
+        def handler(request):
+            return httpx.Response(429, headers={"retry-after-ms": "50"})
+
+        async with scheduled_client(scheduler, handler) as client:
+            response = await client.post("https://api.openai.com/v1/audio/speech")
+
+        assert response.status_code == 429
+        stats = scheduler.stats()
+        assert stats["rate_limited"] == 1
+        assert stats["limit"] == 2
+        assert 0 < stats["paused_for_seconds"] <= 0.05
+
+    @pytest.mark.asyncio
+    async def test_other_hosts_bypass_scheduler(self):
+        scheduler = ModelScheduler()
+
+        def handler(request):
+            return httpx.Response(200, content=b"audio")
+
+        async with scheduled_client(scheduler, handler) as client:
+            await client.get("https://api.twilio.com/recording.wav")
+
+        assert scheduler.stats()["admitted"] == 0
+
+    @pytest.mark.asyncio
+    async def test_transport_error_releases_slot(self):
+        scheduler = ModelScheduler()
+
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        async with scheduled_client(scheduler, handler) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.get("https://api.openai.com/v1/models")
+
+        assert scheduler.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_model_clients_use_scheduler(self):
+        scheduler = ModelScheduler()
+        clients = ModelClients(api_key="test-key", max_connections=7, scheduler=scheduler)
+
+        transport = clients.http_client._transport
+        assert isinstance(transport, ScheduledTransport)
+        assert transport.scheduler is scheduler
+        assert transport._transport._pool._max_connections == 7
+        await clients.aclose()
@@ -118,8 +118,7 @@ class TestOrderTotalCalculation:
 
         session = CallSession(call_sid="test_call_readback", state=state, call_id=1)
 
-        from app.services.call_session import manager as session_manager
-        session_manager._sessions["test_call_readback"] = session
+        await clean_call_sessions.set(session)
 
         try:
             # Process speech - this should trigger order readback
@@ -132,7 +131,7 @@ class TestOrderTotalCalculation:
             # Verify order items are also mentioned
             assert "burger" in response.lower()
         finally:
-            session_manager._sessions.clear()
+            await clean_call_sessions.clear()
 
     @pytest.mark.asyncio
     async def test_order_readback_no_items(self, call_manager, clean_call_sessions):
@@ -149,8 +148,7 @@ class TestOrderTotalCalculation:
 
         session = CallSession(call_sid="test_call_empty", state=state, call_id=1)
 
-        from app.services.call_session import manager as session_manager
-        session_manager._sessions["test_call_empty"] = session
+        await clean_call_sessions.set(session)
 
         try:
             response = await call_manager.process_user_speech("test_call_empty", "yes")
@@ -158,7 +156,7 @@ class TestOrderTotalCalculation:
             # Should mention no items, not include a total
             assert "No items" in response or "empty" in response.lower()
         finally:
-            session_manager._sessions.clear()
+            await clean_call_sessions.clear()
 
     @pytest.mark.asyncio
     async def test_order_total_precision(self, call_manager):
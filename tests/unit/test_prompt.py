@@ -0,0 +1,73 @@
+"""Unit tests for prompt compilation."""
+import pytest
+from unittest.mock import Mock
+
+from app.services.agent.agent import AgentService
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.prompt import PromptCompiler, get_user_prompt
+from app.services.agent.response_cache import ResponseCache
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+
+
+class TestPromptCompiler:
+    """Test the static prefix and usage accounting."""
+
+    def test_system_prompt_compiled_once_per_menu(self):
+        compiler = PromptCompiler()
+
+        first = compiler.build_messages("Menu: burger", "turn 1")
+        second = compiler.build_messages("Menu: burger", "turn 2")
+        compiler.build_messages("Menu: burger, fries", "turn 3")
+
+        assert first[0]["content"] is second[0]["content"]
+        assert "Menu: burger" in first[0]["content"]
+        assert second[1] == {"role": "user", "content": "turn 2"}
+        assert compiler.stats()["compiles"] == 2
+        assert compiler.stats()["prefix_reuses"] == 1
+
+    def test_user_prompt_is_per_turn_only(self):
+        prompt = get_user_prompt(
+            "Agent: What can I get for you?",
+            "a burger",
+            conversation_stage=ConversationStage.ORDERING,
+        )
+
+        assert 'Customer just said: "a burger"' in prompt
+        assert "CONVERSATION STAGE: ORDERING" in prompt
+        assert "Menu" not in prompt
+
+    def test_record_usage(self):
+        compiler = PromptCompiler()
+
+        compiler.record_usage(Mock(prompt_tokens=1200, prompt_tokens_details={"cached_tokens": 1024}))
+        turn = compiler.record_usage(Mock(prompt_tokens=800, prompt_tokens_details=None))
+        compiler.record_usage(None)
+
+        assert turn == {"prompt_tokens": 800, "cached_tokens": 0}
+        assert compiler.stats()["prompt_tokens"] == 2000
+        assert compiler.stats()["cached_token_rate"] == 0.512
+
+
+class TestAgentPrompts:
+    """Test the messages the agent sends."""
+
+    @pytest.mark.asyncio
+    async def test_prefix_is_byte_stable_across_calls(self, test_menu_repository, mock_openai):
+        agent = AgentService(
+            test_menu_repository,
+            client=mock_openai,
+            fast_path=FastPathMatcher(rules=[]),
+            response_cache=ResponseCache(max_entries=0),
+            prompt_compiler=PromptCompiler(),
+        )
+
+        for call_sid, utterance in [("CA1", "what do you have"), ("CA2", "are you open late")]:
+            state = ConversationState(call_sid=call_sid, stage=ConversationStage.ORDERING)
+            await agent.process_user_input(state, utterance)
+
+        calls = mock_openai.chat.completions.create.await_args_list
+        first, second = (call.kwargs["messages"] for call in calls)
+        assert first[0] == second[0]
+        assert first[1] != second[1]
+        assert agent.prompt_compiler.stats()["turns"] == 2
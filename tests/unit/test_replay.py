@@ -0,0 +1,86 @@
+"""Unit tests for replaying stored conversations under agent configurations."""
+import pytest
+
+from app.services.persistence.calls import CallPersistenceService
+from app.services.persistence.orders import OrderPersistenceService
+from app.tools.replay import (
+    AgentConfig,
+    ReplayConversation,
+    customer_utterances,
+    load_conversations,
+    normalize_order,
+    run_experiment,
+)
+
+
+class TestReplayInputs:
+    """Test reading conversations and configurations."""
+
+    def test_customer_utterances(self):
+        transcript = "Agent: Hi, what can I get you?\nCustomer: a burger\nAgent: Anything else?\nCustomer: that's all"
+        assert customer_utterances(transcript) == ["a burger", "that's all"]
+
+    def test_parse_config(self):
+        config = AgentConfig.parse("lean:fast_path=off,context_token_budget=300,temperature=0.2")
+
+        assert config.name == "lean"
+        assert config.fast_path is False
+        assert config.context_token_budget == 300
+        assert config.temperature == 0.2
+        with pytest.raises(ValueError):
+            AgentConfig.parse("bad:window=3")
+
+    def test_normalize_order_ignores_ordering(self):
+        assert normalize_order([("Soda", 1, ["Diet"]), ("burger", 2, ["well done", "no onions"])]) == (
+            normalize_order([("burger", 2, ["no onions", "well done"]), ("soda", 1, ["diet"])])
+        )
+
+    @pytest.mark.asyncio
+    async def test_load_conversations(self, test_db):
+        calls = CallPersistenceService(test_db)
+        orders = OrderPersistenceService(test_db)
+        await calls.create_call("CA_stored")
+        await calls.update_call_transcript("CA_stored", "Agent: Hi\nCustomer: a burger\nCustomer: yes")
+        await calls.update_call_status("CA_stored", "completed")
+        call = await calls.get_call_by_sid("CA_stored")
+        order = await orders.create_order(call_id=call.id, raw_text="", structured_order={})
+        await orders.add_order_items(order.id, [{"item_name": "burger", "quantity": 1, "modifiers": []}])
+        await orders.confirm_order(order.id)
+        await calls.create_call("CA_in_progress")
+
+        (conversation,) = await load_conversations(test_db)
+
+        assert conversation.call_sid == "CA_stored"
+        assert conversation.utterances == ["a burger", "yes"]
+        assert conversation.persisted_order == [("burger", 1, ())]
+
+
+class TestRunExperiment:
+    """Test replaying conversations through the session manager."""
+
+    @pytest.mark.asyncio
+    async def test_compares_configurations(self, test_menu_repository, clean_call_sessions):
+        conversation = ReplayConversation(
+            "CA_replay",
+            ["I'd like two burgers and um a soda", "that's all", "yes that's right"],
+            [("burger", 2, ()), ("soda", 1, ())],
+        )
+        wrong = ReplayConversation("CA_wrong", ["a burger please", "that's all", "yes"], [("fries", 1, ())])
+
+        report = await run_experiment(
+            [conversation, wrong],
+            [AgentConfig("fast", backend="rules"), AgentConfig("llm-only", backend="rules", fast_path=False)],
+            test_menu_repository,
+            parallel=2,
+        )
+
+        for name in ("fast", "llm-only"):
+            assert report[name]["conversations"] == 2
+            assert report[name]["completion_rate"] == 1.0
+            assert report[name]["order_match_rate"] == 0.5
+            assert report[name]["order_mismatches"][0]["call_sid"] == "CA_wrong"
+            assert report[name]["turn_latency_ms"]["p50"] is not None
+        assert report["llm-only"]["fast_path_hits"] == 0
+        assert report["llm-only"]["llm_calls"] > report["fast"]["llm_calls"]
+        # Replays never touch the shared session store
+        assert await clean_call_sessions.list_call_sids() == []
@@ -0,0 +1,117 @@
+"""Unit tests for the LLM response cache."""
+import pytest
+
+from app.core.config import settings
+from app.services.agent.agent import AgentService
+from app.services.agent.fast_path import FastPathMatcher
+from app.services.agent.response_cache import ResponseCache, make_cache_key
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState, OrderItem
+from app.services.menu.base import MenuItem
+
+
+def make_state(call_sid: str = "CA_cache", items=()) -> ConversationState:
+    state = ConversationState(
+        call_sid=call_sid,
+        stage=ConversationStage.ORDERING,
+        current_order=[OrderItem(item_name=name) for name in items],
+        menu_context="menu",
+    )
+    state.add_transcript_turn("Agent", "What can I get for you?")
+    return state
+
+
+class TestResponseCache:
+    """Test LRU, TTL and copy behaviour."""
+
+    def test_returns_copies(self):
+        cache = ResponseCache()
+        response = {"response": "One coke.", "action": {"type": "add_item"}}
+        cache.set(("key",), response)
+        response["response"] = "changed"
+
+        cached = cache.get(("key",))
+        cached["action"]["type"] = "none"
+
+        assert cache.get(("key",)) == {"response": "One coke.", "action": {"type": "add_item"}}
+        assert cache.stats()["hits"] == 2
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set(("a",), {})
+        cache.set(("b",), {})
+        cache.get(("a",))
+        cache.set(("c",), {})
+
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_expires_entries(self, monkeypatch):
+        cache = ResponseCache(ttl_seconds=10)
+        now = 1000.0
+        monkeypatch.setattr("app.services.agent.response_cache.time.monotonic", lambda: now)
+        cache.set(("a",), {})
+        now = 1011.0
+
+        assert cache.get(("a",)) is None
+        assert cache.stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_key_depends_on_context(self):
+        key = make_cache_key(0, make_state(), "A coke, please.")
+
+        assert make_cache_key(0, make_state("CA_other"), "a coke please") == key
+        assert make_cache_key(1, make_state(), "a coke please") != key
+        assert make_cache_key(0, make_state(items=["burger"]), "a coke please") != key
+        asked = make_state()
+        asked.add_transcript_turn("Agent", "What size would you like?")
+        assert make_cache_key(0, asked, "a coke please") != key
+
+
+class TestAgentResponseCache:
+    """Test caching around the LLM call."""
+
+    @pytest.fixture
+    def agent(self, test_menu_repository, mock_openai):
+        return AgentService(
+            test_menu_repository,
+            client=mock_openai,
+            fast_path=FastPathMatcher(rules=[]),
+            response_cache=ResponseCache(),
+        )
+
+    @pytest.mark.asyncio
+    async def test_identical_turn_skips_llm(self, agent, mock_openai):
+        first = await agent.process_user_input(make_state("CA1"), "what drinks do you have")
+        second = await agent.process_user_input(make_state("CA2"), "What drinks do you have?")
+
+        mock_openai.chat.completions.create.assert_awaited_once()
+        assert second == first
+        assert agent.response_cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_menu_edit_invalidates(self, agent, mock_openai, test_menu_repository):
+        await agent.process_user_input(make_state("CA1"), "what drinks do you have")
+        await test_menu_repository.provider.add_item(MenuItem(name="milkshake", price=4.0))
+
+        await agent.process_user_input(make_state("CA2"), "what drinks do you have")
+
+        assert mock_openai.chat.completions.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, agent, mock_openai):
+        mock_openai.chat.completions.create.side_effect = RuntimeError("boom")
+        response = await agent.process_user_input(make_state("CA1"), "what drinks do you have")
+
+        assert response["error"]
+        assert len(agent.response_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_setting(self, agent, mock_openai, monkeypatch):
+        monkeypatch.setattr(settings, "response_cache_enabled", False)
+
+        await agent.process_user_input(make_state("CA1"), "what drinks do you have")
+        await agent.process_user_input(make_state("CA2"), "what drinks do you have")
+
+        assert mock_openai.chat.completions.create.await_count == 2
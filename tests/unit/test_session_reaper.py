@@ -0,0 +1,120 @@
+"""Unit tests for the idle call session reaper."""
+import time
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.services.agent.state import ConversationState, OrderItem
+from app.services.call_session import manager as manager_module
+from app.services.call_session.models import CallSession
+from app.services.call_session.reaper import SessionReaper
+from app.services.call_session.store import InMemorySessionStore
+from app.services.persistence.calls import CallPersistenceService
+
+
+@pytest.fixture
+def db_session_factory(test_db_engine):
+    """Session factory bound to the test database."""
+    return async_sessionmaker(test_db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def make_session(call_sid: str, idle_seconds: float = 0.0, items: int = 0) -> CallSession:
+    state = ConversationState(
+        call_sid=call_sid,
+        current_order=[OrderItem(item_name="burger") for _ in range(items)],
+    )
+    state.add_transcript_turn("Customer", "hello")
+    return CallSession(call_sid=call_sid, state=state, last_activity=time.time() - idle_seconds)
+
+
+class TurnDuringSweepStore(InMemorySessionStore):
+    """Store whose sessions take a turn right after the reaper lists them."""
+
+    async def list_sessions(self):
+        sessions = await super().list_sessions()
+        snapshot = [CallSession.from_dict(session.to_dict()) for session in sessions]
+        for session in self._sessions.values():
+            session.state.add_transcript_turn("Customer", "two burgers please")
+            session.touch()
+        return snapshot
+
+
+class TestSessionReaper:
+    """Test idle and capacity eviction."""
+
+    @pytest.mark.asyncio
+    async def test_evicts_idle_session_and_finalizes_call(self, test_db, db_session_factory):
+        await CallPersistenceService(test_db).create_call("CA_idle")
+        store = InMemorySessionStore()
+        await store.set(make_session("CA_idle", idle_seconds=3600))
+        await store.set(make_session("CA_live"))
+
+        reaper = SessionReaper(store, db_session_factory, idle_ttl_seconds=600)
+        evicted = await reaper.sweep()
+
+        assert evicted == 1
+        assert await store.list_call_sids() == ["CA_live"]
+        assert reaper.stats()["evicted_idle"] == 1
+
+        async with db_session_factory() as db:
+            call = await CallPersistenceService(db).get_call_by_sid("CA_idle")
+        assert call.status == "failed"  # No orders were placed
+        assert call.ended_at is not None
+        assert call.transcript == "Customer: hello"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "reaper_options", [{"idle_ttl_seconds": 600}, {"idle_ttl_seconds": 7200, "max_sessions": 0}]
+    )
+    async def test_keeps_session_touched_after_snapshot(
+        self, test_db, db_session_factory, reaper_options
+    ):
+        await CallPersistenceService(test_db).create_call("CA_back")
+        store = TurnDuringSweepStore()
+        await store.set(make_session("CA_back", idle_seconds=3600))
+
+        reaper = SessionReaper(store, db_session_factory, **reaper_options)
+        evicted = await reaper.sweep()
+
+        assert evicted == 0
+        assert await store.list_call_sids() == ["CA_back"]
+        async with db_session_factory() as db:
+            call = await CallPersistenceService(db).get_call_by_sid("CA_back")
+        assert call.ended_at is None
+
+    @pytest.mark.asyncio
+    async def test_enforces_session_count(self, db_session_factory):
+        store = InMemorySessionStore()
+        for index, idle in enumerate([30, 20, 10]):
+            await store.set(make_session(f"CA{index}", idle_seconds=idle))
+
+        reaper = SessionReaper(store, db_session_factory, idle_ttl_seconds=600, max_sessions=2)
+        await reaper.sweep()
+
+        # Least recently active session goes first
+        assert sorted(await store.list_call_sids()) == ["CA1", "CA2"]
+        assert reaper.stats()["evicted_capacity"] == 1
+
+    @pytest.mark.asyncio
+    async def test_enforces_byte_budget(self, db_session_factory):
+        store = InMemorySessionStore()
+        await store.set(make_session("CA_big", idle_seconds=10, items=50))
+        await store.set(make_session("CA_small"))
+
+        reaper = SessionReaper(store, db_session_factory, idle_ttl_seconds=600, max_bytes=1000)
+        await reaper.sweep()
+
+        assert await store.list_call_sids() == ["CA_small"]
+        assert reaper.stats()["evicted_bytes"] > 1000
+
+    @pytest.mark.asyncio
+    async def test_evicted_call_drops_in_process_state(self, db_session_factory):
+        store = InMemorySessionStore()
+        await store.set(make_session("CA_gone", idle_seconds=3600))
+        manager_module._turn_responses.put("CA_gone", "IT-1", "<Response/>")
+        manager_module._debug_buffers.for_call("CA_gone")
+
+        reaper = SessionReaper(store, db_session_factory, idle_ttl_seconds=600)
+        await reaper.sweep()
+
+        assert manager_module._turn_responses.get("CA_gone", "IT-1") is None
+        assert manager_module._debug_buffers.get("CA_gone") is None
@@ -0,0 +1,189 @@
+"""Unit tests for call session store backends."""
+import asyncio
+import pytest
+
+from app.core.config import Settings
+from app.services.agent.state import ConversationState, OrderItem
+from app.services.agent.stages import ConversationStage
+from app.services.call_session.models import CallSession
+from app.services.call_session.store import (
+    InMemorySessionStore,
+    SQLiteSessionStore,
+    RedisSessionStore,
+    CachedSessionStore,
+    create_session_store,
+)
+
+
+def make_session(call_sid: str) -> CallSession:
+    """Build a session with some non-default state."""
+    state = ConversationState(
+        call_sid=call_sid,
+        stage=ConversationStage.ORDERING,
+        current_order=[OrderItem(item_name="burger", quantity=2, modifiers=["no onions"])],
+        turn_count=3,
+    )
+    state.add_transcript_turn("Customer", "two burgers no onions")
+    return CallSession(call_sid=call_sid, state=state, call_id=7)
+
+
+class FakeRedisServer:
+    """Local stand-in speaking enough RESP for the session store."""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+        self.commands = []
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readuntil(b"\r\n")
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readuntil(b"\r\n"))[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode())
+                self.commands.append(args[0].upper())
+                writer.write(self._reply(args))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    def _reply(self, args) -> bytes:
+        command, rest = args[0].upper(), args[1:]
+        if command == "SET":
+            self.data[rest[0]] = rest[1]
+            return b"+OK\r\n"
+        if command == "GET":
+            value = self.data.get(rest[0])
+            if value is None:
+                return b"$-1\r\n"
+            encoded = value.encode()
+            return b"$%d\r\n%s\r\n" % (len(encoded), encoded)
+        if command == "DEL":
+            return b":%d\r\n" % int(self.data.pop(rest[0], None) is not None)
+        if command == "EXISTS":
+            return b":%d\r\n" % int(rest[0] in self.data)
+        if command == "SADD":
+            self.sets.setdefault(rest[0], set()).add(rest[1])
+            return b":1\r\n"
+        if command == "SREM":
+            self.sets.get(rest[0], set()).discard(rest[1])
+            return b":1\r\n"
+        if command == "SMEMBERS":
+            members = sorted(self.sets.get(rest[0], set()))
+            out = b"*%d\r\n" % len(members)
+            for member in members:
+                out += b"$%d\r\n%s\r\n" % (len(member), member.encode())
+            return out
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+async def fake_redis():
+    """Run a fake Redis-protocol server on a local port."""
+    server = FakeRedisServer()
+    port = await server.start()
+    yield server, f"redis://127.0.0.1:{port}/0"
+    await server.stop()
+
+
+class TestInMemorySessionStore:
+    """Test the in-process LRU backend."""
+
+    @pytest.mark.asyncio
+    async def test_set_get_delete(self):
+        store = InMemorySessionStore()
+        session = make_session("CA1")
+        await store.set(session)
+
+        assert await store.get("CA1") is session
+        await store.delete("CA1")
+        assert await store.get("CA1") is None
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        store = InMemorySessionStore(max_sessions=2)
+        await store.set(make_session("CA1"))
+        await store.set(make_session("CA2"))
+        # Touch CA1 so CA2 becomes least recently used
+        await store.get("CA1")
+        await store.set(make_session("CA3"))
+
+        assert await store.list_call_sids() == ["CA1", "CA3"]
+        assert store.dropped == 1
+
+    def test_unbounded_by_default(self):
+        # The session reaper owns the limit, and it finalizes what it evicts
+        assert create_session_store("memory").max_sessions is None
+        assert Settings.model_fields["session_store_max_sessions"].default is None
+
+
+class TestSharedSessionStores:
+    """Test backends that serialize sessions."""
+
+    @pytest.mark.asyncio
+    async def test_sqlite_round_trip(self, tmp_path):
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        await store.set(make_session("CA1"))
+
+        loaded = await store.get("CA1")
+        assert loaded.call_id == 7
+        assert loaded.state.stage == ConversationStage.ORDERING
+        assert loaded.state.current_order[0].modifiers == ["no onions"]
+        assert loaded.state.transcript == ["Customer: two burgers no onions"]
+
+        # A second store on the same file sees the session (another worker)
+        other = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        assert await other.list_call_sids() == ["CA1"]
+        await other.delete("CA1")
+        assert await store.get("CA1") is None
+        await store.close()
+        await other.close()
+
+    @pytest.mark.asyncio
+    async def test_redis_round_trip(self, fake_redis):
+        server, url = fake_redis
+        store = RedisSessionStore(url)
+        await store.set(make_session("CA1"))
+        await store.set(make_session("CA2"))
+
+        loaded = await store.get("CA1")
+        assert loaded.state.turn_count == 3
+        assert sorted(await store.list_call_sids()) == ["CA1", "CA2"]
+
+        await store.delete("CA1")
+        assert await store.get("CA1") is None
+        assert await store.list_call_sids() == ["CA2"]
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_cached_store_skips_backend_reads(self, fake_redis):
+        server, url = fake_redis
+        store = CachedSessionStore(RedisSessionStore(url), ttl_seconds=60)
+        await store.set(make_session("CA1"))
+        server.commands.clear()
+
+        first = await store.get("CA1")
+        second = await store.get("CA1")
+
+        assert first is second
+        assert server.commands == []
+        assert store.hits == 2
+
+        await store.delete("CA1")
+        assert await store.get("CA1") is None
+        await store.close()
+
+    def test_create_session_store_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_session_store("memcached")
@@ -0,0 +1,122 @@
+"""Unit tests for the dialogue-efficiency simulator."""
+import random
+
+import pytest
+
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState, OrderItem
+from app.tools.replay import AgentConfig
+from app.tools.simulate import PERSONAS, GoalItem, SimulatedCaller, main, make_goal, mishear, run_simulation
+
+
+class TestSimulatedCaller:
+    """Test how personas talk."""
+
+    @pytest.mark.asyncio
+    async def test_goal_comes_from_the_menu(self, test_menu_repository):
+        menu = await test_menu_repository.get_menu()
+        names = {item.name for item in menu.items}
+
+        for seed in range(20):
+            goal = make_goal(menu, random.Random(seed))
+            assert 1 <= len(goal) <= 3
+            assert {item.name for item in goal} <= names
+
+    def test_decisive_orders_everything_at_once_then_confirms(self):
+        caller = SimulatedCaller("decisive", [GoalItem("burger", 2), GoalItem("soda")], random.Random(0))
+        state = ConversationState(call_sid="CA_sim", stage=ConversationStage.GREETING)
+
+        first = caller.next_utterance(state)
+        assert "two burgers" in first and "a soda" in first
+
+        state.stage = ConversationStage.ORDERING
+        state.current_order = [OrderItem(item_name="burger", quantity=2), OrderItem(item_name="soda")]
+        assert caller.next_utterance(state) in ("that's all", "that's it", "no that's everything")
+
+        state.stage = ConversationStage.REVIEW
+        assert caller.next_utterance(state) in ("yes that's right", "yes", "correct")
+        state.stage = ConversationStage.CONCLUSION
+        assert caller.next_utterance(state) is None
+
+    def test_repeats_a_line_that_added_nothing(self):
+        caller = SimulatedCaller("rambling", [GoalItem("burger"), GoalItem("fries")], random.Random(0))
+        state = ConversationState(call_sid="CA_sim", stage=ConversationStage.ORDERING)
+
+        first = caller.next_utterance(state)
+        assert "burger" in first
+        assert caller.next_utterance(state) == first
+        state.current_order = [OrderItem(item_name="burger")]
+        assert "fries" in caller.next_utterance(state)
+
+    def test_answers_modifier_questions(self):
+        caller = SimulatedCaller("decisive", [GoalItem("burger", modifiers=["no onions"])], random.Random(0))
+        state = ConversationState(
+            call_sid="CA_sim", stage=ConversationStage.ORDERING, pending_modifiers_item_name="Burger"
+        )
+
+        assert caller.next_utterance(state) == "no onions"
+
+    def test_answers_size_questions(self):
+        fries = GoalItem("fries", sizes=["large", "small"])
+        caller = SimulatedCaller("decisive", [GoalItem("burger"), fries], random.Random(0))
+        state = ConversationState(call_sid="CA_sim", stage=ConversationStage.ORDERING)
+        state.add_transcript_turn("Agent", "What size would you like for the fries?")
+
+        size = caller.next_utterance(state)
+
+        assert size in ("large", "small")
+        assert fries.modifiers == [size]
+
+    def test_reviser_changes_the_order_once(self):
+        goal = [GoalItem("burger"), GoalItem("fries")]
+        caller = SimulatedCaller("revising", goal, random.Random(0))
+        state = ConversationState(call_sid="CA_sim", stage=ConversationStage.REVIEW)
+
+        assert caller.next_utterance(state) == "actually can you remove the fries"
+        assert [item.name for item in goal] == ["burger"]
+        assert caller.next_utterance(state) in ("yes that's right", "yes", "correct")
+
+    def test_mishear_is_seeded_and_lossy(self):
+        text = "Can I get two burgers, four fries and a large coke?"
+        noisy = mishear(text, random.Random(3), error_rate=0.9)
+
+        assert noisy == mishear(text, random.Random(3), error_rate=0.9)
+        assert noisy != text.lower()
+        assert "," not in noisy and "?" not in noisy
+
+    def test_unknown_persona(self):
+        with pytest.raises(ValueError):
+            SimulatedCaller("shy", [GoalItem("burger")], random.Random(0))
+
+
+class TestRunSimulation:
+    """Test simulated calls against the agent."""
+
+    @pytest.mark.asyncio
+    async def test_reports_per_persona_and_configuration(self, test_menu_repository, clean_call_sessions):
+        report = await run_simulation(
+            [AgentConfig("fast", backend="rules"), AgentConfig("llm-only", backend="rules", fast_path=False)],
+            test_menu_repository,
+            conversations=3,
+            seed=7,
+            parallel=4,
+        )
+
+        for name in ("fast", "llm-only"):
+            assert set(report[name]["personas"]) == set(PERSONAS)
+            overall = report[name]["all"]
+            assert overall["conversations"] == 3 * len(PERSONAS)
+            assert overall["completion_rate"] > 0
+            assert overall["turns_per_order"]["p50"] >= 2
+            assert report[name]["personas"]["decisive"]["order_correct_rate"] == 1.0
+            assert overall["completion_rate"] <= overall["order_correct_rate"]
+        assert (
+            report["llm-only"]["all"]["llm_calls_per_order"]["mean"]
+            > report["fast"]["all"]["llm_calls_per_order"]["mean"]
+        )
+        # Simulated calls never touch the shared session store
+        assert await clean_call_sessions.list_call_sids() == []
+
+    def test_duplicate_config_names(self):
+        with pytest.raises(ValueError, match="unique"):
+            main(["--config", "fast", "--config", "fast:fast_path=off"])
@@ -0,0 +1,160 @@
+"""Unit tests for speculative turns from partial speech results."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.core.config import settings
+from app.services.agent.stages import ConversationStage
+from app.services.agent.state import ConversationState
+from app.services.call_session.call_records import CallRecordWriter
+from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.models import CallSession
+from app.services.call_session.speculation import SpeculationRegistry, normalize_utterance
+
+
+@pytest.fixture
+def agent():
+    """Agent that records what it heard and adds a burger."""
+    agent = AsyncMock()
+
+    async def process_user_input(state, user_input):
+        state.add_transcript_turn("Customer", user_input)
+        await asyncio.sleep(0.01)
+        state.add_transcript_turn("Agent", "One burger, anything else?")
+        return {
+            "response": "One burger, anything else?",
+            "intent": "ordering",
+            "action": {"type": "add_item", "item_name": "burger", "quantity": 1},
+        }
+
+    agent.process_user_input = AsyncMock(side_effect=process_user_input)
+    return agent
+
+
+@pytest.fixture
+def manager(test_db, test_menu_repository, agent, monkeypatch):
+    monkeypatch.setattr(settings, "speculative_turns_enabled", True)
+    return CallSessionManager(
+        test_db, agent, test_menu_repository, call_record_writer=Mock(spec=CallRecordWriter)
+    )
+
+
+@pytest.fixture
+async def ordering_session(clean_call_sessions):
+    state = ConversationState(call_sid="CA_spec", stage=ConversationStage.ORDERING)
+    state.add_transcript_turn("Agent", "What can I get for you?")
+    session = CallSession(call_sid="CA_spec", state=state, call_id=1)
+    await clean_call_sessions.set(session)
+    return session
+
+
+class TestSpeculationRegistry:
+    """Test starting, matching and discarding speculations."""
+
+    @pytest.mark.asyncio
+    async def test_adopts_matching_final(self):
+        registry = SpeculationRegistry()
+        assert registry.start("CA1", "a burger please", 1, AsyncMock(return_value="result"))
+
+        assert await registry.take("CA1", "A burger, please.", 1) == "result"
+        assert registry.stats()["adopted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_discards_different_final(self):
+        registry = SpeculationRegistry()
+        registry.start("CA1", "can I get", 1, AsyncMock(return_value="result"))
+
+        assert await registry.take("CA1", "can I get two large fries", 1) is None
+        assert registry.stats()["discarded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_discards_different_quantity_or_negation(self):
+        registry = SpeculationRegistry()
+        cases = [
+            ("i would like two cheeseburgers with no onions and a large coke please",
+             "i would like ten cheeseburgers with no onions and a large coke please"),
+            ("one cheeseburger please", "no cheeseburger please"),
+        ]
+        for partial, final in cases:
+            registry.start("CA1", partial, 1, AsyncMock(return_value="result"))
+            assert await registry.take("CA1", final, 1) is None
+        assert registry.stats()["discarded"] == 2
+
+    @pytest.mark.asyncio
+    async def test_discards_different_menu_items(self, test_menu_repository):
+        extractor = await test_menu_repository.get_entity_extractor()
+        registry = SpeculationRegistry(min_similarity=0.5)
+        registry.start("CA1", "a burger and fries please", 1, AsyncMock(return_value="result"))
+
+        assert await registry.take("CA1", "a burger and soda please", 1, extractor) is None
+
+    @pytest.mark.asyncio
+    async def test_discards_stale_state_version(self):
+        registry = SpeculationRegistry()
+        registry.start("CA1", "a burger please", 1, AsyncMock(return_value="result"))
+
+        assert await registry.take("CA1", "a burger please", 3) is None
+
+    @pytest.mark.asyncio
+    async def test_supersedes_and_limits_restarts(self):
+        registry = SpeculationRegistry(min_words=2, max_per_turn=2)
+        run = AsyncMock(return_value="result")
+
+        assert not registry.start("CA1", "burger", 1, run)  # Too short
+        assert registry.start("CA1", "a burger", 1, run)
+        assert not registry.start("CA1", "A burger.", 1, run)  # Same text
+        assert registry.start("CA1", "a burger with", 1, run)
+        assert not registry.start("CA1", "a burger with cheese", 1, run)  # Limit reached
+        assert registry.stats()["superseded"] == 1
+        assert len(registry) == 1
+
+    def test_normalize_utterance(self):
+        assert normalize_utterance("  Yes, that's   RIGHT! ") == "yes that's right"
+        # Same words as the fast path and response cache see
+        assert normalize_utterance("I don’t want it well-done") == "i don't want it well done"
+
+
+class TestSpeculativeTurns:
+    """Test speculation through the session manager."""
+
+    @pytest.mark.asyncio
+    async def test_final_reuses_speculative_turn(self, manager, agent, ordering_session):
+        assert await manager.speculate("CA_spec", "a burger please")
+
+        # Nothing is committed until the final transcript arrives
+        stored = await manager.get_session("CA_spec")
+        assert stored.state.current_order == []
+
+        twiml = await manager.process_user_speech("CA_spec", "A burger please.")
+
+        agent.process_user_input.assert_awaited_once()
+        assert "One burger, anything else?" in twiml
+        session = await manager.get_session("CA_spec")
+        assert session.state.turn_count == 1
+        assert session.state.transcript[1] == "Customer: A burger please."
+        assert [item.item_name for item in session.state.current_order] == ["burger"]
+
+    @pytest.mark.asyncio
+    async def test_mismatched_final_runs_normally(self, manager, agent, ordering_session):
+        await manager.speculate("CA_spec", "can I get")
+
+        await manager.process_user_speech("CA_spec", "two burgers and fries")
+
+        assert agent.process_user_input.await_args.args[1] == "two burgers and fries"
+        session = await manager.get_session("CA_spec")
+        assert session.state.transcript[1] == "Customer: two burgers and fries"
+        assert len(session.state.transcript) == 3
+
+    @pytest.mark.asyncio
+    async def test_gather_requests_partial_results(self, manager, ordering_session):
+        twiml = await manager.process_user_speech("CA_spec", "a burger", base_url="https://x.io")
+
+        assert 'partialResultCallback="https://x.io/webhooks/voice/partial"' in twiml
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, manager, ordering_session, monkeypatch):
+        monkeypatch.setattr(settings, "speculative_turns_enabled", False)
+
+        assert not await manager.speculate("CA_spec", "a burger please")
+        twiml = await manager.process_user_speech("CA_spec", "a burger")
+        assert "partialResultCallback" not in twiml
@@ -0,0 +1,142 @@
+"""Unit tests for per-call turn serialization and duplicate delivery replay."""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from app.services.call_session.manager import CallSessionManager
+from app.services.call_session.models import CallSession
+from app.services.call_session.turns import CallLockRegistry, TurnResponseCache
+from app.services.agent.state import ConversationState
+from app.services.agent.stages import ConversationStage
+
+
+@pytest.fixture
+def slow_agent():
+    """Agent that takes a while and adds a burger on every call."""
+    agent = AsyncMock()
+
+    async def process_user_input(state, user_input):
+        await asyncio.sleep(0.05)
+        return {
+            "response": "One burger, anything else?",
+            "intent": "ordering",
+            "action": {"type": "add_item", "item_name": "burger", "quantity": 1},
+        }
+
+    agent.process_user_input = AsyncMock(side_effect=process_user_input)
+    return agent
+
+
+@pytest.fixture
+async def ordering_session(clean_call_sessions):
+    """Store a session that is already in the ORDERING stage."""
+    state = ConversationState(call_sid="CA_dup", stage=ConversationStage.ORDERING)
+    session = CallSession(call_sid="CA_dup", state=state, call_id=1)
+    await clean_call_sessions.set(session)
+    return session
+
+
+class TestDuplicateDelivery:
+    """Test that Twilio retries of a turn don't run the turn twice."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_retry_replays_twiml(
+        self, test_db, test_menu_repository, slow_agent, ordering_session, clean_call_sessions
+    ):
+        manager = CallSessionManager(test_db, slow_agent, test_menu_repository)
+
+        first, retry = await asyncio.gather(
+            manager.process_user_speech("CA_dup", "a burger please"),
+            manager.process_user_speech("CA_dup", "a burger please"),
+        )
+
+        assert first == retry
+        assert slow_agent.process_user_input.await_count == 1
+        session = await clean_call_sessions.get("CA_dup")
+        assert session.state.turn_count == 1
+        assert len(session.state.current_order) == 1
+
+    @pytest.mark.asyncio
+    async def test_new_turn_is_not_replayed(
+        self, test_db, test_menu_repository, slow_agent, ordering_session
+    ):
+        manager = CallSessionManager(test_db, slow_agent, test_menu_repository)
+
+        await manager.process_user_speech("CA_dup", "a burger please")
+        await manager.process_user_speech("CA_dup", "and another burger")
+
+        assert slow_agent.process_user_input.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_repeated_utterance_is_a_new_turn(
+        self, test_db, test_menu_repository, slow_agent, ordering_session, clean_call_sessions
+    ):
+        manager = CallSessionManager(test_db, slow_agent, test_menu_repository)
+
+        await manager.process_user_speech("CA_dup", "a burger please")
+        await manager.process_user_speech("CA_dup", "a burger please")
+        await manager.process_user_speech("CA_dup", "a burger please", idempotency_token="IT-repeat-1")
+        await manager.process_user_speech("CA_dup", "a burger please", idempotency_token="IT-repeat-2")
+
+        assert slow_agent.process_user_input.await_count == 4
+        session = await clean_call_sessions.get("CA_dup")
+        assert len(session.state.current_order) == 4
+
+    @pytest.mark.asyncio
+    async def test_late_retry_replays_by_idempotency_token(
+        self, test_db, test_menu_repository, slow_agent, ordering_session, clean_call_sessions
+    ):
+        manager = CallSessionManager(test_db, slow_agent, test_menu_repository)
+
+        first = await manager.process_user_speech("CA_dup", "a burger please", idempotency_token="IT-late")
+        retry = await manager.process_user_speech("CA_dup", "a burger please", idempotency_token="IT-late")
+
+        assert first == retry
+        assert slow_agent.process_user_input.await_count == 1
+        session = await clean_call_sessions.get("CA_dup")
+        assert len(session.state.current_order) == 1
+
+
+class TestTurnPrimitives:
+    """Test the lock registry and response cache directly."""
+
+    @pytest.mark.asyncio
+    async def test_lock_registry_releases_entries(self):
+        registry = CallLockRegistry()
+        async with registry.hold("CA1"):
+            assert registry.is_locked("CA1")
+            assert len(registry) == 1
+        assert len(registry) == 0
+
+    def test_response_cache_keys_on_idempotency_token(self):
+        cache = TurnResponseCache(ttl_seconds=30)
+        cache.put("CA1", "t1", "<Response/>")
+        cache.put("CA1", None, "<Ignored/>")
+
+        assert cache.get("CA1", "t1") == "<Response/>"
+        assert cache.get("CA1", "t2") is None
+        assert cache.get("CA2", "t1") is None
+        assert cache.get("CA1", None) is None
+        assert cache.replays == 1
+
+    def test_response_cache_expires(self):
+        cache = TurnResponseCache(ttl_seconds=-1)
+        cache.put("CA1", "t1", "<Response/>")
+        assert cache.get("CA1", "t1") is None
+
+    @pytest.mark.asyncio
+    async def test_failed_turn_fails_its_duplicates(self):
+        cache = TurnResponseCache(ttl_seconds=30)
+
+        async def failing_turn():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            cache.answer("CA1", "yes", None, failing_turn),
+            cache.answer("CA1", "yes", None, failing_turn),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await cache.answer("CA1", "yes", None, lambda: asyncio.sleep(0, "<Response/>")) == "<Response/>"